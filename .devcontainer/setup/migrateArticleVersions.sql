@@ -0,0 +1,30 @@
+-- Migrates database created before articles had a version and unique
+-- references. Adds updated_at column, used by HTTP validators (ETag,
+-- Last-Modified), and unique index on reference, which detects duplicate
+-- articles. Existing rows and tables are kept, so it's safe to run
+-- more than once:
+--   psql -d blog_db -f ./.devcontainer/setup/migrateArticleVersions.sql
+BEGIN;
+
+-- Existing articles get the time of migration as their version.
+ALTER TABLE articles
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL
+    DEFAULT (now() AT TIME ZONE 'utc');
+
+-- Articles could be added more than once before the index existed.
+-- The oldest one keeps it's reference, others get their id appended,
+-- so no article is lost.
+UPDATE articles
+SET reference = articles.reference || '-' || articles.id
+FROM (
+    SELECT id, row_number() OVER (PARTITION BY reference ORDER BY id) AS copy
+    FROM articles
+    WHERE reference IS NOT NULL
+) AS copies
+WHERE copies.id = articles.id
+    AND copies.copy > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ix_articles_reference
+    ON articles (reference);
+
+COMMIT;
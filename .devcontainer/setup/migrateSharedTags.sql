@@ -0,0 +1,61 @@
+-- Migrates database created before tags were shared between articles.
+-- Each row of the old tags table held one tag of one article, now each
+-- tag is stored once and assigned to articles through article_tags.
+-- Database which already shares tags is left as it is, so it's safe
+-- to run more than once:
+--   psql -d blog_db -f ./.devcontainer/setup/migrateSharedTags.sql
+BEGIN;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM information_schema.columns
+        WHERE table_schema = current_schema()
+            AND table_name = 'tags'
+            AND column_name = 'articles_id'
+    ) THEN
+        RAISE NOTICE 'Tags are already shared, nothing to migrate.';
+        RETURN;
+    END IF;
+
+    -- Free names of the new table, it's sequence and primary key.
+    ALTER TABLE tags RENAME TO tags_old;
+    ALTER SEQUENCE tags_id_seq RENAME TO tags_old_id_seq;
+    ALTER INDEX tags_pkey RENAME TO tags_old_pkey;
+
+    CREATE TABLE tags (
+        id SERIAL PRIMARY KEY NOT NULL,
+        _name VARCHAR NOT NULL
+    );
+    CREATE UNIQUE INDEX ix_tags_name
+        ON tags (_name);
+
+    CREATE TABLE article_tags (
+        article_id INT NOT NULL,
+        tag_id INT NOT NULL,
+        PRIMARY KEY (article_id, tag_id),
+        FOREIGN KEY (article_id)
+          REFERENCES articles (id) ON DELETE CASCADE,
+        FOREIGN KEY (tag_id)
+          REFERENCES tags (id) ON DELETE CASCADE
+    );
+    CREATE INDEX ix_article_tags_tag_id
+        ON article_tags (tag_id, article_id);
+
+    INSERT INTO tags (_name)
+    SELECT DISTINCT _name
+    FROM tags_old
+    ORDER BY _name;
+
+    -- Article could have the same tag more than once.
+    INSERT INTO article_tags (article_id, tag_id)
+    SELECT DISTINCT tags_old.articles_id, tags.id
+    FROM tags_old
+    JOIN tags ON tags._name = tags_old._name;
+
+    DROP TABLE tags_old;
+END
+$$;
+
+COMMIT;
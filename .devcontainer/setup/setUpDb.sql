@@ -6,14 +6,41 @@ CREATE TABLE articles (
     author VARCHAR NOT NULL,
     publication_date DATE,
     description TEXT,
-    content TEXT
+    content TEXT,
+    updated_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
 );
+CREATE UNIQUE INDEX ix_articles_reference
+    ON articles (reference);
+CREATE INDEX ix_articles_publication_date_id
+    ON articles (publication_date, id);
 
-DROP TABLE IF EXISTS tags;
+DROP TABLE IF EXISTS tags CASCADE;
 CREATE TABLE tags (
     id SERIAL PRIMARY KEY NOT NULL,
-    _name VARCHAR NOT NULL,
-    articles_id INT NOT NULL,
-    FOREIGN KEY (articles_id)
-      REFERENCES articles (id)
+    _name VARCHAR NOT NULL
 );
+CREATE UNIQUE INDEX ix_tags_name
+    ON tags (_name);
+
+DROP TABLE IF EXISTS article_tags;
+CREATE TABLE article_tags (
+    article_id INT NOT NULL,
+    tag_id INT NOT NULL,
+    PRIMARY KEY (article_id, tag_id),
+    FOREIGN KEY (article_id)
+      REFERENCES articles (id) ON DELETE CASCADE,
+    FOREIGN KEY (tag_id)
+      REFERENCES tags (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_article_tags_tag_id
+    ON article_tags (tag_id, article_id);
+
+DROP TABLE IF EXISTS articles_search;
+CREATE TABLE articles_search (
+    article_id INT PRIMARY KEY NOT NULL,
+    document TSVECTOR NOT NULL,
+    FOREIGN KEY (article_id)
+      REFERENCES articles (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_articles_search_document
+    ON articles_search USING GIN (document);
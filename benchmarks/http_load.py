@@ -0,0 +1,72 @@
+"""Measures throughput and latency of a running API.
+
+Each client is a thread with it's own keep-alive HTTP session,
+sending requests one after another for given duration.
+
+Usage:
+    python benchmarks/http_load.py http://localhost:5005/articles \
+        --clients 32 --duration 20
+"""
+import argparse
+import statistics
+import threading
+import time
+from typing import List
+
+import requests
+
+
+def run_client(url: str, deadline: float, latencies: List[float], errors: List[int]):
+    session = requests.Session()
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = session.get(url)
+        except requests.RequestException:
+            errors.append(1)
+            continue
+        if response.status_code >= 500:
+            errors.append(1)
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+def percentile(values: List[float], percent: float) -> float:
+    return statistics.quantiles(values, n=100)[int(percent) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("url")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0)
+    args = parser.parse_args()
+
+    latencies: List[float] = []
+    errors: List[int] = []
+    deadline = time.perf_counter() + args.duration
+    clients = [
+        threading.Thread(
+            target=run_client, args=(args.url, deadline, latencies, errors)
+        )
+        for _ in range(args.clients)
+    ]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+
+    if len(latencies) < 2:
+        print(
+            f"Not enough successful requests ({len(latencies)}), errors: {len(errors)}"
+        )
+        return
+
+    print(f"requests/sec: {len(latencies) / args.duration:.1f}")
+    print(f"errors:       {len(errors)}")
+    for percent in (50, 95, 99):
+        print(f"p{percent}:          {percentile(latencies, percent) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
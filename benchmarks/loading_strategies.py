@@ -0,0 +1,145 @@
+"""Compares strategies of loading article's tags for each
+repository operation, by number of statements and latency.
+
+Articles are seeded into given database (in-memory SQLite by default)
+and every operation is repeated with each strategy.
+
+Usage:
+    python benchmarks/loading_strategies.py --articles 2000 --tags 5 \
+        --page-size 20 --repeat 200
+"""
+import argparse
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List
+
+from blog_service.adapters import orm, query_counter
+from blog_service.adapters.repository import SQLAlchemyRepository
+from blog_service.domain.model import Article, Tag
+from sqlalchemy import create_engine
+from sqlalchemy.orm import (
+    joinedload,
+    lazyload,
+    noload,
+    selectinload,
+    sessionmaker,
+    subqueryload,
+)
+
+STRATEGIES = {
+    "lazy": lazyload,
+    "subquery": subqueryload,
+    "selectin": selectinload,
+    "joined": joinedload,
+    "noload": noload,
+}
+
+
+def seed(session_factory, articles: int, tags: int):
+    session = session_factory()
+    first_day = date(2000, 1, 1)
+    SQLAlchemyRepository(session).add_many(
+        [
+            Article(
+                f"article-{number}",
+                f"Article {number}",
+                "Tom",
+                first_day + timedelta(days=number),
+                "Description",
+                "Content " * 100,
+                {Tag(f"tag-{(number + tag) % (tags * 10)}") for tag in range(tags)},
+            )
+            for number in range(articles)
+        ]
+    )
+    session.commit()
+    session.close()
+
+
+def list_page(session, option, page_size: int):
+    query = session.query(Article).options(option(Article.tags))
+    articles = query.order_by(Article.publication_date.desc()).limit(page_size).all()
+    return [article.tags for article in articles]
+
+
+def get(session, option, reference: str):
+    query = session.query(Article).options(option(Article.tags))
+    return query.filter_by(reference=reference).one().tags
+
+
+def remove(session, option, reference: str):
+    article = (
+        session.query(Article)
+        .options(option(Article.tags))
+        .filter_by(reference=reference)
+        .one()
+    )
+    if option is noload:
+        session.execute(
+            orm.article_tags.delete().where(orm.article_tags.c.article_id == article.id)
+        )
+    session.delete(article)
+    session.flush()
+    session.rollback()
+
+
+def measure(session_factory, run: Callable, repeat: int) -> Dict:
+    latencies: List[float] = []
+    statements = 0
+    for _ in range(repeat):
+        session = session_factory()
+        with query_counter.track_queries() as stats:
+            started = time.perf_counter()
+            run(session)
+            latencies.append(time.perf_counter() - started)
+        session.close()
+        statements = stats.count
+    return {
+        "statements": statements,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p95_ms": statistics.quantiles(latencies, n=100)[94] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uri", default="sqlite://")
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--tags", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_engine(args.uri)
+    orm.metadata.create_all(engine)
+    orm.start_mappers()
+    session_factory = sessionmaker(bind=engine)
+    seed(session_factory, args.articles, args.tags)
+
+    reference = f"article-{args.articles // 2}"
+    operations = {
+        "list": lambda session, option: list_page(session, option, args.page_size),
+        "get": lambda session, option: get(session, option, reference),
+        "remove": lambda session, option: remove(session, option, reference),
+    }
+
+    print(
+        f"{'operation':<10}{'strategy':<10}"
+        f"{'statements':>12}{'mean ms':>10}{'p95 ms':>10}"
+    )
+    for name, operation in operations.items():
+        for strategy, option in STRATEGIES.items():
+            result = measure(
+                session_factory,
+                lambda session: operation(session, option),
+                args.repeat,
+            )
+            print(
+                f"{name:<10}{strategy:<10}{result['statements']:>12}"
+                f"{result['mean_ms']:>10.3f}{result['p95_ms']:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
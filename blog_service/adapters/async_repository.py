@@ -0,0 +1,109 @@
+from datetime import date, datetime
+from itertools import islice
+from typing import AsyncIterator, Iterable, List, Optional, Set, Tuple
+
+from blog_service.domain.model import Article
+from blog_service.domain.read_models import ArticleSnapshot, ArticleSummary
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .repository import SQLAlchemyRepository
+
+
+class AsyncSQLAlchemyRepository:
+    """Asynchronous counterpart of SQLAlchemyRepository. Each method runs
+    queries of SQLAlchemyRepository through AsyncSession.run_sync(),
+    so both repositories share the same queries, while waiting for
+    database doesn't block event loop.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._repository = SQLAlchemyRepository(session.sync_session)
+
+    async def add(self, article: Article):
+        """Adds article into repository, replacing it's tags
+        with already stored ones.
+        """
+        await self._run(self._repository.add, article)
+
+    async def add_many(self, articles: List[Article]):
+        """Inserts many new articles with their tags at once."""
+        await self._run(self._repository.add_many, articles)
+
+    async def get(self, reference: str) -> Article:
+        """Fetch Article object by using it's identifier."""
+        return await self._run(self._repository.get, reference)
+
+    async def get_snapshot(self, reference: str) -> ArticleSnapshot:
+        """Fetch read-only snapshot of Article by using it's identifier."""
+        return await self._run(self._repository.get_snapshot, reference)
+
+    async def get_last_modified(self, reference: str) -> datetime:
+        """Fetch time of the last modification of Article."""
+        return await self._run(self._repository.get_last_modified, reference)
+
+    async def exists(self, reference: str) -> bool:
+        """Checks if article with given identifier is stored."""
+        return await self._run(self._repository.exists, reference)
+
+    async def existing_references(self, references: Iterable[str]) -> Set[str]:
+        """Returns which of given identifiers belong to stored articles."""
+        return await self._run(self._repository.existing_references, references)
+
+    async def list_items(
+        self, limit: Optional[int] = None, after: Optional[Tuple[date, int]] = None
+    ) -> List[Article]:
+        """Fetch list of Article objects, newest first."""
+        return await self._run(self._repository.list_items, limit, after)
+
+    async def list_summaries(
+        self, limit: Optional[int] = None, after: Optional[Tuple[date, int]] = None
+    ) -> List[ArticleSummary]:
+        """Fetch summaries of articles, newest first."""
+        return await self._run(self._repository.list_summaries, limit, after)
+
+    async def list_by_tags(
+        self,
+        names: Iterable[str],
+        match_all: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[date, int]] = None,
+    ) -> List[ArticleSummary]:
+        """Fetch summaries of articles tagged with given tags, newest first."""
+        return await self._run(
+            self._repository.list_by_tags, names, match_all, limit, after
+        )
+
+    async def iter_snapshots(
+        self, batch_size: int = 500
+    ) -> AsyncIterator[ArticleSnapshot]:
+        """Iterates over snapshots of all articles in repository,
+        including their content. Database cursor is advanced
+        one batch per run_sync() call.
+        """
+        snapshots = self._repository.iter_snapshots(batch_size)
+        try:
+            while True:
+                batch = await self._run(lambda: list(islice(snapshots, batch_size)))
+                if not batch:
+                    return
+
+                for snapshot in batch:
+                    yield snapshot
+        finally:
+            await self._run(snapshots.close)
+
+    async def remove(self, reference: str):
+        """Removes article referenced by provided identifier from repository."""
+        await self._run(self._repository.remove, reference)
+
+    def next_reference(
+        self, article_title: str, chars_limit: Optional[int] = None
+    ) -> str:
+        """Generates slug for given article's title. It doesn't touch
+        database, so it's not a coroutine.
+        """
+        return self._repository.next_reference(article_title, chars_limit)
+
+    async def _run(self, method, *args):
+        return await self.session.run_sync(lambda _: method(*args))
@@ -0,0 +1,424 @@
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+# Upper bounds of request and service latency buckets, in seconds.
+LATENCY_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+
+
+class Registry:
+    """Collection of metrics rendered together in Prometheus text format."""
+
+    def __init__(self):
+        self._collectors: List = []
+        self._lock = threading.Lock()
+
+    def register(self, collector):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            collectors = list(self._collectors)
+
+        lines = []
+        for collector in collectors:
+            lines.extend(collector.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Shard:
+    """Values of a metric recorded by one thread."""
+
+    def __init__(self):
+        self.thread = threading.current_thread()
+        # Contended only while metrics are rendered.
+        self.lock = threading.Lock()
+        self.values: Dict[Labels, Any] = {}
+
+
+class _Metric:
+    """Metric which values are aggregated per thread. Each thread
+    updates only it's own shard, so recording doesn't wait for other
+    threads, and shards are summed up when metrics are rendered.
+    Shards of finished threads are merged into one, so threads
+    started per request don't pile them up.
+    """
+
+    type = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Registry = REGISTRY,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        # Values recorded by finished threads.
+        self._finished: Dict[Labels, Any] = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _shard(self) -> _Shard:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._merge_finished_shards()
+                self._shards.append(shard)
+            return shard
+
+    def _merge_finished_shards(self):
+        """Moves values of finished threads out of their shards.
+        Caller holds the lock.
+        """
+        running = []
+        for shard in self._shards:
+            if shard.thread.is_alive():
+                running.append(shard)
+                continue
+            for labels, value in shard.values.items():
+                self._finished[labels] = self._add(self._finished.get(labels), value)
+        self._shards = running
+
+    def _collect(self) -> Dict[Labels, List]:
+        with self._lock:
+            self._merge_finished_shards()
+            shards = list(self._shards)
+            collected = {
+                labels: [self._copy(value)] for labels, value in self._finished.items()
+            }
+
+        for shard in shards:
+            with shard.lock:
+                values = [
+                    (labels, self._copy(value))
+                    for labels, value in shard.values.items()
+                ]
+            for labels, value in values:
+                collected.setdefault(labels, []).append(value)
+        return collected
+
+    @staticmethod
+    def _add(total: Any, value: Any) -> Any:
+        return value if total is None else total + value
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        return value
+
+    def render(self) -> List[str]:
+        lines = _header(self.name, self.documentation, self.type)
+        for labels, values in sorted(self._collect().items()):
+            lines.append(_sample(self.name, self.labelnames, labels, sum(values)))
+        return lines
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, labels: Labels = (), amount: float = 1):
+        shard = self._shard()
+        with shard.lock:
+            shard.values[labels] = shard.values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def inc(self, labels: Labels = (), amount: float = 1):
+        shard = self._shard()
+        with shard.lock:
+            shard.values[labels] = shard.values.get(labels, 0) + amount
+
+    def dec(self, labels: Labels = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+    def total(self) -> float:
+        """Returns sum of values of all labels."""
+        return sum(sum(values) for values in self._collect().values())
+
+
+class Histogram(_Metric):
+    """Histogram with fixed buckets. Each bucket counts observations
+    less than or equal to it's bound.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        registry: Registry = REGISTRY,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value: float, labels: Labels = ()):
+        shard = self._shard()
+        with shard.lock:
+            counts = shard.values.get(labels)
+            if counts is None:
+                # Bucket counts followed by count above the last bound and sum.
+                counts = shard.values[labels] = [0] * (len(self.buckets) + 2)
+            counts[bisect_left(self.buckets, value)] += 1
+            counts[-1] += value
+
+    @staticmethod
+    def _add(total: Optional[List], value: List) -> List:
+        if total is None:
+            return list(value)
+        return [a + b for a, b in zip(total, value)]
+
+    @staticmethod
+    def _copy(value: List) -> List:
+        return list(value)
+
+    def render(self) -> List[str]:
+        lines = _header(self.name, self.documentation, self.type)
+        for labels, shards in sorted(self._collect().items()):
+            counts = [sum(column) for column in zip(*shards)]
+            cumulative = {}
+            count = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                count += bucket_count
+                cumulative[str(bound)] = count
+            snapshot = {
+                "buckets": cumulative,
+                "count": sum(counts[:-1]),
+                "sum": counts[-1],
+            }
+            lines.extend(
+                _histogram_samples(self.name, self.labelnames, labels, snapshot)
+            )
+        return lines
+
+
+class StatsCollector:
+    """Exposes statistics already kept by other components, like read
+    cache or connection pools, reading them only when rendered.
+
+    Parameters
+    ----------
+    prefix : str
+        Prefix of names of exposed metrics.
+    label : str
+        Name of label distinguishing instances of the component.
+    stats : Callable[[], Dict[str, Dict]]
+        Returns statistics of each instance, by value of the label.
+        Instances with None statistics are skipped.
+    counters : Dict[str, str]
+        Documentation of statistics exposed as counters, by their keys.
+    gauges : Dict[str, str]
+        Documentation of statistics exposed as gauges, by their keys.
+    histograms : Dict[str, str], optional
+        Documentation of statistics exposed as histograms, by their keys,
+        by default none. Those statistics are snapshots of pool_metrics'
+        Histogram.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        label: str,
+        stats: Callable[[], Dict[str, Dict]],
+        counters: Dict[str, str],
+        gauges: Dict[str, str],
+        histograms: Optional[Dict[str, str]] = None,
+        registry: Registry = REGISTRY,
+    ):
+        self.prefix = prefix
+        self.label = label
+        self.stats = stats
+        self.counters = counters
+        self.gauges = gauges
+        self.histograms = histograms or {}
+        registry.register(self)
+
+    def render(self) -> List[str]:
+        stats = {
+            instance: instance_stats
+            for instance, instance_stats in self.stats().items()
+            if instance_stats is not None
+        }
+        labelnames = (self.label,)
+        lines = []
+        for kind, suffix, keys in (
+            ("counter", "_total", self.counters),
+            ("gauge", "", self.gauges),
+        ):
+            for key, documentation in keys.items():
+                name = f"{self.prefix}_{key}{suffix}"
+                lines.extend(_header(name, documentation, kind))
+                for instance, instance_stats in sorted(stats.items()):
+                    if key in instance_stats:
+                        lines.append(
+                            _sample(name, labelnames, (instance,), instance_stats[key])
+                        )
+
+        for key, documentation in self.histograms.items():
+            name = f"{self.prefix}_{key}"
+            lines.extend(_header(name, documentation, "histogram"))
+            for instance, instance_stats in sorted(stats.items()):
+                if key in instance_stats:
+                    lines.extend(
+                        _histogram_samples(
+                            name, labelnames, (instance,), instance_stats[key]
+                        )
+                    )
+        return lines
+
+
+SERVICE_DURATION = Histogram(
+    "blog_service_call_duration_seconds",
+    "Time spent in service layer functions.",
+    ("service",),
+)
+SERVICE_EXCEPTIONS = Counter(
+    "blog_service_call_exceptions_total",
+    "Exceptions raised by service layer functions.",
+    ("service", "exception"),
+)
+
+
+def timed(service: Callable) -> Callable:
+    """Records duration and raised exceptions of a service layer function,
+    either synchronous or asynchronous one. Duration of a generator
+    function covers whole iteration.
+    """
+    name = service.__name__
+
+    if inspect.isasyncgenfunction(service):
+
+        @wraps(service)
+        async def timed_async_generator(*args, **kwargs):
+            with _timing(name):
+                async for item in service(*args, **kwargs):
+                    yield item
+
+        return timed_async_generator
+
+    if inspect.iscoroutinefunction(service):
+
+        @wraps(service)
+        async def timed_coroutine(*args, **kwargs):
+            with _timing(name):
+                return await service(*args, **kwargs)
+
+        return timed_coroutine
+
+    if inspect.isgeneratorfunction(service):
+
+        @wraps(service)
+        def timed_generator(*args, **kwargs):
+            with _timing(name):
+                yield from service(*args, **kwargs)
+
+        return timed_generator
+
+    @wraps(service)
+    def timed_service(*args, **kwargs):
+        with _timing(name):
+            return service(*args, **kwargs)
+
+    return timed_service
+
+
+@contextmanager
+def _timing(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        SERVICE_EXCEPTIONS.inc((name, type(e).__name__))
+        raise
+    finally:
+        SERVICE_DURATION.observe(time.perf_counter() - started, (name,))
+
+
+def _header(name: str, documentation: str, kind: str) -> List[str]:
+    return [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+
+
+def _sample(name: str, labelnames: Iterable[str], labels: Labels, value: float) -> str:
+    if not labels:
+        return f"{name} {_format_value(value)}"
+
+    pairs = ",".join(
+        f'{labelname}="{_escape(label)}"'
+        for labelname, label in zip(labelnames, labels)
+    )
+    return f"{name}{{{pairs}}} {_format_value(value)}"
+
+
+def _histogram_samples(
+    name: str, labelnames: Sequence[str], labels: Labels, snapshot: Dict
+) -> List[str]:
+    bucket_labelnames = (*labelnames, "le")
+    lines = [
+        _sample(f"{name}_bucket", bucket_labelnames, (*labels, bound), count)
+        for bound, count in snapshot["buckets"].items()
+    ]
+    lines.append(
+        _sample(
+            f"{name}_bucket", bucket_labelnames, (*labels, "+Inf"), snapshot["count"]
+        )
+    )
+    lines.append(_sample(f"{name}_sum", labelnames, labels, snapshot["sum"]))
+    lines.append(_sample(f"{name}_count", labelnames, labels, snapshot["count"]))
+    return lines
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def _escape(label) -> str:
+    return str(label).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
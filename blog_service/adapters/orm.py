@@ -1,10 +1,49 @@
+from datetime import datetime
+
 from blog_service.domain import model
-from sqlalchemy import Column, Date, ForeignKey, Integer, MetaData, String, Table, Text
+from sqlalchemy import (
+    DDL,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    event,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import mapper, relationship
+from sqlalchemy.sql.functions import FunctionElement
 
 metadata = MetaData()
 
 
+class utcnow(FunctionElement):
+    """Current UTC time, for server defaults of naive timestamp
+    columns, which hold UTC like `datetime.utcnow` does.
+    """
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow(element, compiler, **kw):
+    # SQLite's CURRENT_TIMESTAMP is in UTC already.
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "postgresql")
+def _utcnow_postgresql(element, compiler, **kw):
+    # Same as setUpDb.sql's (now() AT TIME ZONE 'utc').
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
 articles = Table(
     "articles",
     metadata,
@@ -15,16 +54,101 @@ articles = Table(
     Column("publication_date", Date),
     Column("description", Text),
     Column("content", Text),
+    # Version of an article, used by HTTP validators (ETag, Last-Modified).
+    Column(
+        "updated_at",
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        server_default=utcnow(),
+    ),
 )
 
+reference_index = Index("ix_articles_reference", articles.c.reference, unique=True)
+
+# Backs keyset pagination, which seeks on (publication_date, id)
+# instead of skipping rows with OFFSET.
+Index(
+    "ix_articles_publication_date_id",
+    articles.c.publication_date,
+    articles.c.id,
+)
+
+# Each tag is stored once and shared by all articles it's assigned to.
 tags = Table(
     "tags",
     metadata,
     Column("id", Integer, primary_key=True, autoincrement=True),
     Column("_name", String(model.TAG_MAX_CHARS), nullable=False),
-    Column("articles_id", ForeignKey("articles.id")),
 )
 
+Index("ix_tags_name", tags.c._name, unique=True)
+
+article_tags = Table(
+    "article_tags",
+    metadata,
+    Column(
+        "article_id",
+        ForeignKey("articles.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "tag_id",
+        ForeignKey("tags.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+)
+
+# Primary key serves lookups of article's tags, this index serves
+# filtering articles by tags.
+Index("ix_article_tags_tag_id", article_tags.c.tag_id, article_tags.c.article_id)
+
+
+# Full-text search index lives outside of metadata's tables,
+# as it's implemented differently by each database.
+event.listen(
+    metadata,
+    "after_create",
+    DDL(
+        "CREATE TABLE IF NOT EXISTS articles_search ("
+        "article_id INTEGER PRIMARY KEY REFERENCES articles (id) ON DELETE CASCADE, "
+        "document TSVECTOR NOT NULL)"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    metadata,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_articles_search_document "
+        "ON articles_search USING GIN (document)"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    metadata,
+    "after_create",
+    DDL(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS articles_search USING fts5"
+        "(reference UNINDEXED, title, description, content)"
+    ).execute_if(dialect="sqlite"),
+)
+event.listen(metadata, "before_drop", DDL("DROP TABLE IF EXISTS articles_search"))
+
+
+def violates_unique_reference(error: IntegrityError) -> bool:
+    """Checks if error was raised by unique index of article references,
+    not by other constraint. PostgreSQL drivers report name of violated
+    index, SQLite names only the column.
+    """
+    # psycopg2 keeps diagnostics of the error, asyncpg's error is the cause
+    # of one wrapped by SQLAlchemy's adapter.
+    diag = getattr(error.orig, "diag", None)
+    constraint = getattr(diag, "constraint_name", None) or getattr(
+        error.orig.__cause__, "constraint_name", None
+    )
+    if constraint is not None:
+        return constraint == reference_index.name
+    return "UNIQUE constraint failed: articles.reference" in str(error.orig)
+
 
 def start_mappers():
     """Gets Table objects and map them with proper domain models."""
@@ -36,13 +160,14 @@ def start_mappers():
         model.Article,
         articles,
         properties={
+            # Tags are loaded lazily by default, repository picks eager
+            # loading strategy suited to each operation.
             "tags": relationship(
                 tags_mapper,
+                secondary=article_tags,
                 uselist=True,
                 collection_class=set,
-                backref="articles",
-                lazy="subquery",
-                cascade="all, delete, delete-orphan",
+                lazy="select",
             ),
         },
     )
@@ -0,0 +1,184 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Optional, Sequence
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Upper bounds of checkout latency buckets, in seconds.
+CHECKOUT_LATENCY_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+
+class Histogram:
+    """Thread-safe histogram with fixed buckets, like Prometheus one.
+    Each bucket counts observations less than or equal to it's bound,
+    observations above the last bound are counted only in total.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._counts[bisect_left(self.buckets, value)] += 1
+            self._sum += value
+
+    def snapshot(self) -> Dict:
+        """Returns cumulative count of each bucket,
+        total count and sum of observations.
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+
+        cumulative = {}
+        count = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            count += bucket_count
+            cumulative[str(bound)] = count
+        return {"buckets": cumulative, "count": sum(counts), "sum": total}
+
+
+class PoolMetrics:
+    """Observes connection pool of an engine. Counters are fed
+    by SQLAlchemy pool events, while time spent waiting for a connection
+    is measured by instrumented pool classes.
+    """
+
+    def __init__(self):
+        self.engine: Optional[Engine] = None
+        self.checkout_latency = Histogram(CHECKOUT_LATENCY_BUCKETS)
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self.wait_time = 0.0
+
+    def instrument(self, engine: Engine):
+        """Starts observing pool of given engine.
+
+        Parameters
+        ----------
+        engine : Engine
+            Engine which pool is observed. Pool needs to be instrumented
+            to report checkout latency and time spent waiting.
+        """
+        self.engine = engine
+        if isinstance(engine.pool, InstrumentedQueuePool):
+            engine.pool.metrics = self
+
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def stats(self) -> Dict:
+        """Returns current state of the pool along with counters
+        that help to size it against database's max_connections.
+        """
+        pool = self.engine.pool if self.engine is not None else None
+        with self._lock:
+            stats = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "waiting": self.waiting,
+                "wait_time": self.wait_time,
+            }
+
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                max_overflow=pool._max_overflow,
+                max_connections=pool.size() + pool._max_overflow,
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+                timeout=pool.timeout(),
+            )
+        stats["checkout_latency"] = self.checkout_latency.snapshot()
+        return stats
+
+    def start_wait(self) -> float:
+        with self._lock:
+            self.waiting += 1
+        return time.perf_counter()
+
+    def observe_wait(self, started: float, timed_out: bool = False):
+        elapsed = time.perf_counter() - started
+        self.checkout_latency.observe(elapsed)
+        with self._lock:
+            self.waiting -= 1
+            self.wait_time += elapsed
+            if timed_out:
+                self.timeouts += 1
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool reporting how long each checkout waited for
+    a connection, including time needed to open a new one.
+    """
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        if self.metrics is None:
+            return super()._do_get()
+
+        started = self.metrics.start_wait()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.metrics.observe_wait(started, timed_out)
+
+    def recreate(self):
+        # Engine recreates it's pool when disposed.
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool reporting time spent waiting for a connection."""
@@ -0,0 +1,139 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_current_stats: ContextVar[Optional["QueryStats"]] = ContextVar(
+    "query_stats", default=None
+)
+
+
+@dataclass
+class QueryStats:
+    """Statements executed while tracking was on. Statements are kept
+    with parameters left out, so executions of the same statement
+    with different values are counted together.
+    """
+
+    count: int = 0
+    duration: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def repeated(self, threshold: int) -> List[str]:
+        """Returns statements executed more than threshold times,
+        which usually means N+1 problem.
+        """
+        return [
+            statement
+            for statement, count in self.statements.items()
+            if count > threshold
+        ]
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Counts and times SQL statements executed by any engine
+    within the block, in the current thread or task.
+
+    Yields
+    ------
+    Iterator[QueryStats]
+        Stats updated as statements are executed.
+    """
+    stats, token = start_tracking()
+    try:
+        yield stats
+    finally:
+        stop_tracking(token)
+
+
+def start_tracking() -> Tuple[QueryStats, Token]:
+    """Starts tracking statements, for callers which can't wrap
+    tracked code in track_queries() block, like request hooks.
+    Returned token has to be passed to stop_tracking().
+    """
+    stats = QueryStats()
+    return stats, _current_stats.set(stats)
+
+
+def stop_tracking(token: Token):
+    _current_stats.reset(token)
+
+
+@contextmanager
+def uncounted() -> Iterator[None]:
+    """Leaves statements executed within the block out of tracked stats,
+    like ones setting up transaction, which don't depend on what
+    the tracked code does.
+    """
+    token = _current_stats.set(None)
+    try:
+        yield
+    finally:
+        _current_stats.reset(token)
+
+
+def current_stats() -> Optional[QueryStats]:
+    """Returns stats of the enclosing track_queries() block, if any."""
+    return _current_stats.get()
+
+
+def budget_violations(
+    stats: QueryStats,
+    max_queries: Optional[int] = None,
+    max_repeats: Optional[int] = None,
+) -> List[str]:
+    """Describes how given stats exceed query budget.
+
+    Parameters
+    ----------
+    stats : QueryStats
+        Tracked statements.
+    max_queries : Optional[int], optional
+        Maximum number of statements, by default None (unlimited).
+    max_repeats : Optional[int], optional
+        Maximum number of executions of the same statement,
+        by default None (unlimited).
+
+    Returns
+    -------
+    List[str]
+        Violations of the budget, empty when it's kept.
+    """
+    violations = []
+    if max_queries is not None and stats.count > max_queries:
+        violations.append(f"{stats.count} queries executed, budget is {max_queries}.")
+    if max_repeats is not None:
+        for statement in stats.repeated(max_repeats):
+            violations.append(
+                f"Statement executed {stats.statements[statement]} times "
+                f"(possible N+1): {statement}"
+            )
+    return violations
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    started = conn.info.get("query_started")
+    if stats is None or not started:
+        return
+
+    stats.duration += time.perf_counter() - started.pop()
+    stats.count += 1
+    stats.statements[statement] += 1
@@ -1,7 +1,24 @@
+import io
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from collections import defaultdict
+from datetime import date, datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-from blog_service.domain.model import Article
+from blog_service.adapters import orm
+from blog_service.domain.model import Article, Tag
+from blog_service.domain.read_models import (
+    ArticleSnapshot,
+    ArticleSummary,
+    TagSnapshot,
+)
+from sqlalchemy import Table, and_, func, or_, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Query, joinedload, noload, selectinload
+from sqlalchemy.sql.expression import Insert
+
+# SQLite allows at most 32766 bound parameters in one statement.
+IN_CLAUSE_CHUNK_SIZE = 10000
 
 
 class AbstractRepository(ABC):
@@ -9,12 +26,54 @@ class AbstractRepository(ABC):
     def add(self, article: Article):
         raise NotImplementedError
 
+    @abstractmethod
+    def add_many(self, articles: List[Article]):
+        raise NotImplementedError
+
     @abstractmethod
     def get(self, reference: str):
         raise NotImplementedError
 
     @abstractmethod
-    def list_items(self):
+    def get_snapshot(self, reference: str) -> ArticleSnapshot:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_last_modified(self, reference: str) -> datetime:
+        raise NotImplementedError
+
+    @abstractmethod
+    def exists(self, reference: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def existing_references(self, references: Iterable[str]) -> Set[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_items(
+        self, limit: Optional[int] = None, after: Optional[Tuple[date, int]] = None
+    ):
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_summaries(
+        self, limit: Optional[int] = None, after: Optional[Tuple[date, int]] = None
+    ) -> List[ArticleSummary]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_by_tags(
+        self,
+        names: Iterable[str],
+        match_all: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[date, int]] = None,
+    ) -> List[ArticleSummary]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_snapshots(self, batch_size: int = 500) -> Iterator[ArticleSnapshot]:
         raise NotImplementedError
 
     @abstractmethod
@@ -31,17 +90,66 @@ class SQLAlchemyRepository(AbstractRepository):
         self.session = session
 
     def add(self, article: Article):
-        """Adds article into repository
+        """Adds article into repository. Tags are shared between
+        articles, so article's tags that are already stored
+        are replaced with stored ones.
 
         Parameters
         ----------
         article : Article
             Article to add.
         """
+        article.tags = self._shared_tags(article.tags)
         self.session.add(article)
 
+    def add_many(self, articles: List[Article]):
+        """Inserts many new articles with their tags at once,
+        bypassing session's unit of work. On PostgreSQL rows are loaded
+        with COPY, on other databases with a single executemany per table.
+
+        Parameters
+        ----------
+        articles : List[Article]
+            Articles to add, none of them can exist in repository.
+        """
+        if not articles:
+            return
+
+        updated_at = datetime.utcnow()
+        article_rows = [
+            {
+                "reference": article.reference,
+                "title": article.title,
+                "author": article.author,
+                "publication_date": article.publication_date,
+                "description": article.description,
+                "content": article.content,
+                "updated_at": updated_at,
+            }
+            for article in articles
+        ]
+        self._insert_many(orm.articles, article_rows)
+
+        ids = dict(
+            self._in_chunks(
+                self.session.query(Article.reference, Article.id),
+                Article.reference,
+                [article.reference for article in articles],
+            )
+        )
+        names = {tag.name for article in articles for tag in article.tags}
+        tag_ids = self._stored_tag_ids(names)
+
+        article_tag_rows = [
+            {"article_id": ids[article.reference], "tag_id": tag_ids[tag.name]}
+            for article in articles
+            for tag in article.tags
+        ]
+        self._insert_many(orm.article_tags, article_tag_rows)
+
     def get(self, reference: str) -> Article:
         """Fetch Article object by using it's identifier.
+        Article's tags are joined to the same query.
 
         Parameters
         ----------
@@ -53,21 +161,227 @@ class SQLAlchemyRepository(AbstractRepository):
         Article
             Fetched article.
         """
-        result = self.session.query(Article).filter_by(reference=reference).one()
-        return result
+        query = self.session.query(Article).options(joinedload(Article.tags))
+        return query.filter_by(reference=reference).one()
+
+    def get_snapshot(self, reference: str) -> ArticleSnapshot:
+        """Fetch read-only snapshot of Article by using it's identifier.
+        Snapshot is built straight from selected columns, so no entity
+        is loaded into the session.
+
+        Parameters
+        ----------
+        reference : str
+            An Article's identifier
+
+        Returns
+        -------
+        ArticleSnapshot
+            Snapshot of fetched article.
+        """
+        row = (
+            self.session.query(
+                Article.id,
+                Article.reference,
+                Article.title,
+                Article.author,
+                Article.publication_date,
+                Article.description,
+                Article.content,
+                Article.updated_at,
+            )
+            .filter_by(reference=reference)
+            .one()
+        )
+        tags = self._tags_by_article_id([row.id])
+        return ArticleSnapshot(**row._asdict(), tags=frozenset(tags[row.id]))
+
+    def get_last_modified(self, reference: str) -> datetime:
+        """Fetch time of the last modification of Article by using
+        it's identifier, without loading the article itself.
+
+        Parameters
+        ----------
+        reference : str
+            An Article's identifier.
+
+        Returns
+        -------
+        datetime
+            When article was modified for the last time (UTC).
+        """
+        query = self.session.query(Article.updated_at).filter_by(reference=reference)
+        return query.one().updated_at
+
+    def exists(self, reference: str) -> bool:
+        """Checks if article with given identifier is in repository.
+        It's a lookup in unique reference index, so it doesn't
+        depend on number of stored articles.
+
+        Parameters
+        ----------
+        reference : str
+            An Article's identifier.
+
+        Returns
+        -------
+        bool
+            True when article exists.
+        """
+        query = self.session.query(Article.id).filter_by(reference=reference)
+        return self.session.query(query.exists()).scalar()
 
-    def list_items(self) -> List[Article]:
-        """Shows all available articles in repository.
+    def existing_references(self, references: Iterable[str]) -> Set[str]:
+        """Checks which of given identifiers are already in repository.
+
+        Parameters
+        ----------
+        references : Iterable[str]
+            Articles' identifiers.
+
+        Returns
+        -------
+        Set[str]
+            Identifiers of articles that exist in repository.
+        """
+        rows = self._in_chunks(
+            self.session.query(Article.reference), Article.reference, list(references)
+        )
+        return {row.reference for row in rows}
+
+    def list_items(
+        self, limit: Optional[int] = None, after: Optional[Tuple[date, int]] = None
+    ) -> List[Article]:
+        """Shows available articles in repository, newest first.
+        Articles are ordered by (publication_date, id), so a page can be
+        fetched by seeking past the key of the last seen article
+        instead of skipping all preceding rows. Tags of the whole page
+        are fetched with one additional query by primary keys.
+
+        Parameters
+        ----------
+        limit : Optional[int], optional
+            Maximum number of articles to return, by default None.
+            When None, all matching articles are returned.
+        after : Optional[Tuple[date, int]], optional
+            (publication_date, id) key of the last article from
+            previous page, by default None.
 
         Returns
         -------
         List[Article]
             List of available articles.
         """
-        return self.session.query(Article).all()
+        query = self.session.query(Article).options(selectinload(Article.tags))
+        return self._newest_first(query, limit, after).all()
+
+    def list_summaries(
+        self, limit: Optional[int] = None, after: Optional[Tuple[date, int]] = None
+    ) -> List[ArticleSummary]:
+        """Shows summaries of available articles in repository, newest first.
+        Unlike list_items(), it fetches only columns that are needed
+        to list articles, so article's content is never loaded.
+
+        Parameters
+        ----------
+        limit : Optional[int], optional
+            Maximum number of summaries to return, by default None.
+            When None, all matching summaries are returned.
+        after : Optional[Tuple[date, int]], optional
+            (publication_date, id) key of the last article from
+            previous page, by default None.
+
+        Returns
+        -------
+        List[ArticleSummary]
+            List of summaries of available articles.
+        """
+        return self._summaries(limit, after)
+
+    def list_by_tags(
+        self,
+        names: Iterable[str],
+        match_all: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[date, int]] = None,
+    ) -> List[ArticleSummary]:
+        """Shows summaries of articles tagged with given tags, newest first.
+
+        Parameters
+        ----------
+        names : Iterable[str]
+            Names of tags to filter by.
+        match_all : bool, optional
+            When True, article must have all given tags,
+            otherwise any of them, by default False.
+        limit : Optional[int], optional
+            Maximum number of summaries to return, by default None.
+            When None, all matching summaries are returned.
+        after : Optional[Tuple[date, int]], optional
+            (publication_date, id) key of the last article from
+            previous page, by default None.
+
+        Returns
+        -------
+        List[ArticleSummary]
+            List of summaries of matching articles.
+        """
+        names = set(names)
+        tagged_articles = (
+            select(orm.article_tags.c.article_id)
+            .join(orm.tags, orm.tags.c.id == orm.article_tags.c.tag_id)
+            .where(orm.tags.c._name.in_(names))
+        )
+        if match_all:
+            tagged_articles = tagged_articles.group_by(
+                orm.article_tags.c.article_id
+            ).having(func.count() == len(names))
+
+        return self._summaries(limit, after, Article.id.in_(tagged_articles))
+
+    def iter_snapshots(self, batch_size: int = 500) -> Iterator[ArticleSnapshot]:
+        """Iterates over snapshots of all articles in repository,
+        including their content. Rows are streamed from database
+        (server-side cursor on PostgreSQL) and tags are fetched once
+        per batch, so memory usage doesn't depend on number of articles.
+
+        Parameters
+        ----------
+        batch_size : int, optional
+            Number of articles fetched at once, by default 500.
+
+        Yields
+        ------
+        Iterator[ArticleSnapshot]
+            Snapshots of articles ordered by their id.
+        """
+        rows = iter(
+            self.session.query(
+                Article.id,
+                Article.reference,
+                Article.title,
+                Article.author,
+                Article.publication_date,
+                Article.description,
+                Article.content,
+                Article.updated_at,
+            )
+            .order_by(Article.id)
+            .yield_per(batch_size)
+        )
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+
+            tags = self._tags_by_article_id(row.id for row in batch)
+            for row in batch:
+                yield ArticleSnapshot(**row._asdict(), tags=frozenset(tags[row.id]))
 
     def remove(self, reference: str):
         """Removes article referenced by provided identifier from repository.
+        Article's tags are not loaded, it's links to them are deleted
+        with a single statement instead.
 
         Parameters
         ----------
@@ -75,7 +389,15 @@ class SQLAlchemyRepository(AbstractRepository):
             An Article's identifier.
         """
         article_to_remove = (
-            self.session.query(Article).filter_by(reference=reference).one()
+            self.session.query(Article)
+            .options(noload(Article.tags))
+            .filter_by(reference=reference)
+            .one()
+        )
+        self.session.execute(
+            orm.article_tags.delete().where(
+                orm.article_tags.c.article_id == article_to_remove.id
+            )
         )
         self.session.delete(article_to_remove)
 
@@ -102,3 +424,168 @@ class SQLAlchemyRepository(AbstractRepository):
         slug_title = article_title.lower()
         slug_title = slug_title.replace(" ", "-")
         return f"{slug_title[:chars_limit]}"
+
+    def _insert_many(self, table: Table, rows: List[Dict]):
+        if not rows:
+            return
+
+        connection = self.session.connection()
+        if connection.dialect.driver != "psycopg2":
+            connection.execute(table.insert(), rows)
+            return
+
+        columns = list(rows[0])
+        data = io.StringIO()
+        for row in rows:
+            data.write("\t".join(_copy_value(row[column]) for column in columns))
+            data.write("\n")
+        data.seek(0)
+
+        with connection.connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {table.name} ({', '.join(columns)}) FROM STDIN", data
+            )
+
+    @staticmethod
+    def _in_chunks(query: Query, column, values: List) -> List:
+        """Runs query filtered by `column IN values`, splitting values
+        into chunks, so no database limit of bound parameters is hit.
+        """
+        rows = []
+        for start in range(0, len(values), IN_CLAUSE_CHUNK_SIZE):
+            end = start + IN_CLAUSE_CHUNK_SIZE
+            rows.extend(query.filter(column.in_(values[start:end])).all())
+        return rows
+
+    def _summaries(
+        self, limit: Optional[int], after: Optional[Tuple[date, int]], *criteria
+    ) -> List[ArticleSummary]:
+        query = self.session.query(
+            Article.id,
+            Article.reference,
+            Article.title,
+            Article.author,
+            Article.publication_date,
+            Article.description,
+            Article.updated_at,
+        ).filter(*criteria)
+        rows = self._newest_first(query, limit, after).all()
+        tags = self._tags_by_article_id(row.id for row in rows)
+        return [
+            ArticleSummary(**row._asdict(), tags=frozenset(tags[row.id]))
+            for row in rows
+        ]
+
+    @staticmethod
+    def _newest_first(
+        query: Query,
+        limit: Optional[int],
+        after: Optional[Tuple[Optional[date], int]],
+    ) -> Query:
+        """Orders articles newest first. Articles without publication date
+        come first on every database, as PostgreSQL orders NULLs by default
+        when it scans (publication_date, id) index backwards.
+        """
+        query = query.order_by(
+            Article.publication_date.desc().nulls_first(), Article.id.desc()
+        )
+        if after is not None and after[0] is None:
+            query = query.filter(
+                or_(
+                    and_(Article.publication_date.is_(None), Article.id < after[1]),
+                    Article.publication_date.isnot(None),
+                )
+            )
+        elif after is not None:
+            # Comparison with NULL isn't true, so undated articles,
+            # which precede the key, are skipped as well.
+            query = query.filter(tuple_(Article.publication_date, Article.id) < after)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+
+    def _tags_by_article_id(
+        self, article_ids: Iterable[int]
+    ) -> Dict[int, Set[TagSnapshot]]:
+        """Fetches tags of all given articles with a single query."""
+        tags = defaultdict(set)
+        article_ids = list(article_ids)
+        if not article_ids:
+            return tags
+
+        rows = (
+            self.session.query(orm.article_tags.c.article_id, orm.tags.c._name)
+            .join(orm.tags, orm.tags.c.id == orm.article_tags.c.tag_id)
+            .filter(orm.article_tags.c.article_id.in_(article_ids))
+        )
+        for article_id, name in rows:
+            tags[article_id].add(TagSnapshot(name))
+        return tags
+
+    def _shared_tags(self, tags: Set[Tag]) -> Set[Tag]:
+        """Replaces given tags with stored tags of the same name,
+        storing missing ones first.
+        """
+        names = {tag.name for tag in tags}
+        if not names:
+            return tags
+
+        # Flushing now would insert new tags that duplicate stored ones.
+        with self.session.no_autoflush:
+            self._stored_tag_ids(names)
+            shared_tags = set(self.session.query(Tag).filter(Tag._name.in_(names)))
+
+        # Tags assigned to persistent article are already pending in session.
+        for tag in tags:
+            if tag in self.session.new:
+                self.session.expunge(tag)
+        return shared_tags
+
+    def _stored_tag_ids(self, names: Set[str]) -> Dict[str, int]:
+        """Inserts tags which aren't stored yet and returns ids of all
+        given tags. Tag inserted by concurrent transaction in the meantime
+        is skipped by ON CONFLICT DO NOTHING, instead of failing
+        on unique index of names, like select-then-insert would.
+        """
+        tag_ids = self._tag_ids(names)
+        missing = [{"_name": name} for name in names if name not in tag_ids]
+        if missing:
+            connection = self.session.connection()
+            connection.execute(
+                _insert_skipping_conflicts(orm.tags, connection.dialect.name), missing
+            )
+            tag_ids.update(self._tag_ids(names - tag_ids.keys()))
+        return tag_ids
+
+    def _tag_ids(self, names: Set[str]) -> Dict[str, int]:
+        rows = self._in_chunks(
+            self.session.query(orm.tags.c._name, orm.tags.c.id),
+            orm.tags.c._name,
+            list(names),
+        )
+        return dict(rows)
+
+
+def _insert_skipping_conflicts(table: Table, dialect: str) -> Insert:
+    """Builds INSERT that skips rows violating unique indexes,
+    on databases which support ON CONFLICT DO NOTHING.
+    """
+    if dialect == "postgresql":
+        return postgresql.insert(table).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite.insert(table).on_conflict_do_nothing()
+    return table.insert()
+
+
+def _copy_value(value) -> str:
+    """Formats value for text format of PostgreSQL's COPY."""
+    if value is None:
+        return "\\N"
+
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
@@ -0,0 +1,311 @@
+import html
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional
+
+from blog_service.domain.read_models import SearchHit
+from sqlalchemy import bindparam, text
+
+from .repository import IN_CLAUSE_CHUNK_SIZE
+
+SNIPPET_START = "<b>"
+SNIPPET_END = "</b>"
+# Databases mark matched words with control characters, which aren't
+# changed by escaping article's content, then they're replaced with tags.
+_MATCH_START = "\x02"
+_MATCH_END = "\x03"
+
+
+class AbstractSearchIndex(ABC):
+    @abstractmethod
+    def index(self, references: Iterable[str]):
+        raise NotImplementedError
+
+    @abstractmethod
+    def remove(self, reference: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    def search(self, query: str, limit: int, offset: int = 0) -> List[SearchHit]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def rebuild(self) -> int:
+        raise NotImplementedError
+
+
+class PostgresSearchIndex(AbstractSearchIndex):
+    """Full-text search index kept in `articles_search` table,
+    which holds weighted tsvector of each article (title, then description,
+    then content) covered by GIN index.
+    """
+
+    _INSERT = (
+        "INSERT INTO articles_search (article_id, document) "
+        "SELECT id, "
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(content, '')), 'C') "
+        "FROM articles"
+    )
+
+    def __init__(self, session):
+        self.session = session
+
+    def index(self, references: Iterable[str]):
+        """Adds or refreshes articles in search index. Articles are indexed
+        from their stored rows, so pending changes are flushed first.
+
+        Parameters
+        ----------
+        references : Iterable[str]
+            Identifiers of articles to index.
+        """
+        self.session.flush()
+        statement = text(
+            f"{self._INSERT} WHERE reference IN :references "
+            "ON CONFLICT (article_id) DO UPDATE SET document = EXCLUDED.document"
+        ).bindparams(bindparam("references", expanding=True))
+        _execute_in_chunks(self.session, statement, list(references))
+
+    def rebuild(self) -> int:
+        """Indexes all stored articles anew, e.g. ones stored before
+        search index was introduced.
+
+        Returns
+        -------
+        int
+            Number of indexed articles.
+        """
+        self.session.flush()
+        self.session.execute(text("DELETE FROM articles_search"))
+        return self.session.execute(text(self._INSERT)).rowcount
+
+    def remove(self, reference: str):
+        """Removes article from search index.
+
+        Parameters
+        ----------
+        reference : str
+            An Article's identifier.
+        """
+        self.session.execute(
+            text(
+                "DELETE FROM articles_search WHERE article_id = "
+                "(SELECT id FROM articles WHERE reference = :reference)"
+            ),
+            {"reference": reference},
+        )
+
+    def search(self, query: str, limit: int, offset: int = 0) -> List[SearchHit]:
+        """Finds articles matching all words of given query,
+        best matches first.
+
+        Parameters
+        ----------
+        query : str
+            Searched words.
+        limit : int
+            Maximum number of hits to return.
+        offset : int, optional
+            Number of best hits to skip, by default 0.
+
+        Returns
+        -------
+        List[SearchHit]
+            Matching articles with snippets of their content.
+        """
+        # Snippets are built only for the returned page of hits.
+        rows = self.session.execute(
+            text(
+                "SELECT a.reference, a.title, a.description, hits.rank, "
+                "ts_headline('english', coalesce(a.content, ''), hits.query, "
+                ":options) AS snippet "
+                "FROM ("
+                "SELECT s.article_id, q.query, ts_rank(s.document, q.query) AS rank "
+                "FROM articles_search s, "
+                "plainto_tsquery('english', :query) AS q(query) "
+                "WHERE s.document @@ q.query "
+                "ORDER BY rank DESC, s.article_id "
+                "LIMIT :limit OFFSET :offset"
+                ") AS hits JOIN articles a ON a.id = hits.article_id "
+                "ORDER BY hits.rank DESC, a.id"
+            ),
+            {
+                "query": query,
+                "limit": limit,
+                "offset": offset,
+                "options": f"StartSel={_MATCH_START}, StopSel={_MATCH_END}, "
+                "MaxFragments=2",
+            },
+        )
+        return _hits(rows)
+
+
+class SqliteSearchIndex(AbstractSearchIndex):
+    """Full-text search index kept in `articles_search` FTS5 virtual table,
+    which rowid is article's id. Meant for tests and local development.
+    """
+
+    _INSERT = (
+        "INSERT INTO articles_search "
+        "(rowid, reference, title, description, content) "
+        "SELECT id, reference, title, description, content "
+        "FROM articles"
+    )
+
+    def __init__(self, session):
+        self.session = session
+
+    def index(self, references: Iterable[str]):
+        """Adds or refreshes articles in search index. Articles are indexed
+        from their stored rows, so pending changes are flushed first.
+
+        Parameters
+        ----------
+        references : Iterable[str]
+            Identifiers of articles to index.
+        """
+        self.session.flush()
+        references = list(references)
+        _execute_in_chunks(
+            self.session,
+            text(
+                "DELETE FROM articles_search WHERE rowid IN "
+                "(SELECT id FROM articles WHERE reference IN :references)"
+            ).bindparams(bindparam("references", expanding=True)),
+            references,
+        )
+        _execute_in_chunks(
+            self.session,
+            text(f"{self._INSERT} WHERE reference IN :references").bindparams(
+                bindparam("references", expanding=True)
+            ),
+            references,
+        )
+
+    def rebuild(self) -> int:
+        """Indexes all stored articles anew, e.g. ones stored before
+        search index was introduced.
+
+        Returns
+        -------
+        int
+            Number of indexed articles.
+        """
+        self.session.flush()
+        self.session.execute(text("DELETE FROM articles_search"))
+        return self.session.execute(text(self._INSERT)).rowcount
+
+    def remove(self, reference: str):
+        """Removes article from search index.
+
+        Parameters
+        ----------
+        reference : str
+            An Article's identifier.
+        """
+        self.session.execute(
+            text(
+                "DELETE FROM articles_search WHERE rowid = "
+                "(SELECT id FROM articles WHERE reference = :reference)"
+            ),
+            {"reference": reference},
+        )
+
+    def search(self, query: str, limit: int, offset: int = 0) -> List[SearchHit]:
+        """Finds articles matching all words of given query,
+        best matches first.
+
+        Parameters
+        ----------
+        query : str
+            Searched words.
+        limit : int
+            Maximum number of hits to return.
+        offset : int, optional
+            Number of best hits to skip, by default 0.
+
+        Returns
+        -------
+        List[SearchHit]
+            Matching articles with snippets of their content.
+        """
+        # Every word is quoted, so it can't be taken as FTS5 query syntax.
+        match = " ".join(
+            '"{}"'.format(word.replace('"', '""')) for word in query.split()
+        )
+        rows = self.session.execute(
+            text(
+                "SELECT reference, title, description, "
+                "-bm25(articles_search, 0.0, 10.0, 5.0, 1.0) AS rank, "
+                "snippet(articles_search, 3, :start, :end, '...', 16) AS snippet "
+                "FROM articles_search WHERE articles_search MATCH :match "
+                "ORDER BY rank DESC, rowid "
+                "LIMIT :limit OFFSET :offset"
+            ),
+            {
+                "match": match,
+                "limit": limit,
+                "offset": offset,
+                "start": _MATCH_START,
+                "end": _MATCH_END,
+            },
+        )
+        return _hits(rows)
+
+
+class AsyncSearchIndex:
+    """Asynchronous counterpart of search indexes, running their
+    queries through AsyncSession.run_sync().
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self._index = make_search_index(session.sync_session)
+
+    async def index(self, references: Iterable[str]):
+        await self._run(self._index.index, references)
+
+    async def remove(self, reference: str):
+        await self._run(self._index.remove, reference)
+
+    async def search(self, query: str, limit: int, offset: int = 0) -> List[SearchHit]:
+        return await self._run(self._index.search, query, limit, offset)
+
+    async def rebuild(self) -> int:
+        return await self._run(self._index.rebuild)
+
+    async def _run(self, method, *args):
+        return await self.session.run_sync(lambda _: method(*args))
+
+
+def make_search_index(session) -> AbstractSearchIndex:
+    """Picks search index implementation matching session's database."""
+    if session.get_bind().dialect.name == "postgresql":
+        return PostgresSearchIndex(session)
+    return SqliteSearchIndex(session)
+
+
+def _hits(rows) -> List[SearchHit]:
+    return [
+        SearchHit(**{**row._asdict(), "snippet": _highlight(row.snippet)})
+        for row in rows
+    ]
+
+
+def _highlight(snippet: Optional[str]) -> str:
+    """Escapes snippet of article's content, so it's safe to render
+    as HTML, and wraps matched words in SNIPPET_START and SNIPPET_END.
+    Article without content has empty snippet.
+    """
+    return (
+        html.escape(snippet or "")
+        .replace(_MATCH_START, SNIPPET_START)
+        .replace(_MATCH_END, SNIPPET_END)
+    )
+
+
+def _execute_in_chunks(session, statement, references: List[str]):
+    for start in range(0, len(references), IN_CLAUSE_CHUNK_SIZE):
+        end = start + IN_CLAUSE_CHUNK_SIZE
+        session.execute(statement, {"references": references[start:end]})
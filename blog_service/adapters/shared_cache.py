@@ -0,0 +1,194 @@
+import fcntl
+import logging
+import mmap
+import os
+import pickle
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Hashable, Optional, Tuple
+
+# Number of version counters. Entries hashed to the same counter
+# are invalidated together, which is safe, just less precise.
+VERSION_SLOTS = 4096
+# Expired entries are deleted once per that many writes of a process.
+PRUNE_EVERY = 1000
+
+_COUNTER = struct.Struct("<Q")
+
+logger = logging.getLogger("blog_service.shared_cache")
+
+Version = Tuple[int, int]
+
+
+class SharedCacheStore:
+    """Cache tier shared by all worker processes on one host.
+
+    Values are pickled into a SQLite file. Versions of entries are
+    counters in a memory-mapped file, which every process reads without
+    any system call. Bumping counter of an entry, or of whole namespace,
+    makes it stale for all processes at once. Pickled values are trusted,
+    so only user running the service can access cache files.
+
+    Parameters
+    ----------
+    directory : str
+        Directory of cache files, local to the host. It's created
+        accessible only by its owner. Existing one must be owned
+        by user running the service and not writable by others.
+
+    Raises
+    ------
+    PermissionError
+        When others could write to directory of cache files.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        _check_private(directory)
+        self.path = os.path.join(directory, "cache.sqlite3")
+        # SQLite creates it's journal files with permissions of the database.
+        os.close(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600))
+        self._versions_path = os.path.join(directory, "versions")
+        size = VERSION_SLOTS * _COUNTER.size
+        fd = os.open(self._versions_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            self._versions = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+        self._local = threading.local()
+        self._writes = 0
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "namespace TEXT NOT NULL, "
+            "key TEXT NOT NULL, "
+            "namespace_version INTEGER NOT NULL, "
+            "key_version INTEGER NOT NULL, "
+            "expires_at REAL NOT NULL, "
+            "value BLOB NOT NULL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+
+    def version(self, namespace: str, key: Hashable) -> Version:
+        """Returns current version of entry. Entry stored
+        with different version is stale.
+        """
+        return (
+            self._read_counter(_slot(namespace)),
+            self._read_counter(_slot(namespace, _key_text(key))),
+        )
+
+    def get(self, namespace: str, key: Hashable, version: Version) -> Tuple[bool, Any]:
+        """Returns whether entry of given version was found, and it's value."""
+        try:
+            row = (
+                self._connection()
+                .execute(
+                    "SELECT value FROM entries WHERE namespace = ? AND key = ? "
+                    "AND namespace_version = ? AND key_version = ? "
+                    "AND expires_at > ?",
+                    (namespace, _key_text(key), *version, time.time()),
+                )
+                .fetchone()
+            )
+        except sqlite3.Error:
+            logger.warning("Reading shared cache failed.", exc_info=True)
+            return False, None
+
+        if row is None:
+            return False, None
+        return True, pickle.loads(row[0])
+
+    def put(
+        self, namespace: str, key: Hashable, version: Version, value: Any, ttl: float
+    ):
+        """Stores value of entry of given version for ttl seconds."""
+        try:
+            connection = self._connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    namespace,
+                    _key_text(key),
+                    *version,
+                    time.time() + ttl,
+                    pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+                ),
+            )
+            self._writes += 1
+            if self._writes % PRUNE_EVERY == 0:
+                connection.execute(
+                    "DELETE FROM entries WHERE expires_at <= ?", (time.time(),)
+                )
+        except (sqlite3.Error, pickle.PicklingError):
+            logger.warning("Writing shared cache failed.", exc_info=True)
+
+    def bump(self, namespace: str, key: Optional[Hashable] = None):
+        """Makes entry, or all entries of namespace when key is not given,
+        stale in every process.
+        """
+        if key is None:
+            slot = _slot(namespace)
+        else:
+            slot = _slot(namespace, _key_text(key))
+
+        fd = os.open(self._versions_path, os.O_RDWR)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            offset = slot * _COUNTER.size
+            (counter,) = _COUNTER.unpack_from(self._versions, offset)
+            _COUNTER.pack_into(self._versions, offset, counter + 1)
+        finally:
+            os.close(fd)
+
+    def _read_counter(self, slot: int) -> int:
+        return _COUNTER.unpack_from(self._versions, slot * _COUNTER.size)[0]
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections can't be shared by threads nor inherited by forked workers.
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            local.connection = connection
+            local.pid = os.getpid()
+        return local.connection
+
+
+def open_store(directory: Optional[str]) -> Optional[SharedCacheStore]:
+    """Opens shared cache in given directory, if any."""
+    return SharedCacheStore(directory) if directory else None
+
+
+def _check_private(directory: str):
+    status = os.stat(directory)
+    if status.st_uid != os.geteuid() or status.st_mode & 0o022:
+        raise PermissionError(
+            f"Shared cache directory {directory} should be owned by user "
+            "running the service and writable only by it."
+        )
+
+
+def _slot(*parts: str) -> int:
+    return zlib.crc32("\0".join(parts).encode()) % VERSION_SLOTS
+
+
+def _normalize(value):
+    if isinstance(value, (set, frozenset)):
+        return sorted((_normalize(item) for item in value), key=repr)
+    if isinstance(value, (tuple, list)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def _key_text(key: Hashable) -> str:
+    """Returns the same text for equal keys in every process,
+    which isn't true for hashes and repr of sets.
+    """
+    return repr(_normalize(key))
@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 
 
@@ -16,3 +17,149 @@ def get_postgres_uri():
     db_name = "blog_db"
     uri = f"postgresql://{user}:{password}@{host}:{port}/{db_name}"
     return uri
+
+
+def get_replica_postgres_uri():
+    host = os.getenv("DB_REPLICA_HOST")
+    if not host:
+        return None
+    port = os.getenv("DB_REPLICA_PORT", os.getenv("DB_PORT", 5432))
+    password = os.getenv("DB_PASSWORD", "test123")
+    user = "blog_user"
+    db_name = "blog_db"
+    uri = f"postgresql://{user}:{password}@{host}:{port}/{db_name}"
+    return uri
+
+
+def get_async_postgres_uri():
+    return _asyncpg_uri(get_postgres_uri())
+
+
+def get_async_replica_postgres_uri():
+    uri = get_replica_postgres_uri()
+    return _asyncpg_uri(uri) if uri else None
+
+
+def _asyncpg_uri(uri):
+    return uri.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+
+def get_pool_size():
+    return int(os.getenv("DB_POOL_SIZE", 5))
+
+
+def get_pool_max_overflow():
+    return int(os.getenv("DB_POOL_MAX_OVERFLOW", 10))
+
+
+def get_pool_timeout():
+    return float(os.getenv("DB_POOL_TIMEOUT", 30))
+
+
+def get_pool_recycle():
+    return int(os.getenv("DB_POOL_RECYCLE", 1800))
+
+
+def get_pool_pre_ping():
+    return os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+
+def get_cache_max_size():
+    return int(os.getenv("CACHE_MAX_SIZE", 1024))
+
+
+def get_cache_ttl():
+    return float(os.getenv("CACHE_TTL", 60))
+
+
+def get_cache_stale_ttl():
+    return float(os.getenv("CACHE_STALE_TTL", 0))
+
+
+def get_cache_refresh_workers():
+    return int(os.getenv("CACHE_REFRESH_WORKERS", 2))
+
+
+def get_cache_load_timeout():
+    return float(os.getenv("CACHE_LOAD_TIMEOUT", 10))
+
+
+def get_shared_cache_dir():
+    return os.getenv("SHARED_CACHE_DIR") or None
+
+
+def get_query_max_repeats():
+    return int(os.getenv("QUERY_MAX_REPEATS", 10))
+
+
+def get_query_budget_strict():
+    return os.getenv("QUERY_BUDGET_STRICT", "false").lower() in ("1", "true", "yes")
+
+
+def get_web_bind():
+    return os.getenv("WEB_BIND", "0.0.0.0:80")
+
+
+def get_web_workers():
+    return int(os.getenv("WEB_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+
+
+def get_web_threads():
+    return int(os.getenv("WEB_THREADS", 4))
+
+
+def get_web_keepalive():
+    return int(os.getenv("WEB_KEEPALIVE", 5))
+
+
+def get_web_timeout():
+    return int(os.getenv("WEB_TIMEOUT", 30))
+
+
+def get_warmup_budget():
+    return float(os.getenv("WARMUP_BUDGET", 10))
+
+
+def get_warmup_pages():
+    return int(os.getenv("WARMUP_PAGES", 3))
+
+
+def get_warmup_articles():
+    return int(os.getenv("WARMUP_ARTICLES", 100))
+
+
+def get_ready_db_check_interval():
+    return float(os.getenv("READY_DB_CHECK_INTERVAL", 5))
+
+
+def get_ready_db_check_timeout():
+    return float(os.getenv("READY_DB_CHECK_TIMEOUT", 2))
+
+
+def get_ready_max_in_flight():
+    # The probe takes one of worker's threads, so other requests
+    # occupy all the rest at most.
+    return int(os.getenv("READY_MAX_IN_FLIGHT", max(get_web_threads() - 1, 1)))
+
+
+def get_async_ready_max_in_flight():
+    # Requests of asynchronous worker don't occupy threads,
+    # so they aren't limited unless the limit is set.
+    value = os.getenv("READY_MAX_IN_FLIGHT")
+    return int(value) if value else None
+
+
+def get_profile_secret():
+    return os.getenv("PROFILE_SECRET") or None
+
+
+def get_profile_sample_rate():
+    return float(os.getenv("PROFILE_SAMPLE_RATE", 0.0))
+
+
+def get_profile_dir():
+    return os.getenv("PROFILE_DIR", "/tmp/blog_service_profiles")
+
+
+def get_profile_max_files():
+    return int(os.getenv("PROFILE_MAX_FILES", 1000))
@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import FrozenSet, Optional
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class TagSnapshot:
+    """Read-only copy of a Tag value object.
+    Compares equal to Tag with the same name.
+    """
+
+    name: str
+
+    def __hash__(self) -> int:
+        return hash(self.name)
+
+    def __eq__(self, other) -> bool:
+        return self.name == other.name
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class ArticleSummary:
+    """Read-only view of an article used by listings.
+    It carries everything a list of articles shows,
+    but never the article's content.
+    Like Article entity, it's identified by it's reference.
+    """
+
+    id: int
+    reference: str
+    title: str
+    author: str
+    publication_date: Optional[date]
+    description: Optional[str]
+    updated_at: datetime
+    tags: FrozenSet[TagSnapshot] = frozenset()
+
+    def __hash__(self) -> int:
+        return hash(self.reference)
+
+    def __eq__(self, other) -> bool:
+        return self.reference == other.reference
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class ArticleSnapshot:
+    """Read-only copy of an Article entity, detached from
+    any session. Services return it instead of the entity,
+    so callers can't modify repository state by accident.
+    Like Article entity, it's identified by it's reference.
+    """
+
+    id: int
+    reference: str
+    title: str
+    author: str
+    publication_date: Optional[date]
+    description: Optional[str]
+    content: Optional[str]
+    updated_at: datetime
+    tags: FrozenSet[TagSnapshot] = frozenset()
+
+    def __hash__(self) -> int:
+        return hash(self.reference)
+
+    def __eq__(self, other) -> bool:
+        return self.reference == other.reference
+
+
+@dataclass(frozen=True, slots=True)
+class SearchHit:
+    """Article matching full-text search query, with rank of the match
+    and snippet of article's content showing matched words. Snippet
+    is HTML-escaped, with matched words wrapped in <b> tags.
+    """
+
+    reference: str
+    title: str
+    description: Optional[str]
+    rank: float
+    snippet: str
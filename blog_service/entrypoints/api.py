@@ -1,14 +1,22 @@
 from blog_service.adapters import orm
+from blog_service.entrypoints import profiling, web
+from blog_service.service_layer import unit_of_work
 from flask import Flask
 
 
 def create_app():
     orm.start_mappers()
+    # Engines are built here rather than on import, so misconfiguration
+    # shows up at startup. Pre-fork workers replace inherited pools.
+    unit_of_work.get_session_factory()
+    unit_of_work.get_read_only_session_factory()
+    web.open_shared_cache()
     app = Flask(__name__)
 
     with app.app_context():
         from .flask_app.routes import articles_blueprint
 
         app.register_blueprint(articles_blueprint)
+        profiling.init_app(app)
 
         return app
@@ -0,0 +1,38 @@
+import os
+
+from blog_service.adapters import orm
+from blog_service.entrypoints import web
+from blog_service.service_layer import unit_of_work
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.routing import Mount
+from starlette.staticfiles import StaticFiles
+
+
+def create_app():
+    """Builds ASGI application serving the same routes as Flask one,
+    but with asynchronous services, so a slow client holds
+    a coroutine instead of a worker thread.
+    Run it with `uvicorn --factory blog_service.entrypoints.asgi:create_app`.
+    """
+    orm.start_mappers()
+    unit_of_work.get_async_session_factory()
+    unit_of_work.get_async_read_only_session_factory()
+    web.open_shared_cache()
+    from .starlette_app.middleware import (
+        QueryTrackingMiddleware,
+        RequestMetricsMiddleware,
+    )
+    from .starlette_app.routes import routes
+
+    static_directory = os.path.join(os.path.dirname(__file__), "static")
+    return Starlette(
+        routes=[
+            *routes,
+            Mount("/static", StaticFiles(directory=static_directory), name="static"),
+        ],
+        middleware=[
+            Middleware(RequestMetricsMiddleware),
+            Middleware(QueryTrackingMiddleware),
+        ],
+    )
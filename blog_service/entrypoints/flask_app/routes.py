@@ -1,12 +1,75 @@
-from typing import Dict, List, Tuple
-
-from blog_service.adapters import orm
+import json
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from blog_service import config
+from blog_service.adapters import metrics, query_counter
+from blog_service.entrypoints import query_budget, readiness, serializers, web
 from blog_service.service_layer import exceptions, services, unit_of_work
-from flask import Blueprint, Flask, jsonify, request
+from flask import Blueprint, Response, current_app, g, jsonify, request
 
 articles_blueprint = Blueprint("articles_blueprint", __name__)
 
 
+@articles_blueprint.before_request
+def start_request_metrics():
+    g.metrics_labels = (request.method, _route())
+    g.metrics_started = time.perf_counter()
+    web.REQUESTS_IN_PROGRESS.inc(g.metrics_labels)
+
+
+@articles_blueprint.after_request
+def record_response_status(response: Response) -> Response:
+    g.metrics_status = str(response.status_code)
+    return response
+
+
+@articles_blueprint.teardown_request
+def record_request_metrics(exception=None):
+    """Records handled request. Requests failed with unhandled
+    exception are counted with 500 status.
+    """
+    labels = g.pop("metrics_labels", None)
+    if labels is None:
+        return
+
+    web.REQUESTS_IN_PROGRESS.dec(labels)
+    web.REQUEST_DURATION.observe(time.perf_counter() - g.metrics_started, labels)
+    web.REQUESTS.inc((*labels, g.pop("metrics_status", "500")))
+
+
+@articles_blueprint.before_request
+def start_tracking_queries():
+    g.query_stats, g.query_tracking_token = query_counter.start_tracking()
+
+
+@articles_blueprint.after_request
+def report_queries(response: Response) -> Response:
+    """Reports SQL statements executed while serving the request.
+    Statements of streamed responses, executed after this hook,
+    are not counted.
+    """
+    view = current_app.view_functions.get(request.endpoint)
+    query_budget.report(
+        request.method,
+        request.path,
+        response.status_code,
+        g.query_stats,
+        view,
+        strict=current_app.testing,
+    )
+    response.headers.update(query_budget.headers(g.query_stats))
+    return response
+
+
+@articles_blueprint.teardown_request
+def stop_tracking_queries(exception=None):
+    token = g.pop("query_tracking_token", None)
+    if token is not None:
+        query_counter.stop_tracking(token)
+
+
 @articles_blueprint.route("/health")
 def health_check() -> str:
     """Checks if API is up and running.
@@ -26,36 +89,175 @@ def health_check() -> str:
     """
 
 
+@articles_blueprint.route("/livez")
+def liveness_check() -> Tuple[Dict, int]:
+    """Checks if worker process is alive, without touching the database,
+    so it's not restarted while database is unavailable.
+
+    Returns
+    -------
+    Tuple[Dict, int]
+        Status and status code.
+    """
+    return jsonify({"status": "alive"}), 200
+
+
+@articles_blueprint.route("/readyz")
+def readiness_check() -> Tuple[Dict, int]:
+    """Checks if worker should get traffic. It shouldn't when database
+    doesn't answer, when connection pool is saturated or when too many
+    requests are in flight, so traffic is shed before latency collapses.
+    Database is checked at most once per READY_DB_CHECK_INTERVAL
+    and given up after READY_DB_CHECK_TIMEOUT. Outcome of worker's
+    warmup is reported as well.
+
+    Returns
+    -------
+    Tuple[Dict, int]
+        Status, reasons why worker isn't ready, state of each check
+        and status code, 503 when not ready.
+    """
+    saturated = web.saturated_pools(web.pool_stats())
+    engines = web.database_engines(
+        unit_of_work.get_session_factory(),
+        unit_of_work.get_read_only_session_factory(),
+    )
+    # Saturated pool would keep the probe waiting for a connection.
+    database = {
+        name: readiness.DATABASE_CHECK.check(engine)
+        for name, engine in engines.items()
+        if name not in saturated
+    }
+    # This probe is in flight as well.
+    in_flight = int(web.REQUESTS_IN_PROGRESS.total()) - 1
+    body, status = web.readiness_report(
+        saturated, database, in_flight, config.get_ready_max_in_flight()
+    )
+    return jsonify(body), status
+
+
+@articles_blueprint.route("/cache/stats")
+def get_cache_stats() -> Tuple[Dict[str, int], int]:
+    """Returns counters of articles read cache.
+
+    Returns
+    -------
+    Tuple[Dict[str, int], int]
+        Cache counters and status code.
+    """
+    return jsonify(web.read_cache.stats()), 200
+
+
+@articles_blueprint.route("/pool/stats")
+def get_pool_stats() -> Tuple[Dict, int]:
+    """Returns state and counters of database connection pools.
+    Replica's pool is reported only when read replica is configured.
+
+    Returns
+    -------
+    Tuple[Dict, int]
+        Pool statistics and status code.
+    """
+    return jsonify(web.pool_stats()), 200
+
+
+@articles_blueprint.route("/metrics")
+def get_metrics() -> Response:
+    """Returns metrics of requests, services, read cache
+    and connection pools in Prometheus text format.
+
+    Returns
+    -------
+    Response
+        Metrics in Prometheus text format.
+    """
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+
 @articles_blueprint.route("/articles")
+@query_budget.query_budget(max_queries=2)
 def get_articles() -> Tuple[Dict[str, List], int]:
-    """Returns list of all available articles.
+    """Returns a page of available articles, newest first.
+    Page size is set by `limit` query parameter and next page
+    is requested by passing returned `next_cursor` as `cursor`.
+    Articles can be filtered by repeated `tag` query parameter,
+    `match=all` requires all given tags instead of any of them.
 
     Returns
     -------
     Tuple[Dict[str, List], int]
-        All available articles and status code.
+        Page of available articles with next cursor and status code.
     """
-    uow = unit_of_work.SqlAlchemyUnitOfWork()
-    articles = services.list_articles(uow)
-    articles = [
-        {
-            "reference": article.reference,
-            "title": article.title,
-            "author": article.author,
-            "publication_date": str(article.publication_date),
-            "description": article.description,
-            "tags": [tag.name for tag in article.tags],
-        }
-        for article in articles
-    ]
-
-    response = jsonify({"articles": articles})
-    return response, 200
+    uow = unit_of_work.ReadOnlySqlAlchemyUnitOfWork()
+
+    try:
+        page = services.list_articles(
+            uow,
+            web.page_size(request.args.get("limit")),
+            request.args.get("cursor"),
+            web.read_cache,
+            request.args.getlist("tag"),
+            web.match_all(request.args.get("match")),
+        )
+    except web.CLIENT_ERRORS as e:
+        return _error(e)
+
+    etag = web.page_etag(page)
+    if web.is_not_modified(request.headers, etag):
+        return _with_validators(Response(status=304), etag), 304
+
+    return _with_validators(jsonify(web.page_to_json(page)), etag), 200
+
+
+@articles_blueprint.route("/articles/export")
+def export_articles() -> Response:
+    """Streams all articles, including their content,
+    as newline-delimited JSON.
+
+    Returns
+    -------
+    Response
+        Streamed articles, one JSON document per line.
+    """
+    uow = unit_of_work.ReadOnlySqlAlchemyUnitOfWork()
+    articles = services.export_articles(uow, web.EXPORT_BATCH_SIZE)
+    lines = (
+        json.dumps(serializers.article_to_json(article)) + "\n" for article in articles
+    )
+    return Response(lines, mimetype="application/x-ndjson")
+
+
+@articles_blueprint.route("/articles/search")
+@query_budget.query_budget(max_queries=1)
+def search_articles() -> Tuple[Dict[str, List], int]:
+    """Returns articles matching full-text search query passed
+    as `q` query parameter, best matches first. Page size is set
+    by `limit` query parameter and next page is requested by passing
+    returned `next_offset` as `offset`.
+
+    Returns
+    -------
+    Tuple[Dict[str, List], int]
+        Page of matching articles with next offset and status code.
+    """
+    try:
+        query = web.search_query(request.args.get("q"))
+    except web.CLIENT_ERRORS as e:
+        return _error(e)
+
+    limit = web.page_size(request.args.get("limit"))
+    offset = max(web.int_param(request.args.get("offset"), 0), 0)
+    uow = unit_of_work.ReadOnlySqlAlchemyUnitOfWork()
+    hits = services.search_articles(query, uow, limit + 1, offset)
+    return jsonify(web.hits_to_json(hits, limit, offset)), 200
 
 
 @articles_blueprint.route("/articles/<reference>")
+@query_budget.query_budget(max_queries=3)
 def get_article(reference: str) -> Tuple[Dict, int]:
     """Returns article for given reference.
+    When client already has current version of the article,
+    it responds with 304 without loading article's body.
 
     Parameters
     ----------
@@ -67,23 +269,24 @@ def get_article(reference: str) -> Tuple[Dict, int]:
     Tuple[Dict, int]
         Found article with status code.
     """
-    uow = unit_of_work.SqlAlchemyUnitOfWork()
+    uow = unit_of_work.ReadOnlySqlAlchemyUnitOfWork()
 
     try:
-        article = services.get_article(reference, uow)
-    except exceptions.ArticleNotFound as e:
-        return jsonify({"message": str(e)}), 404
-
-    article_json = {
-        "reference": article.reference,
-        "title": article.title,
-        "author": article.author,
-        "publication_date": str(article.publication_date),
-        "description": article.description,
-        "tags": [tag.name for tag in article.tags],
-        "content": article.content,
-    }
-    return jsonify(article_json), 200
+        last_modified = services.get_article_last_modified(
+            reference, uow, web.read_cache
+        )
+        etag = serializers.make_etag(reference, last_modified)
+        if web.is_not_modified(request.headers, etag, last_modified):
+            return _with_validators(Response(status=304), etag, last_modified), 304
+
+        article = services.get_article(reference, uow, web.read_cache)
+    except web.CLIENT_ERRORS as e:
+        return _error(e)
+
+    article_json = serializers.article_to_json(article)
+    # Article might be modified after validators were checked.
+    etag = serializers.make_etag(article.reference, article.updated_at)
+    return _with_validators(jsonify(article_json), etag, article.updated_at), 200
 
 
 @articles_blueprint.route("/articles", methods=["POST"])
@@ -98,13 +301,37 @@ def add_article() -> Tuple[dict, int]:
     uow = unit_of_work.SqlAlchemyUnitOfWork()
 
     try:
-        services.add_article(request.json, uow)
-    except exceptions.ArticleAlreadyExists as e:
-        return jsonify({"message": str(e)}), 400
+        services.add_article(request.json, uow, web.read_cache)
+    except web.CLIENT_ERRORS as e:
+        return _error(e)
 
     return jsonify({"message": "Article was added"}), 201
 
 
+@articles_blueprint.route("/articles/bulk", methods=["POST"])
+def bulk_add_articles() -> Tuple[dict, int]:
+    """Adds many articles at once. Articles are passed
+    as a list under `articles` key.
+
+    Returns
+    -------
+    Tuple[dict, int]
+        Result for each article with status code. Conflict is reported
+        when other request added one of the articles meanwhile.
+    """
+    try:
+        new_articles = web.bulk_articles(request.get_json(silent=True))
+    except web.CLIENT_ERRORS as e:
+        return _error(e)
+
+    uow = unit_of_work.SqlAlchemyUnitOfWork()
+    try:
+        results = services.bulk_add_articles(new_articles, uow, web.read_cache)
+    except exceptions.ArticleAlreadyExists as e:
+        return jsonify({"message": str(e)}), 409
+    return jsonify({"results": results}), 200
+
+
 @articles_blueprint.route("/articles/<reference>", methods=["PATCH"])
 def edit_article(reference: str) -> Tuple[dict, int]:
     """Allows to edit article associated to given reference.
@@ -122,9 +349,9 @@ def edit_article(reference: str) -> Tuple[dict, int]:
     uow = unit_of_work.SqlAlchemyUnitOfWork()
 
     try:
-        services.edit_article(reference, request.json, uow)
-    except exceptions.ArticleNotFound as e:
-        return jsonify({"message": str(e)}), 404
+        services.edit_article(reference, request.json, uow, web.read_cache)
+    except web.CLIENT_ERRORS as e:
+        return _error(e)
 
     return jsonify({"message": "Article successfully edited."}), 200
 
@@ -146,8 +373,26 @@ def remove_article(reference: str) -> Tuple[dict, int]:
     uow = unit_of_work.SqlAlchemyUnitOfWork()
 
     try:
-        services.remove_article(reference, uow)
-    except exceptions.ArticleNotFound as e:
-        return jsonify({"message": str(e)}), 404
+        services.remove_article(reference, uow, web.read_cache)
+    except web.CLIENT_ERRORS as e:
+        return _error(e)
 
     return jsonify({"message": "Article successfully removed."}), 200
+
+
+def _error(exception: Exception) -> Tuple[Dict[str, str], int]:
+    body, status = web.error(exception)
+    return jsonify(body), status
+
+
+def _with_validators(
+    response: Response, etag: str, last_modified: Optional[datetime] = None
+) -> Response:
+    response.headers.update(
+        web.validator_headers(etag, last_modified, web.read_cache.cache_control())
+    )
+    return response
+
+
+def _route() -> str:
+    return request.url_rule.rule if request.url_rule else "unmatched"
@@ -0,0 +1,35 @@
+"""Gunicorn settings for production serving. Run it with
+`gunicorn -c python:blog_service.entrypoints.gunicorn_conf
+blog_service.entrypoints.wsgi:app`.
+"""
+# Imported under other name, as `config` is a setting of gunicorn itself.
+from blog_service import config as service_config
+
+bind = service_config.get_web_bind()
+workers = service_config.get_web_workers()
+worker_class = "gthread"
+threads = service_config.get_web_threads()
+keepalive = service_config.get_web_keepalive()
+timeout = service_config.get_web_timeout()
+accesslog = "-"
+
+
+def post_worker_init(worker):
+    """Warms worker up before it accepts the first request."""
+    from blog_service.entrypoints import warmup
+
+    try:
+        result = warmup.warm_up()
+    except Exception:
+        worker.log.exception("Worker warmup failed, it starts cold.")
+        return
+
+    worker.log.info(
+        "Worker warmed up in %.3fs%s: %d connections opened, "
+        "%d pages and %d articles cached.",
+        result.seconds,
+        "" if result.complete else " until budget ran out",
+        result.connections,
+        result.pages,
+        result.articles,
+    )
@@ -0,0 +1,199 @@
+"""Opt-in profiling of single requests.
+
+A request is profiled when it carries X-Profile header signed with
+PROFILE_SECRET, or when it's sampled with PROFILE_SAMPLE_RATE.
+When neither is configured, no hooks are registered at all.
+Each profile is written to PROFILE_DIR as cProfile stats
+(readable with pstats or snakeviz) along with JSON metadata.
+Only the newest PROFILE_MAX_FILES profiles are kept, checked once
+per PRUNE_EVERY profiles written by a worker.
+
+Signed header for a request can be generated with:
+    PROFILE_SECRET=... python -m blog_service.entrypoints.profiling GET /articles
+"""
+import cProfile
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from functools import partial
+from itertools import count
+from typing import Iterator, Optional
+
+from blog_service import config
+from flask import Flask, Response, g, request
+
+HEADER = "X-Profile"
+ID_HEADER = "X-Profile-Id"
+# How long a signature stays valid, in seconds.
+SIGNATURE_TTL = 300
+# Profiles beyond PROFILE_MAX_FILES are removed once per that many
+# profiles written by a process, rather than after each of them.
+PRUNE_EVERY = 20
+
+logger = logging.getLogger("blog_service.profiling")
+
+
+def sign(secret: str, method: str, path: str, timestamp: Optional[int] = None) -> str:
+    """Returns value of X-Profile header, which requests profiling
+    of given request for the next SIGNATURE_TTL seconds.
+
+    Parameters
+    ----------
+    secret : str
+        Secret shared with the API (PROFILE_SECRET).
+    method : str
+        HTTP method of profiled request.
+    path : str
+        Path of profiled request, without query string.
+    timestamp : Optional[int], optional
+        When signature was created, by default now.
+
+    Returns
+    -------
+    str
+        Header value in `<timestamp>:<signature>` format.
+    """
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    message = f"{timestamp}:{method.upper()}:{path}".encode()
+    signature = hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+    return f"{timestamp}:{signature}"
+
+
+def is_signed(secret: str, value: str, method: str, path: str) -> bool:
+    """Checks if X-Profile header value was signed with given secret
+    for given request and isn't expired.
+    """
+    timestamp, _, _ = value.partition(":")
+    try:
+        timestamp = int(timestamp)
+    except ValueError:
+        return False
+
+    if abs(time.time() - timestamp) > SIGNATURE_TTL:
+        return False
+    return hmac.compare_digest(value, sign(secret, method, path, timestamp))
+
+
+def init_app(app: Flask):
+    """Registers profiling hooks when profiling is configured.
+
+    Parameters
+    ----------
+    app : Flask
+        Application which requests may be profiled.
+    """
+    secret = config.get_profile_secret()
+    sample_rate = config.get_profile_sample_rate()
+    if secret is None and sample_rate <= 0:
+        return
+
+    directory = config.get_profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    writes = count()
+    app.before_request(partial(_start_profiling, secret, sample_rate))
+    app.after_request(_add_profile_id)
+    app.teardown_request(
+        partial(_stop_profiling, directory, config.get_profile_max_files(), writes)
+    )
+
+
+def _start_profiling(secret: Optional[str], sample_rate: float):
+    header = request.headers.get(HEADER)
+    if header is not None and secret is not None:
+        requested = is_signed(secret, header, request.method, request.path)
+    else:
+        requested = False
+    if not requested and random.random() >= sample_rate:
+        return
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Other profiler is already active in this interpreter.
+        return
+    g.profiler = profiler
+    g.profile_started = time.perf_counter()
+    g.profile_id = (
+        f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-"
+        f"{threading.get_ident()}-{random.getrandbits(32):08x}"
+    )
+
+
+def _add_profile_id(response: Response) -> Response:
+    if "profiler" in g:
+        response.headers[ID_HEADER] = g.profile_id
+        g.profile_status = response.status_code
+    return response
+
+
+def _stop_profiling(
+    directory: str, max_files: int, writes: Iterator[int], exception=None
+):
+    profiler = g.pop("profiler", None)
+    if profiler is None:
+        return
+
+    profiler.disable()
+    duration = time.perf_counter() - g.profile_started
+    path = os.path.join(directory, g.profile_id)
+    profiler.dump_stats(f"{path}.prof")
+    metadata = {
+        "id": g.profile_id,
+        "method": request.method,
+        "path": request.path,
+        "query_string": request.query_string.decode(errors="replace"),
+        "route": request.url_rule.rule if request.url_rule else None,
+        "view_args": request.view_args or {},
+        "status": g.pop("profile_status", 500),
+        "duration": duration,
+        "pid": os.getpid(),
+    }
+    with open(f"{path}.json", "w") as file:
+        json.dump(metadata, file, indent=2)
+    logger.info("Profiled %s %s into %s.prof", request.method, request.path, path)
+    if next(writes) % PRUNE_EVERY == 0:
+        remove_oldest_profiles(directory, max_files)
+
+
+def remove_oldest_profiles(directory: str, max_files: int):
+    """Removes profiles, along with their metadata, beyond the newest
+    max_files, so profiling left on doesn't fill the disk.
+
+    Parameters
+    ----------
+    directory : str
+        Directory with profiles.
+    max_files : int
+        Number of the newest profiles to keep.
+    """
+    profiles = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".prof"):
+                continue
+            try:
+                profiles.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                # Removed by other worker meanwhile.
+                continue
+
+    profiles.sort(reverse=True)
+    for _, path in profiles[max_files:]:
+        for file in (path, f"{os.path.splitext(path)[0]}.json"):
+            try:
+                os.remove(file)
+            except FileNotFoundError:
+                pass
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or config.get_profile_secret() is None:
+        sys.exit(__doc__)
+    print(f"{HEADER}: {sign(config.get_profile_secret(), *sys.argv[1:])}")
@@ -0,0 +1,85 @@
+import logging
+from typing import Callable, Dict, Optional
+
+from blog_service import config
+from blog_service.adapters.query_counter import (
+    QueryBudgetExceeded,
+    QueryStats,
+    budget_violations,
+)
+
+logger = logging.getLogger("blog_service.queries")
+
+_UNSET = object()
+
+
+def query_budget(max_queries: Optional[int] = None, max_repeats=_UNSET) -> Callable:
+    """Declares how many SQL statements a route may execute per request.
+    Routes without declared budget are checked only for statements
+    repeated more than QUERY_MAX_REPEATS times.
+
+    Parameters
+    ----------
+    max_queries : Optional[int], optional
+        Maximum number of statements, by default None (unlimited).
+    max_repeats : Optional[int], optional
+        Maximum number of executions of the same statement,
+        by default taken from config. None disables the check.
+
+    Returns
+    -------
+    Callable
+        Decorator of a view function.
+    """
+
+    def decorator(view: Callable) -> Callable:
+        view.query_budget = (max_queries, max_repeats)
+        return view
+
+    return decorator
+
+
+def report(
+    method: str,
+    path: str,
+    status: int,
+    stats: QueryStats,
+    view: Optional[Callable],
+    strict: bool = False,
+):
+    """Logs statements executed while serving a request and checks them
+    against route's query budget.
+
+    Raises
+    ------
+    QueryBudgetExceeded
+        Raised in strict mode (e.g. in tests) when budget is exceeded,
+        otherwise exceeding is logged as a warning.
+    """
+    logger.info(
+        "%s %s %s queries=%d query_time=%.2fms",
+        method,
+        path,
+        status,
+        stats.count,
+        stats.duration * 1000,
+    )
+    max_queries, max_repeats = getattr(view, "query_budget", (None, _UNSET))
+    if max_repeats is _UNSET:
+        max_repeats = config.get_query_max_repeats()
+
+    violations = budget_violations(stats, max_queries, max_repeats)
+    if not violations:
+        return
+
+    message = f"{method} {path} exceeded query budget. " + " ".join(violations)
+    if strict or config.get_query_budget_strict():
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def headers(stats: QueryStats) -> Dict[str, str]:
+    return {
+        "X-Query-Count": str(stats.count),
+        "X-Query-Time": f"{stats.duration * 1000:.2f}ms",
+    }
@@ -0,0 +1,224 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from blog_service import config
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+NOT_STARTED = "not_started"
+RUNNING = "running"
+COMPLETE = "complete"
+BUDGET_EXHAUSTED = "budget_exhausted"
+FAILED = "failed"
+
+
+class WarmupProgress:
+    """Progress of worker's warmup, reported by readiness endpoint.
+    Warmup runs before worker accepts requests, so probes see only
+    how it ended. Partial or failed warmup leaves worker cold,
+    but still able to serve, so it doesn't make worker unready.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = NOT_STARTED
+        self._stage: Optional[str] = None
+        self._prepared: Dict[str, int] = {}
+        self._started: Optional[float] = None
+        self._seconds: Optional[float] = None
+        self._error: Optional[str] = None
+
+    def start(self):
+        with self._lock:
+            self._state = RUNNING
+            self._stage = None
+            self._prepared = {}
+            self._started = time.perf_counter()
+            self._seconds = None
+            self._error = None
+
+    def advance(self, stage: str, **prepared: int):
+        """Records current stage and how much was prepared so far."""
+        with self._lock:
+            self._stage = stage
+            self._prepared.update(prepared)
+
+    def finish(self, complete: bool):
+        with self._lock:
+            self._state = COMPLETE if complete else BUDGET_EXHAUSTED
+            self._stage = None
+            self._seconds = time.perf_counter() - self._started
+
+    def fail(self, error: BaseException):
+        with self._lock:
+            self._state = FAILED
+            self._seconds = time.perf_counter() - self._started
+            self._error = f"{type(error).__name__}: {error}"
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            seconds = self._seconds
+            if seconds is None and self._started is not None:
+                seconds = time.perf_counter() - self._started
+            return {
+                "state": self._state,
+                "stage": self._stage,
+                "prepared": dict(self._prepared),
+                "seconds": seconds,
+                "error": self._error,
+            }
+
+
+WARMUP = WarmupProgress()
+
+
+class DatabaseCheck:
+    """Checks that database answers `SELECT 1`, at most once per interval
+    for each engine, so frequent probes of many load balancers don't load
+    the database. Probes arriving while other one checks get it's
+    previous result instead of waiting.
+
+    Check is given up after timeout, so unresponsive database fails
+    the probe rather than hangs it. Until the given up check finishes,
+    later ones wait for it instead of opening more connections.
+
+    Parameters
+    ----------
+    interval : float
+        How long result of a check is reused, in seconds.
+    timeout : float, optional
+        How long to wait for database to answer, in seconds,
+        by default READY_DB_CHECK_TIMEOUT.
+    """
+
+    def __init__(self, interval: float, timeout: Optional[float] = None):
+        self.interval = interval
+        self.timeout = (
+            config.get_ready_db_check_timeout() if timeout is None else timeout
+        )
+        self._lock = threading.Lock()
+        # Time of the last check and it's error, by engine.
+        self._results: Dict[Engine, Tuple[float, Optional[str]]] = {}
+        self._pending: Dict[Engine, Union[Future, asyncio.Future]] = {}
+        self._checking: Dict[AsyncEngine, asyncio.Task] = {}
+
+    def check(self, engine: Engine) -> Dict:
+        """Returns whether database is reachable, why not
+        and how old the result is.
+        """
+        result = self._results.get(engine)
+        if result is None or time.monotonic() - result[0] >= self.interval:
+            if self._lock.acquire(blocking=result is None):
+                try:
+                    result = self._check(engine)
+                finally:
+                    self._lock.release()
+
+        checked_at, error = result
+        return {
+            "ok": error is None,
+            "error": error,
+            "age": time.monotonic() - checked_at,
+        }
+
+    def _check(self, engine: Engine) -> Tuple[float, Optional[str]]:
+        result = self._results.get(engine)
+        if result is not None and time.monotonic() - result[0] < self.interval:
+            # Checked by other probe while this one waited.
+            return result
+
+        pending = self._pending.get(engine)
+        if pending is None or pending.done():
+            pending = self._pending[engine] = run_in_thread(_select_one, engine)
+        try:
+            pending.result(self.timeout)
+            error = None
+        except TimeoutError:
+            error = f"Database didn't answer within {self.timeout}s."
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        result = self._results[engine] = (time.monotonic(), error)
+        return result
+
+    async def check_async(self, engine: AsyncEngine) -> Dict:
+        """Like `check`, but for engine of asynchronous services,
+        so the event loop isn't blocked while database answers.
+        """
+        result = self._results.get(engine)
+        if result is None or time.monotonic() - result[0] >= self.interval:
+            checking = self._checking.get(engine)
+            if checking is None:
+                checking = asyncio.ensure_future(self._check_async(engine))
+                self._checking[engine] = checking
+                checking.add_done_callback(lambda _: self._checking.pop(engine))
+                result = await asyncio.shield(checking)
+            elif result is None:
+                result = await asyncio.shield(checking)
+
+        checked_at, error = result
+        return {
+            "ok": error is None,
+            "error": error,
+            "age": time.monotonic() - checked_at,
+        }
+
+    async def _check_async(self, engine: AsyncEngine) -> Tuple[float, Optional[str]]:
+        pending = self._pending.get(engine)
+        if pending is None or pending.done():
+            pending = asyncio.ensure_future(_select_one_async(engine))
+            self._pending[engine] = pending
+        try:
+            await asyncio.wait_for(asyncio.shield(pending), self.timeout)
+            error = None
+        except asyncio.TimeoutError:
+            error = f"Database didn't answer within {self.timeout}s."
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        result = self._results[engine] = (time.monotonic(), error)
+        return result
+
+
+def _select_one(engine: Engine):
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+async def _select_one_async(engine: AsyncEngine):
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+def run_in_thread(function: Callable, *args) -> Future:
+    """Calls function in a new daemon thread, so caller can stop waiting
+    for it's result. Unlike threads of an executor, thread stuck
+    on unresponsive database doesn't keep the process from exiting.
+    Function runs in caller's context, so it's queries are tracked.
+    """
+    future: Future = Future()
+
+    def run():
+        try:
+            future.set_result(function(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(run,), daemon=True).start()
+    return future
+
+
+def pool_saturated(stats: Optional[Dict]) -> bool:
+    """Checks if every connection of pool is in use and requests
+    queue for one, so latency grows with every new request.
+    """
+    if stats is None or "max_connections" not in stats:
+        return False
+    return stats["checked_out"] >= stats["max_connections"] and stats["waiting"] > 0
+
+
+DATABASE_CHECK = DatabaseCheck(config.get_ready_db_check_interval())
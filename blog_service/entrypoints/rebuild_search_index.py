@@ -0,0 +1,17 @@
+"""Indexes all stored articles for full-text search. Services index
+articles as they're changed, so it's needed once for articles stored
+before search index was introduced, or after index was lost:
+    python -m blog_service.entrypoints.rebuild_search_index
+"""
+from blog_service.adapters import orm
+from blog_service.service_layer import services, unit_of_work
+
+
+def main():
+    orm.start_mappers()
+    count = services.rebuild_search_index(unit_of_work.SqlAlchemyUnitOfWork())
+    print(f"Indexed {count} articles.")
+
+
+if __name__ == "__main__":
+    main()
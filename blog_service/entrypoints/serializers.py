@@ -0,0 +1,34 @@
+import hashlib
+from typing import Dict
+
+from blog_service.domain.read_models import ArticleSnapshot, ArticleSummary, SearchHit
+
+
+def summary_to_json(article: ArticleSummary) -> Dict:
+    return {
+        "reference": article.reference,
+        "title": article.title,
+        "author": article.author,
+        "publication_date": str(article.publication_date),
+        "description": article.description,
+        "tags": [tag.name for tag in article.tags],
+    }
+
+
+def article_to_json(article: ArticleSnapshot) -> Dict:
+    return {**summary_to_json(article), "content": article.content}
+
+
+def hit_to_json(hit: SearchHit) -> Dict:
+    return {
+        "reference": hit.reference,
+        "title": hit.title,
+        "description": hit.description,
+        "snippet": hit.snippet,
+        "rank": hit.rank,
+    }
+
+
+def make_etag(*parts) -> str:
+    """Builds strong ETag from values identifying version of a resource."""
+    return hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()
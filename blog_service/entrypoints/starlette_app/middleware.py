@@ -0,0 +1,67 @@
+import time
+
+from blog_service.adapters import query_counter
+from blog_service.entrypoints import query_budget, web
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Match
+
+
+class RequestMetricsMiddleware(BaseHTTPMiddleware):
+    """Records requests, their duration and requests in flight,
+    like flask_app routes do. Requests failed with unhandled
+    exception are counted with 500 status.
+    """
+
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        labels = (request.method, _route(request))
+        status = "500"
+        started = time.perf_counter()
+        web.REQUESTS_IN_PROGRESS.inc(labels)
+        try:
+            response = await call_next(request)
+            status = str(response.status_code)
+        finally:
+            web.REQUESTS_IN_PROGRESS.dec(labels)
+            web.REQUEST_DURATION.observe(time.perf_counter() - started, labels)
+            web.REQUESTS.inc((*labels, status))
+        return response
+
+
+class QueryTrackingMiddleware(BaseHTTPMiddleware):
+    """Reports SQL statements executed while serving each request,
+    like flask_app routes do. Statements of streamed responses,
+    executed after the response is returned, are not counted.
+    """
+
+    def __init__(self, app, strict: bool = False):
+        super().__init__(app)
+        self.strict = strict
+
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        with query_counter.track_queries() as stats:
+            response = await call_next(request)
+
+        query_budget.report(
+            request.method,
+            request.url.path,
+            response.status_code,
+            stats,
+            request.scope.get("endpoint"),
+            self.strict,
+        )
+        response.headers.update(query_budget.headers(stats))
+        return response
+
+
+def _route(request: Request) -> str:
+    for route in request.app.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
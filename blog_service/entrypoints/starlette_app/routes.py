@@ -0,0 +1,253 @@
+import json
+from datetime import datetime
+from typing import Optional
+
+from blog_service import config
+from blog_service.adapters import metrics
+from blog_service.entrypoints import query_budget, readiness, serializers, web
+from blog_service.service_layer import async_services, exceptions, unit_of_work
+from starlette.requests import Request
+from starlette.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+
+async def health_check(request: Request) -> HTMLResponse:
+    """Checks if API is up and running."""
+    return HTMLResponse(
+        """
+        <center>
+        <div>
+            <h1>Hoooray! We are online!</h1>
+            <img src="./static/kukulek.JPG">
+        </div>
+        </center>
+    """
+    )
+
+
+async def liveness_check(request: Request) -> JSONResponse:
+    """Checks if worker process is alive, without touching the database,
+    so it's not restarted while database is unavailable.
+    """
+    return JSONResponse({"status": "alive"})
+
+
+async def readiness_check(request: Request) -> JSONResponse:
+    """Checks if worker should get traffic, like flask_app's probe does.
+    Requests of asynchronous worker don't occupy threads, so their number
+    in flight is limited only when READY_MAX_IN_FLIGHT is set.
+    """
+    saturated = web.saturated_pools(web.pool_stats())
+    engines = web.database_engines(
+        unit_of_work.get_async_session_factory(),
+        unit_of_work.get_async_read_only_session_factory(),
+    )
+    # Saturated pool would keep the probe waiting for a connection.
+    database = {
+        name: await readiness.DATABASE_CHECK.check_async(engine)
+        for name, engine in engines.items()
+        if name not in saturated
+    }
+    # This probe is in flight as well.
+    in_flight = int(web.REQUESTS_IN_PROGRESS.total()) - 1
+    body, status = web.readiness_report(
+        saturated, database, in_flight, config.get_async_ready_max_in_flight()
+    )
+    return JSONResponse(body, status)
+
+
+async def get_cache_stats(request: Request) -> JSONResponse:
+    """Returns counters of articles read cache."""
+    return JSONResponse(web.read_cache.stats())
+
+
+async def get_pool_stats(request: Request) -> JSONResponse:
+    """Returns state and counters of database connection pools.
+    Replica's pool is reported only when read replica is configured.
+    """
+    return JSONResponse(web.pool_stats())
+
+
+async def get_metrics(request: Request) -> Response:
+    """Returns metrics of requests, services, read cache
+    and connection pools in Prometheus text format.
+    """
+    return Response(
+        metrics.REGISTRY.render(), headers={"Content-Type": metrics.CONTENT_TYPE}
+    )
+
+
+@query_budget.query_budget(max_queries=2)
+async def get_articles(request: Request) -> Response:
+    """Returns a page of available articles, newest first,
+    optionally filtered by repeated `tag` query parameter.
+    """
+    uow = unit_of_work.AsyncReadOnlySqlAlchemyUnitOfWork()
+
+    try:
+        page = await async_services.list_articles(
+            uow,
+            web.page_size(request.query_params.get("limit")),
+            request.query_params.get("cursor"),
+            web.read_cache,
+            request.query_params.getlist("tag"),
+            web.match_all(request.query_params.get("match")),
+        )
+    except web.CLIENT_ERRORS as e:
+        return _error(e)
+
+    etag = web.page_etag(page)
+    if web.is_not_modified(request.headers, etag):
+        return _with_validators(Response(status_code=304), etag)
+
+    return _with_validators(JSONResponse(web.page_to_json(page)), etag)
+
+
+async def export_articles(request: Request) -> StreamingResponse:
+    """Streams all articles, including their content,
+    as newline-delimited JSON.
+    """
+    uow = unit_of_work.AsyncReadOnlySqlAlchemyUnitOfWork()
+    articles = async_services.export_articles(uow, web.EXPORT_BATCH_SIZE)
+    lines = (
+        json.dumps(serializers.article_to_json(article)) + "\n"
+        async for article in articles
+    )
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+@query_budget.query_budget(max_queries=1)
+async def search_articles(request: Request) -> JSONResponse:
+    """Returns articles matching full-text search query passed
+    as `q` query parameter, best matches first.
+    """
+    try:
+        query = web.search_query(request.query_params.get("q"))
+    except web.CLIENT_ERRORS as e:
+        return _error(e)
+
+    limit = web.page_size(request.query_params.get("limit"))
+    offset = max(web.int_param(request.query_params.get("offset"), 0), 0)
+    uow = unit_of_work.AsyncReadOnlySqlAlchemyUnitOfWork()
+    hits = await async_services.search_articles(query, uow, limit + 1, offset)
+    return JSONResponse(web.hits_to_json(hits, limit, offset))
+
+
+@query_budget.query_budget(max_queries=3)
+async def get_article(request: Request) -> Response:
+    """Returns article for given reference. When client already has
+    current version of the article, it responds with 304.
+    """
+    reference = request.path_params["reference"]
+    uow = unit_of_work.AsyncReadOnlySqlAlchemyUnitOfWork()
+
+    try:
+        last_modified = await async_services.get_article_last_modified(
+            reference, uow, web.read_cache
+        )
+        etag = serializers.make_etag(reference, last_modified)
+        if web.is_not_modified(request.headers, etag, last_modified):
+            return _with_validators(Response(status_code=304), etag, last_modified)
+
+        article = await async_services.get_article(reference, uow, web.read_cache)
+    except web.CLIENT_ERRORS as e:
+        return _error(e)
+
+    response = JSONResponse(serializers.article_to_json(article))
+    etag = serializers.make_etag(article.reference, article.updated_at)
+    return _with_validators(response, etag, article.updated_at)
+
+
+async def add_article(request: Request) -> JSONResponse:
+    """Adds new article."""
+    uow = unit_of_work.AsyncSqlAlchemyUnitOfWork()
+
+    try:
+        await async_services.add_article(await request.json(), uow, web.read_cache)
+    except web.CLIENT_ERRORS as e:
+        return _error(e)
+
+    return JSONResponse({"message": "Article was added"}, status_code=201)
+
+
+async def bulk_add_articles(request: Request) -> JSONResponse:
+    """Adds many articles at once. Articles are passed
+    as a list under `articles` key.
+    """
+    try:
+        body = await request.json()
+    except ValueError:
+        body = None
+    try:
+        new_articles = web.bulk_articles(body)
+    except web.CLIENT_ERRORS as e:
+        return _error(e)
+
+    uow = unit_of_work.AsyncSqlAlchemyUnitOfWork()
+    try:
+        results = await async_services.bulk_add_articles(
+            new_articles, uow, web.read_cache
+        )
+    except exceptions.ArticleAlreadyExists as e:
+        return JSONResponse({"message": str(e)}, status_code=409)
+    return JSONResponse({"results": results})
+
+
+async def edit_article(request: Request) -> JSONResponse:
+    """Allows to edit article associated to given reference."""
+    reference = request.path_params["reference"]
+    uow = unit_of_work.AsyncSqlAlchemyUnitOfWork()
+
+    try:
+        await async_services.edit_article(
+            reference, await request.json(), uow, web.read_cache
+        )
+    except web.CLIENT_ERRORS as e:
+        return _error(e)
+
+    return JSONResponse({"message": "Article successfully edited."})
+
+
+async def remove_article(request: Request) -> JSONResponse:
+    """Allow to remove article associated to given reference."""
+    reference = request.path_params["reference"]
+    uow = unit_of_work.AsyncSqlAlchemyUnitOfWork()
+
+    try:
+        await async_services.remove_article(reference, uow, web.read_cache)
+    except web.CLIENT_ERRORS as e:
+        return _error(e)
+
+    return JSONResponse({"message": "Article successfully removed."})
+
+
+routes = [
+    Route("/health", health_check),
+    Route("/livez", liveness_check),
+    Route("/readyz", readiness_check),
+    Route("/cache/stats", get_cache_stats),
+    Route("/pool/stats", get_pool_stats),
+    Route("/metrics", get_metrics),
+    Route("/articles", get_articles),
+    Route("/articles", add_article, methods=["POST"]),
+    Route("/articles/export", export_articles),
+    Route("/articles/search", search_articles),
+    Route("/articles/bulk", bulk_add_articles, methods=["POST"]),
+    Route("/articles/{reference}", get_article),
+    Route("/articles/{reference}", edit_article, methods=["PATCH"]),
+    Route("/articles/{reference}", remove_article, methods=["DELETE"]),
+]
+
+
+def _error(exception: Exception) -> JSONResponse:
+    body, status = web.error(exception)
+    return JSONResponse(body, status_code=status)
+
+
+def _with_validators(
+    response: Response, etag: str, last_modified: Optional[datetime] = None
+) -> Response:
+    response.headers.update(
+        web.validator_headers(etag, last_modified, web.read_cache.cache_control())
+    )
+    return response
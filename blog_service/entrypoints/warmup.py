@@ -0,0 +1,180 @@
+import time
+from concurrent.futures import Future, TimeoutError
+from dataclasses import dataclass
+from typing import Optional
+
+from blog_service import config
+from blog_service.service_layer import services, unit_of_work
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import configure_mappers, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from . import readiness, web
+
+
+@dataclass(frozen=True)
+class WarmupResult:
+    seconds: float
+    connections: int
+    pages: int
+    articles: int
+    complete: bool
+
+
+class _Deadline:
+    def __init__(self, budget: float):
+        self._at = time.perf_counter() + budget
+
+    @property
+    def passed(self) -> bool:
+        return time.perf_counter() >= self._at
+
+    @property
+    def remaining(self) -> float:
+        return max(self._at - time.perf_counter(), 0.0)
+
+
+def warm_up(
+    budget: Optional[float] = None,
+    pages: Optional[int] = None,
+    articles: Optional[int] = None,
+) -> WarmupResult:
+    """Prepares worker for traffic, so first requests don't pay
+    for configuring mappers, opening database connections and filling
+    caches. Mappers are already started by create_app(). Work stops
+    once budget is spent, leaving the rest cold. Progress is reported
+    through readiness.WARMUP.
+
+    Parameters
+    ----------
+    budget : Optional[float], optional
+        Time limit in seconds, by default WARMUP_BUDGET.
+    pages : Optional[int], optional
+        Number of the first pages of articles to cache,
+        by default WARMUP_PAGES.
+    articles : Optional[int], optional
+        Number of the newest articles to cache, by default WARMUP_ARTICLES.
+
+    Returns
+    -------
+    WarmupResult
+        How long warmup took, what it prepared and whether
+        it was finished within budget.
+
+    Raises
+    ------
+    Exception
+        Any error raised while database is unavailable.
+    """
+    budget = config.get_warmup_budget() if budget is None else budget
+    pages = config.get_warmup_pages() if pages is None else pages
+    articles = config.get_warmup_articles() if articles is None else articles
+
+    progress = readiness.WARMUP
+    progress.start()
+    started = time.perf_counter()
+    deadline = _Deadline(budget)
+    try:
+        progress.advance("mappers")
+        configure_mappers()
+        progress.advance("connections")
+        connections = _open_connections(
+            deadline,
+            unit_of_work.get_session_factory(),
+            unit_of_work.get_read_only_session_factory(),
+        )
+        progress.advance("read_cache", connections=connections)
+        cached_pages, cached_articles = _prime_read_cache(deadline, pages, articles)
+    except Exception as e:
+        progress.fail(e)
+        raise
+
+    complete = not deadline.passed
+    progress.finish(complete)
+    return WarmupResult(
+        time.perf_counter() - started,
+        connections,
+        cached_pages,
+        cached_articles,
+        complete,
+    )
+
+
+def _open_connections(deadline: _Deadline, *session_factories: sessionmaker) -> int:
+    """Fills pool of each engine up to it's size. Connecting
+    to unresponsive database is given up when budget is spent.
+    """
+    engines = {factory.kw["bind"] for factory in session_factories}
+    connections = []
+    try:
+        for engine in engines:
+            size = engine.pool.size() if isinstance(engine.pool, QueuePool) else 1
+            for _ in range(size):
+                connection = _connect(engine, deadline)
+                if connection is None:
+                    return len(connections)
+                connections.append(connection)
+        return len(connections)
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+def _connect(engine: Engine, deadline: _Deadline) -> Optional[Connection]:
+    """Opens connection of engine, unless budget runs out first.
+    Connection opened too late is returned to the pool.
+    """
+    if deadline.passed:
+        return None
+    pending = readiness.run_in_thread(engine.connect)
+    try:
+        return pending.result(deadline.remaining)
+    except TimeoutError:
+        pending.add_done_callback(_close_late_connection)
+        return None
+
+
+def _close_late_connection(pending: Future):
+    if pending.exception() is None:
+        pending.result().close()
+
+
+def _prime_read_cache(deadline: _Deadline, pages: int, articles: int):
+    """Caches the first pages of articles, as GET /articles requests them,
+    and the newest articles. Articles are listed newest first, so pages
+    are followed until both limits are reached, though pages past
+    the first ones aren't cached.
+
+    Returns
+    -------
+    Tuple[int, int]
+        Numbers of cached pages and articles.
+    """
+    cached_pages = cached_articles = 0
+    cursor = None
+    while not deadline.passed and (cached_pages < pages or cached_articles < articles):
+        page = services.list_articles(
+            unit_of_work.ReadOnlySqlAlchemyUnitOfWork(),
+            web.DEFAULT_PAGE_SIZE,
+            cursor,
+            web.read_cache if cached_pages < pages else None,
+        )
+        cached_pages = min(cached_pages + 1, pages)
+
+        for article in page.articles:
+            if cached_articles >= articles or deadline.passed:
+                break
+            services.get_article(
+                article.reference,
+                unit_of_work.ReadOnlySqlAlchemyUnitOfWork(),
+                web.read_cache,
+            )
+            cached_articles += 1
+
+        readiness.WARMUP.advance(
+            "read_cache", pages=cached_pages, articles=cached_articles
+        )
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    return cached_pages, cached_articles
@@ -0,0 +1,336 @@
+"""Parts of HTTP routes that don't depend on web framework. Both
+flask_app and starlette_app routes are built from them, so the two
+entrypoints parse requests, validate caches and report errors alike.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from blog_service import config
+from blog_service.adapters import metrics, shared_cache
+from blog_service.domain.read_models import SearchHit
+from blog_service.service_layer import cache, exceptions, unit_of_work
+from blog_service.service_layer.pagination import Page
+from sqlalchemy.orm import sessionmaker
+from werkzeug.http import http_date, parse_date, parse_etags
+
+from . import readiness, serializers
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+EXPORT_BATCH_SIZE = 500
+
+# Shared by routes of both entrypoints, a process serves only one of them.
+# Store shared by workers is attached by open_shared_cache().
+read_cache = cache.ReadCache(
+    config.get_cache_max_size(),
+    config.get_cache_ttl(),
+    load_timeout=config.get_cache_load_timeout(),
+    stale_ttl=config.get_cache_stale_ttl(),
+    refresh_workers=config.get_cache_refresh_workers(),
+)
+
+
+REQUESTS = metrics.Counter(
+    "blog_http_requests_total",
+    "Handled HTTP requests.",
+    ("method", "route", "status"),
+)
+REQUEST_DURATION = metrics.Histogram(
+    "blog_http_request_duration_seconds",
+    "Time spent handling HTTP requests.",
+    ("method", "route"),
+)
+REQUESTS_IN_PROGRESS = metrics.Gauge(
+    "blog_http_requests_in_progress",
+    "HTTP requests being handled.",
+    ("method", "route"),
+)
+
+
+class BadRequest(Exception):
+    pass
+
+
+# Status codes of errors caused by client, by exception type.
+ERROR_STATUSES = {
+    BadRequest: 400,
+    exceptions.InvalidCursor: 400,
+    exceptions.InvalidPublicationDate: 400,
+    exceptions.ArticleAlreadyExists: 400,
+    exceptions.ArticleNotFound: 404,
+}
+CLIENT_ERRORS = tuple(ERROR_STATUSES)
+
+
+def open_shared_cache():
+    """Attaches store shared by workers of the host to read cache,
+    when SHARED_CACHE_DIR is set. It's called by create_app() of both
+    entrypoints, so importing routes doesn't touch the filesystem.
+    """
+    if read_cache.shared is None:
+        read_cache.shared = shared_cache.open_store(config.get_shared_cache_dir())
+
+
+def error(exception: Exception) -> Tuple[Dict[str, str], int]:
+    """Returns body and status code of response to a client error."""
+    for exception_type, status in ERROR_STATUSES.items():
+        if isinstance(exception, exception_type):
+            return {"message": str(exception)}, status
+    raise exception
+
+
+def int_param(value: Optional[str], default: int) -> int:
+    try:
+        return int(value) if value is not None else default
+    except ValueError:
+        return default
+
+
+def page_size(limit: Optional[str]) -> int:
+    """Returns size of requested page, within allowed bounds."""
+    return min(max(int_param(limit, DEFAULT_PAGE_SIZE), 1), MAX_PAGE_SIZE)
+
+
+def match_all(match: Optional[str]) -> bool:
+    """Tells whether articles must have all requested tags.
+
+    Raises
+    ------
+    BadRequest
+        Raised when match is neither 'any' nor 'all'.
+    """
+    match = match or "any"
+    if match not in ("any", "all"):
+        raise BadRequest("Match should be either 'any' or 'all'.")
+    return match == "all"
+
+
+def search_query(query: Optional[str]) -> str:
+    """Returns searched words.
+
+    Raises
+    ------
+    BadRequest
+        Raised when no words are given.
+    """
+    query = (query or "").strip()
+    if not query:
+        raise BadRequest("Search query is required.")
+    return query
+
+
+def bulk_articles(body: Any) -> List:
+    """Returns articles of bulk import request's body. Articles themselves
+    are validated by service, which reports each invalid one.
+
+    Raises
+    ------
+    BadRequest
+        Raised when body isn't an object with list of articles.
+    """
+    articles = body.get("articles") if isinstance(body, dict) else None
+    if not isinstance(articles, list):
+        raise BadRequest("List of articles is required.")
+    return articles
+
+
+def page_to_json(page: Page) -> Dict:
+    articles = [serializers.summary_to_json(article) for article in page.articles]
+    return {"articles": articles, "next_cursor": page.next_cursor}
+
+
+def hits_to_json(hits: List[SearchHit], limit: int, offset: int) -> Dict:
+    """Serializes a page of hits, searched with one extra hit
+    that tells whether there is a next page at all.
+    """
+    next_offset = offset + limit if len(hits) > limit else None
+    hits = [serializers.hit_to_json(hit) for hit in hits[:limit]]
+    return {"hits": hits, "next_offset": next_offset}
+
+
+def page_etag(page: Page) -> str:
+    return serializers.make_etag(
+        page.next_cursor,
+        *(f"{article.reference}@{article.updated_at}" for article in page.articles),
+    )
+
+
+def is_not_modified(
+    headers: Mapping[str, str], etag: str, last_modified: Optional[datetime] = None
+) -> bool:
+    """Checks conditional headers of a request against validators
+    of requested resource. If-None-Match takes precedence
+    over If-Modified-Since and ETags are compared weakly,
+    like RFC 7232 requires.
+
+    Parameters
+    ----------
+    headers : Mapping[str, str]
+        Request's headers, looked up case-insensitively.
+    etag : str
+        Current ETag of the resource, without quotes.
+    last_modified : Optional[datetime], optional
+        When resource was modified (UTC), by default None.
+
+    Returns
+    -------
+    bool
+        True when client's copy of the resource is current.
+    """
+    if_none_match = headers.get("If-None-Match")
+    if if_none_match:
+        return parse_etags(if_none_match).contains_weak(etag)
+
+    if_modified_since = parse_date(headers.get("If-Modified-Since"))
+    if last_modified is not None and if_modified_since is not None:
+        # HTTP dates have one second precision.
+        last_modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+        return last_modified <= if_modified_since
+
+    return False
+
+
+def validator_headers(
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: Optional[str] = None,
+) -> Dict[str, str]:
+    """Returns headers which let clients validate their copy
+    of a resource and tell HTTP caches how long to keep it.
+    """
+    headers = {"ETag": f'"{etag}"'}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified.replace(tzinfo=timezone.utc))
+    if cache_control is not None:
+        headers["Cache-Control"] = cache_control
+    return headers
+
+
+def pool_stats() -> Dict[str, Optional[Dict]]:
+    """Returns statistics of connection pools of the served entrypoint.
+    A process serves only one of them, so pools of the other one
+    have no engine. Replica's pool is reported only when read replica
+    is configured.
+    """
+    if (
+        unit_of_work.async_pool_metrics.engine is not None
+        and unit_of_work.pool_metrics.engine is None
+    ):
+        primary = unit_of_work.async_pool_metrics
+        replica = unit_of_work.async_replica_pool_metrics
+    else:
+        primary = unit_of_work.pool_metrics
+        replica = unit_of_work.replica_pool_metrics
+    return {
+        "primary": primary.stats(),
+        "replica": replica.stats() if replica.engine else None,
+    }
+
+
+def saturated_pools(pools: Dict[str, Optional[Dict]]) -> List[str]:
+    return [name for name, stats in pools.items() if readiness.pool_saturated(stats)]
+
+
+def database_engines(
+    session_factory: sessionmaker, read_only_session_factory: sessionmaker
+) -> Dict[str, Any]:
+    """Returns engines checked by readiness probe, by name. Replica
+    is checked only when it's a different database than primary.
+    """
+    engines = {"primary": session_factory.kw["bind"]}
+    replica = read_only_session_factory.kw["bind"]
+    if replica is not engines["primary"]:
+        engines["replica"] = replica
+    return engines
+
+
+def readiness_report(
+    saturated: List[str],
+    database: Dict[str, Dict],
+    in_flight: int,
+    max_in_flight: Optional[int],
+) -> Tuple[Dict, int]:
+    """Tells whether worker should get traffic. It shouldn't when
+    database doesn't answer, when connection pool is saturated or when
+    too many requests are in flight, so traffic is shed before latency
+    collapses. Outcome of worker's warmup is reported as well.
+
+    Parameters
+    ----------
+    saturated : List[str]
+        Names of saturated connection pools.
+    database : Dict[str, Dict]
+        Results of database checks, by engine's name.
+    in_flight : int
+        Requests being handled, besides the probe.
+    max_in_flight : Optional[int]
+        Limit of requests in flight, None when unlimited.
+
+    Returns
+    -------
+    Tuple[Dict, int]
+        Status, reasons why worker isn't ready, state of each check
+        and status code, 503 when not ready.
+    """
+    reasons = []
+    if saturated:
+        reasons.append("pool_saturated")
+    if not all(result["ok"] for result in database.values()):
+        reasons.append("database_unavailable")
+    if max_in_flight is not None and in_flight >= max_in_flight:
+        reasons.append("too_many_requests")
+
+    body = {
+        "status": "not_ready" if reasons else "ready",
+        "reasons": reasons,
+        "warmup": readiness.WARMUP.snapshot(),
+        "database": database,
+        "saturated_pools": saturated,
+        "in_flight": in_flight,
+        "max_in_flight": max_in_flight,
+    }
+    return body, 503 if reasons else 200
+
+
+metrics.StatsCollector(
+    "blog_cache",
+    "cache",
+    lambda: {"read": read_cache.stats()},
+    counters={
+        "hits": "Lookups served from cache.",
+        "misses": "Lookups that had to load value.",
+        "evictions": "Entries evicted, because cache was full.",
+        "expirations": "Entries dropped, because they expired.",
+        "shared_hits": "Lookups served from cache shared by workers.",
+        "coalesced": "Lookups that waited for the same entry being loaded.",
+        "coalescing_timeouts": "Lookups that stopped waiting and loaded entry.",
+        "stale_hits": "Lookups served with stale entry, refreshed in background.",
+        "refreshes": "Stale entries refreshed in background.",
+        "refresh_errors": "Failed background refreshes of stale entries.",
+    },
+    gauges={
+        "size": "Cached entries.",
+        "max_size": "Maximum number of cached entries.",
+    },
+)
+metrics.StatsCollector(
+    "blog_db_pool",
+    "pool",
+    pool_stats,
+    counters={
+        "connects": "Opened database connections.",
+        "checkouts": "Connections checked out from pool.",
+        "checkins": "Connections returned to pool.",
+        "invalidations": "Connections invalidated.",
+        "timeouts": "Checkouts that timed out waiting for a connection.",
+    },
+    gauges={
+        "size": "Connections kept open by pool.",
+        "max_connections": "Maximum number of connections, including overflow.",
+        "checked_in": "Idle connections in pool.",
+        "checked_out": "Connections in use.",
+        "overflow": "Connections opened above pool size.",
+        "waiting": "Checkouts waiting for a connection.",
+    },
+    histograms={"checkout_latency": "Time spent waiting for a connection."},
+)
@@ -0,0 +1,3 @@
+from blog_service.entrypoints.api import create_app
+
+app = create_app()
@@ -0,0 +1,261 @@
+from datetime import date, datetime
+from typing import AsyncIterator, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from blog_service.adapters import metrics
+from blog_service.domain.read_models import ArticleSnapshot, SearchHit
+
+from .cache import ARTICLE, ARTICLES_PAGE, ReadCache
+from .common import (
+    apply_edits,
+    build_article,
+    build_articles,
+    skip_existing,
+    to_page,
+    unique_reference,
+)
+from .exceptions import ArticleAlreadyExists, ArticleNotFound
+from .pagination import Page, decode_cursor
+from .unit_of_work import AbstractAsyncUnitOfWork
+
+
+@metrics.timed
+async def list_articles(
+    uow: AbstractAsyncUnitOfWork,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    cache: Optional[ReadCache] = None,
+    tags: Optional[Iterable[str]] = None,
+    match_all: bool = False,
+) -> Page:
+    """Fetches a page of summaries of available articles, newest first,
+    optionally filtered by tags.
+
+    Raises
+    ------
+    InvalidCursor
+        Raised when provided cursor is malformed.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    tags = frozenset(tags or ())
+    if cache is None:
+        return await _load_page(uow, limit, after, tags, match_all)
+    return await cache.get_or_load_async(
+        ARTICLES_PAGE,
+        (limit, after, tags, match_all),
+        lambda: _load_page(uow, limit, after, tags, match_all),
+        refresh=lambda: _load_page(uow.clone(), limit, after, tags, match_all),
+    )
+
+
+async def _load_page(
+    uow: AbstractAsyncUnitOfWork,
+    limit: Optional[int],
+    after: Optional[Tuple[date, int]],
+    tags: FrozenSet[str],
+    match_all: bool,
+) -> Page:
+    fetch_limit = limit + 1 if limit is not None else None
+    async with uow:
+        if tags:
+            articles = await uow.articles.list_by_tags(
+                tags, match_all, fetch_limit, after
+            )
+        else:
+            articles = await uow.articles.list_summaries(fetch_limit, after)
+    return to_page(articles, limit)
+
+
+@metrics.timed
+async def get_article(
+    reference: str, uow: AbstractAsyncUnitOfWork, cache: Optional[ReadCache] = None
+) -> ArticleSnapshot:
+    """Fetches read-only snapshot of article assigned to given reference.
+
+    Raises
+    ------
+    ArticleNotFound
+        Raised when article was not found for given reference.
+    """
+    if cache is None:
+        return await _load_article(reference, uow)
+    return await cache.get_or_load_async(
+        ARTICLE,
+        reference,
+        lambda: _load_article(reference, uow),
+        refresh=lambda: _load_article(reference, uow.clone()),
+    )
+
+
+@metrics.timed
+async def get_article_last_modified(
+    reference: str, uow: AbstractAsyncUnitOfWork, cache: Optional[ReadCache] = None
+) -> datetime:
+    """Returns time of the last modification of article assigned
+    to given reference.
+
+    Raises
+    ------
+    ArticleNotFound
+        Raised when article was not found for given reference.
+    """
+    article = cache.peek(ARTICLE, reference) if cache is not None else None
+    if article is not None:
+        return article.updated_at
+
+    try:
+        async with uow:
+            return await uow.articles.get_last_modified(reference)
+    except Exception:
+        raise ArticleNotFound("Article not found.")
+
+
+async def _load_article(
+    reference: str, uow: AbstractAsyncUnitOfWork
+) -> ArticleSnapshot:
+    try:
+        async with uow:
+            article = await uow.articles.get_snapshot(reference)
+    except Exception:
+        raise ArticleNotFound("Article not found.")
+    return article
+
+
+@metrics.timed
+async def export_articles(
+    uow: AbstractAsyncUnitOfWork, batch_size: int = 500
+) -> AsyncIterator[ArticleSnapshot]:
+    """Streams snapshots of all articles, including their content.
+    Unit of work stays open until the returned iterator is exhausted.
+    """
+    async with uow:
+        async for article in uow.articles.iter_snapshots(batch_size):
+            yield article
+
+
+@metrics.timed
+async def search_articles(
+    query: str, uow: AbstractAsyncUnitOfWork, limit: int, offset: int = 0
+) -> List[SearchHit]:
+    """Finds articles matching given query, best matches first."""
+    async with uow:
+        return await uow.search.search(query, limit, offset)
+
+
+@metrics.timed
+async def add_article(
+    new_article: dict,
+    uow: AbstractAsyncUnitOfWork,
+    cache: Optional[ReadCache] = None,
+):
+    """Creates new article from provided dictionary.
+
+    Raises
+    ------
+    ArticleAlreadyExists
+        Raised when article with the same reference exists.
+    InvalidPublicationDate
+        Raised when publication date isn't a date in ISO format.
+    """
+    async with uow:
+        article = build_article(new_article, uow)
+        if await uow.articles.exists(article.reference):
+            raise ArticleAlreadyExists("Article already exists.")
+
+        await uow.articles.add(article)
+        with unique_reference():
+            await uow.search.index([article.reference])
+            await uow.commit()
+
+    if cache is not None:
+        cache.invalidate_namespace(ARTICLES_PAGE)
+
+
+@metrics.timed
+async def bulk_add_articles(
+    new_articles: List[dict],
+    uow: AbstractAsyncUnitOfWork,
+    cache: Optional[ReadCache] = None,
+) -> List[Dict[str, str]]:
+    """Adds many articles at once and returns result for each of them,
+    in the same order.
+    """
+    async with uow:
+        results, articles = build_articles(new_articles, uow)
+        existing = await uow.articles.existing_references(articles)
+        new_articles = skip_existing(results, articles, existing)
+        with unique_reference():
+            await uow.articles.add_many(new_articles)
+            await uow.search.index(article.reference for article in new_articles)
+            await uow.commit()
+
+    if cache is not None:
+        cache.invalidate_namespace(ARTICLES_PAGE)
+    return results
+
+
+@metrics.timed
+async def remove_article(
+    reference: str, uow: AbstractAsyncUnitOfWork, cache: Optional[ReadCache] = None
+):
+    """Removes article for given reference.
+
+    Raises
+    ------
+    ArticleNotFound
+        Raised when article was not found for given reference.
+    """
+    try:
+        async with uow:
+            await uow.search.remove(reference)
+            await uow.articles.remove(reference)
+            await uow.commit()
+    except Exception:
+        raise ArticleNotFound("Article not found.")
+
+    if cache is not None:
+        cache.invalidate(ARTICLE, reference)
+        cache.invalidate_namespace(ARTICLES_PAGE)
+
+
+@metrics.timed
+async def edit_article(
+    reference: str,
+    data: dict,
+    uow: AbstractAsyncUnitOfWork,
+    cache: Optional[ReadCache] = None,
+):
+    """Applies modifications from data dictionary to article assigned
+    with given reference and regenerates article's reference.
+
+    Raises
+    ------
+    ArticleNotFound
+        Raised when article was not found for given reference.
+    ArticleAlreadyExists
+        Raised when new title collides with reference of other article.
+    InvalidPublicationDate
+        Raised when publication date isn't a date in ISO format.
+    """
+    async with uow:
+        try:
+            article = await uow.articles.get(reference)
+        except Exception:
+            raise ArticleNotFound("Article not found.")
+
+        new_reference = uow.articles.next_reference(data.get("title", article.title))
+        if new_reference != reference and await uow.articles.exists(new_reference):
+            raise ArticleAlreadyExists("Article already exists.")
+
+        apply_edits(article, data)
+
+        article.reference = new_reference
+        article.updated_at = datetime.utcnow()
+        await uow.articles.add(article)
+        with unique_reference():
+            await uow.search.index([new_reference])
+            await uow.commit()
+
+    if cache is not None:
+        cache.invalidate(ARTICLE, reference)
+        cache.invalidate(ARTICLE, new_reference)
+        cache.invalidate_namespace(ARTICLES_PAGE)
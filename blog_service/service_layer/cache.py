@@ -0,0 +1,532 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from blog_service.adapters.shared_cache import SharedCacheStore, Version
+
+ARTICLE = "article"
+ARTICLES_PAGE = "articles_page"
+# Number of generation counters of single entries. Entries hashed
+# to the same counter are invalidated together, which is safe,
+# just less precise.
+GENERATION_SLOTS = 1024
+
+# Counts of clears, invalidations of entry's namespace and of the entry.
+Generation = Tuple[int, int, int]
+
+logger = logging.getLogger("blog_service.cache")
+
+
+class _Flight:
+    """Load of an entry, which concurrent lookups of the entry wait for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.completed = False
+        self.value = None
+        self.error: Optional[Exception] = None
+
+
+class ReadCache:
+    """Bounded in-process cache for results of read services.
+    Entries live in namespaces, so all entries of a kind
+    (e.g. every cached page of articles) can be dropped at once.
+    When full, the least recently used entry is evicted,
+    and every entry expires after ttl seconds.
+
+    With shared store, values missing in this process are looked up
+    in the store shared by all workers on the host before they are
+    loaded, and invalidations are seen by all workers at once.
+
+    Concurrent lookups of the same missing entry are coalesced,
+    only the first one loads it and others wait up to load_timeout
+    seconds for it's result or error.
+
+    With stale_ttl, entries which expired less than stale_ttl seconds
+    ago are still returned by lookups that can refresh them, while they
+    are refreshed in background (by refresh_workers threads).
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        shared: Optional[SharedCacheStore] = None,
+        load_timeout: float = 10.0,
+        stale_ttl: float = 0.0,
+        refresh_workers: int = 2,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared = shared
+        self.load_timeout = load_timeout
+        self.stale_ttl = stale_ttl
+        self.refresh_workers = refresh_workers
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Each entry is (expires at, value, version in shared store).
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple]" = OrderedDict()
+        self._keys_by_namespace: Dict[str, Set[Hashable]] = {}
+        self._clears = 0
+        self._namespace_generations: Dict[str, int] = {}
+        self._key_generations = [0] * GENERATION_SLOTS
+        self._flights: Dict[Tuple[str, Hashable], _Flight] = {}
+        self._async_flights: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+        self._refreshing: Set[Tuple[str, Hashable]] = set()
+        self._refresh_executor: Optional[ThreadPoolExecutor] = None
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.shared_hits = 0
+        self.coalesced = 0
+        self.coalescing_timeouts = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def get_or_load(
+        self,
+        namespace: str,
+        key: Hashable,
+        loader: Callable[[], Any],
+        refresh: Optional[Callable[[], Any]] = None,
+    ):
+        """Returns cached value or calls loader and caches it's result.
+        Result is not cached when the entry, or it's namespace, was
+        invalidated while loader was running, because it might be
+        already outdated. Invalidation of other entries doesn't matter.
+        When the entry is already being loaded, it waits for that load
+        and returns it's result or raises it's error instead.
+
+        Parameters
+        ----------
+        namespace : str
+            Kind of cached value.
+        key : Hashable
+            Identifier of cached value within namespace.
+        loader : Callable[[], Any]
+            Function fetching value on cache miss.
+        refresh : Optional[Callable[[], Any]], optional
+            Function fetching value in background thread, when stale
+            value is returned, by default None. Without it, stale values
+            are not returned. It can't share resources with the caller,
+            like unit of work.
+
+        Returns
+        -------
+        Any
+            Cached or freshly loaded value.
+        """
+        hit, stale, value, generation, version = self._lookup(
+            namespace, key, refresh is not None
+        )
+        if stale:
+            self._schedule_refresh(namespace, key, refresh, generation, version)
+        if hit:
+            return value
+
+        flight, leading = self._join_flight(self._flights, namespace, key, _Flight)
+        if not leading:
+            if flight.done.wait(self.load_timeout) and flight.completed:
+                if flight.error is not None:
+                    raise flight.error
+                return flight.value
+            self._count_coalescing_timeout()
+            return self._load(namespace, key, loader, generation, version)
+
+        try:
+            flight.value = self._load(namespace, key, loader, generation, version)
+            flight.completed = True
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            flight.completed = True
+            raise
+        finally:
+            self._leave_flight(self._flights, namespace, key, flight)
+            flight.done.set()
+
+    async def get_or_load_async(
+        self,
+        namespace: str,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        refresh: Optional[Callable[[], Awaitable[Any]]] = None,
+    ):
+        """Works like get_or_load(), but awaits loader,
+        so it can be used by asynchronous services.
+        Stale values are refreshed by background tasks.
+        """
+        hit, stale, value, generation, version = self._lookup(
+            namespace, key, refresh is not None
+        )
+        if stale and self._start_refresh(namespace, key):
+            task = asyncio.get_running_loop().create_task(
+                self._refresh_async(namespace, key, refresh, generation, version)
+            )
+            # Event loop keeps only weak references to tasks.
+            self._refresh_tasks.add(task)
+            task.add_done_callback(self._refresh_tasks.discard)
+        if hit:
+            return value
+
+        flight, leading = self._join_flight(
+            self._async_flights,
+            namespace,
+            key,
+            asyncio.get_running_loop().create_future,
+        )
+        if not leading:
+            return await self._follow_flight_async(
+                flight, namespace, key, loader, generation, version
+            )
+
+        try:
+            value = await self._load_async(namespace, key, loader, generation, version)
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            # Marks error as retrieved, even when nobody waits for it.
+            flight.exception()
+            raise
+        else:
+            flight.set_result(value)
+            return value
+        finally:
+            self._leave_flight(self._async_flights, namespace, key, flight)
+
+    def peek(self, namespace: str, key: Hashable) -> Optional[Any]:
+        """Returns cached value without loading it on a miss.
+        It doesn't affect counters nor recency of the entry.
+        """
+        version = self._version(namespace, key)
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if self._is_fresh(entry, version, self._clock()):
+                return entry[1]
+            return None
+
+    def cache_control(self) -> Optional[str]:
+        """Returns Cache-Control header value matching stale-while-revalidate
+        policy of the cache, so HTTP caches can follow it.
+        """
+        if self.stale_ttl <= 0:
+            return None
+        return (
+            f"public, max-age={int(self.ttl)}, "
+            f"stale-while-revalidate={int(self.stale_ttl)}"
+        )
+
+    def invalidate(self, namespace: str, key: Hashable):
+        """Drops single entry from cache."""
+        if self.shared is not None:
+            self.shared.bump(namespace, key)
+        with self._lock:
+            self._key_generations[_slot(namespace, key)] += 1
+            self._flights.pop((namespace, key), None)
+            self._async_flights.pop((namespace, key), None)
+            if (namespace, key) in self._entries:
+                self._remove(namespace, key)
+
+    def invalidate_namespace(self, namespace: str):
+        """Drops all entries from given namespace."""
+        if self.shared is not None:
+            self.shared.bump(namespace)
+        with self._lock:
+            self._namespace_generations[namespace] = (
+                self._namespace_generations.get(namespace, 0) + 1
+            )
+            for flights in (self._flights, self._async_flights):
+                for flight_key in [key for key in flights if key[0] == namespace]:
+                    del flights[flight_key]
+            for key in list(self._keys_by_namespace.get(namespace, ())):
+                self._remove(namespace, key)
+
+    def clear(self):
+        """Drops all entries."""
+        with self._lock:
+            self._clears += 1
+            self._flights.clear()
+            self._async_flights.clear()
+            self._entries.clear()
+            self._keys_by_namespace.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns counters that help to size the cache."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "shared_hits": self.shared_hits,
+                "coalesced": self.coalesced,
+                "coalescing_timeouts": self.coalescing_timeouts,
+                "stale_hits": self.stale_hits,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+            }
+
+    def _version(self, namespace: str, key: Hashable) -> Optional[Version]:
+        if self.shared is None:
+            return None
+        return self.shared.version(namespace, key)
+
+    @staticmethod
+    def _is_fresh(
+        entry: Optional[Tuple], version: Optional[Version], expires_after: float
+    ) -> bool:
+        return entry is not None and entry[0] > expires_after and entry[2] == version
+
+    def _generation(self, namespace: str, key: Hashable) -> Generation:
+        """Returns generation of entry, which changes whenever the entry
+        is invalidated. Value loaded by lookup of other generation
+        might be outdated. Caller holds the lock.
+        """
+        return (
+            self._clears,
+            self._namespace_generations.get(namespace, 0),
+            self._key_generations[_slot(namespace, key)],
+        )
+
+    def _lookup(
+        self, namespace: str, key: Hashable, allow_stale: bool = False
+    ) -> Tuple[bool, bool, Any, Generation, Optional[Version]]:
+        """Returns whether entry was found, whether it's stale,
+        it's value, and generation and version to store it with.
+        """
+        version = self._version(namespace, key)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if self._is_fresh(entry, version, now):
+                self._entries.move_to_end((namespace, key))
+                self.hits += 1
+                return True, False, entry[1], self._generation(namespace, key), version
+
+            if allow_stale and self._is_fresh(entry, version, now - self.stale_ttl):
+                self._entries.move_to_end((namespace, key))
+                self.stale_hits += 1
+                return True, True, entry[1], self._generation(namespace, key), version
+
+            if entry is not None:
+                self._remove(namespace, key)
+                self.expirations += 1
+            self.misses += 1
+            return False, False, None, self._generation(namespace, key), version
+
+    def _start_refresh(self, namespace: str, key: Hashable) -> bool:
+        """Marks entry as being refreshed, returns False
+        when it's already refreshed.
+        """
+        with self._lock:
+            if (namespace, key) in self._refreshing:
+                return False
+            self._refreshing.add((namespace, key))
+            return True
+
+    def _schedule_refresh(
+        self,
+        namespace: str,
+        key: Hashable,
+        refresh: Callable[[], Any],
+        generation: Generation,
+        version: Optional[Version],
+    ):
+        if not self._start_refresh(namespace, key):
+            return
+
+        with self._lock:
+            # Created on first use, so forked workers don't inherit it.
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(
+                    self.refresh_workers, thread_name_prefix="cache-refresh"
+                )
+            executor = self._refresh_executor
+        executor.submit(self._refresh, namespace, key, refresh, generation, version)
+
+    def _refresh(
+        self,
+        namespace: str,
+        key: Hashable,
+        refresh: Callable[[], Any],
+        generation: Generation,
+        version: Optional[Version],
+    ):
+        try:
+            value = refresh()
+        except Exception:
+            self._finish_refresh(namespace, key, failed=True)
+        else:
+            self._store_if_current(namespace, key, value, generation, version)
+            self._finish_refresh(namespace, key)
+
+    async def _refresh_async(
+        self,
+        namespace: str,
+        key: Hashable,
+        refresh: Callable[[], Awaitable[Any]],
+        generation: Generation,
+        version: Optional[Version],
+    ):
+        try:
+            value = await refresh()
+        except Exception:
+            self._finish_refresh(namespace, key, failed=True)
+        else:
+            self._store_if_current(namespace, key, value, generation, version)
+            self._finish_refresh(namespace, key)
+
+    def _finish_refresh(self, namespace: str, key: Hashable, failed: bool = False):
+        if failed:
+            logger.warning("Refreshing %s %r failed.", namespace, key, exc_info=True)
+        with self._lock:
+            self._refreshing.discard((namespace, key))
+            if failed:
+                self.refresh_errors += 1
+            else:
+                self.refreshes += 1
+
+    def _join_flight(
+        self, flights: Dict, namespace: str, key: Hashable, create: Callable
+    ) -> Tuple[Any, bool]:
+        """Returns flight loading the entry and whether caller leads it.
+        When the entry isn't being loaded, new flight is registered
+        for others to join, and caller has to load the entry.
+        """
+        with self._lock:
+            flight = flights.get((namespace, key))
+            if flight is not None:
+                self.coalesced += 1
+                return flight, False
+
+            flight = flights[(namespace, key)] = create()
+            return flight, True
+
+    async def _follow_flight_async(
+        self,
+        flight: asyncio.Future,
+        namespace: str,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        generation: Generation,
+        version: Optional[Version],
+    ) -> Any:
+        """Waits for result of other lookup's load, or loads
+        the entry when waiting times out or that load is cancelled.
+        """
+        try:
+            return await asyncio.wait_for(asyncio.shield(flight), self.load_timeout)
+        except asyncio.TimeoutError:
+            self._count_coalescing_timeout()
+        except asyncio.CancelledError:
+            # Only cancellation of the loading task is recovered from.
+            if not flight.cancelled():
+                raise
+        return await self._load_async(namespace, key, loader, generation, version)
+
+    def _leave_flight(self, flights: Dict, namespace: str, key: Hashable, flight):
+        with self._lock:
+            # Flight may be already replaced, when entry was invalidated.
+            if flights.get((namespace, key)) is flight:
+                del flights[(namespace, key)]
+
+    def _count_coalescing_timeout(self):
+        with self._lock:
+            self.coalescing_timeouts += 1
+
+    def _load(
+        self,
+        namespace: str,
+        key: Hashable,
+        loader: Callable[[], Any],
+        generation: Generation,
+        version: Optional[Version],
+    ) -> Any:
+        hit, value = self._lookup_shared(namespace, key, generation, version)
+        if hit:
+            return value
+
+        value = loader()
+        self._store_if_current(namespace, key, value, generation, version)
+        return value
+
+    async def _load_async(
+        self,
+        namespace: str,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        generation: Generation,
+        version: Optional[Version],
+    ) -> Any:
+        hit, value = self._lookup_shared(namespace, key, generation, version)
+        if hit:
+            return value
+
+        value = await loader()
+        self._store_if_current(namespace, key, value, generation, version)
+        return value
+
+    def _lookup_shared(
+        self,
+        namespace: str,
+        key: Hashable,
+        generation: Generation,
+        version: Optional[Version],
+    ) -> Tuple[bool, Any]:
+        if self.shared is None:
+            return False, None
+
+        hit, value = self.shared.get(namespace, key, version)
+        if hit:
+            with self._lock:
+                self.shared_hits += 1
+                if generation == self._generation(namespace, key):
+                    self._store(namespace, key, value, version)
+        return hit, value
+
+    def _store_if_current(
+        self,
+        namespace: str,
+        key: Hashable,
+        value: Any,
+        generation: Generation,
+        version: Optional[Version],
+    ):
+        with self._lock:
+            if generation != self._generation(namespace, key):
+                return
+            self._store(namespace, key, value, version)
+
+        if self.shared is not None and version == self._version(namespace, key):
+            self.shared.put(namespace, key, version, value, self.ttl)
+
+    def _store(
+        self, namespace: str, key: Hashable, value: Any, version: Optional[Version]
+    ):
+        self._entries[(namespace, key)] = (self._clock() + self.ttl, value, version)
+        self._entries.move_to_end((namespace, key))
+        self._keys_by_namespace.setdefault(namespace, set()).add(key)
+        while len(self._entries) > self.max_size:
+            (evicted_namespace, evicted_key), _ = self._entries.popitem(last=False)
+            self._keys_by_namespace[evicted_namespace].discard(evicted_key)
+            self.evictions += 1
+
+    def _remove(self, namespace: str, key: Hashable):
+        del self._entries[(namespace, key)]
+        self._keys_by_namespace[namespace].discard(key)
+
+
+def _slot(namespace: str, key: Hashable) -> int:
+    return hash((namespace, key)) % GENERATION_SLOTS
@@ -0,0 +1,156 @@
+"""Parts of services shared by their synchronous (services)
+and asynchronous (async_services) flavors, which don't depend
+on how unit of work is run.
+"""
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from blog_service.adapters import orm
+from blog_service.domain.model import Article, EmptyTagName, Tag, TagNameTooLong
+from blog_service.domain.read_models import ArticleSummary
+from sqlalchemy.exc import IntegrityError
+
+from .exceptions import ArticleAlreadyExists, InvalidPublicationDate
+from .pagination import Page, encode_cursor
+from .unit_of_work import AbstractAsyncUnitOfWork, AbstractUnitOfWork
+
+AnyUnitOfWork = Union[AbstractUnitOfWork, AbstractAsyncUnitOfWork]
+
+
+def to_page(articles: List[ArticleSummary], limit: Optional[int]) -> Page:
+    """Builds page of articles fetched with one extra article,
+    which tells whether there is a next page at all.
+    """
+    if limit is None or len(articles) <= limit:
+        return Page(articles)
+
+    articles = articles[:limit]
+    last_article = articles[-1]
+    return Page(articles, encode_cursor(last_article.publication_date, last_article.id))
+
+
+def build_articles(
+    new_articles: List[dict], uow: AnyUnitOfWork
+) -> Tuple[List[Dict[str, str]], Dict[str, Article]]:
+    """Builds articles of bulk import, reporting result of each one.
+    Repeated articles are built only once.
+
+    Returns
+    -------
+    Tuple[List[Dict[str, str]], Dict[str, Article]]
+        Result of each article, in the same order, and built articles
+        by their reference.
+    """
+    results = []
+    articles = {}
+    for new_article in new_articles:
+        if not isinstance(new_article, dict):
+            results.append(
+                {"status": "invalid", "message": "Article should be an object."}
+            )
+            continue
+        try:
+            article = build_article(new_article, uow)
+        except KeyError as e:
+            results.append({"status": "invalid", "message": f"Missing {e} field."})
+            continue
+        except (
+            TypeError,
+            EmptyTagName,
+            TagNameTooLong,
+            InvalidPublicationDate,
+        ) as e:
+            results.append({"status": "invalid", "message": str(e)})
+            continue
+
+        status = "duplicate" if article.reference in articles else "created"
+        results.append({"reference": article.reference, "status": status})
+        articles.setdefault(article.reference, article)
+    return results, articles
+
+
+def skip_existing(
+    results: List[Dict[str, str]], articles: Dict[str, Article], existing: Set[str]
+) -> List[Article]:
+    """Marks already stored articles as duplicates and returns the rest."""
+    for result in results:
+        if result.get("reference") in existing:
+            result["status"] = "duplicate"
+
+    return [
+        article for article in articles.values() if article.reference not in existing
+    ]
+
+
+def build_article(new_article: dict, uow: AnyUnitOfWork) -> Article:
+    """Builds new article with reference generated from it's title.
+
+    Raises
+    ------
+    InvalidPublicationDate
+        Raised when publication date isn't a date in ISO format.
+    """
+    new_article = dict(new_article)
+    new_article["reference"] = uow.articles.next_reference(new_article["title"])
+    if "tags" in new_article:
+        new_article["tags"] = {Tag(tag) for tag in new_article["tags"]}
+    if "publication_date" in new_article:
+        new_article["publication_date"] = parse_publication_date(
+            new_article["publication_date"]
+        )
+    return Article(**new_article)
+
+
+def apply_edits(article: Article, data: dict):
+    """Sets new values of article's properties.
+
+    Raises
+    ------
+    InvalidPublicationDate
+        Raised when publication date isn't a date in ISO format.
+    """
+    data = dict(data)
+    if "tags" in data:
+        data["tags"] = {Tag(name) for name in data["tags"]}
+    if "publication_date" in data:
+        data["publication_date"] = parse_publication_date(data["publication_date"])
+
+    for field in data:
+        setattr(article, field, data[field])
+
+
+def parse_publication_date(value: Any) -> Optional[date]:
+    """Parses publication date sent as `YYYY-MM-DD` string. Database
+    drivers differ in what they accept for dates (asyncpg and SQLite
+    take only date objects), so dates are parsed before reaching them.
+
+    Raises
+    ------
+    InvalidPublicationDate
+        Raised when value isn't a date in ISO format.
+    """
+    if value is None or (isinstance(value, date) and not isinstance(value, datetime)):
+        return value
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise InvalidPublicationDate(
+            "Publication date should be a date in YYYY-MM-DD format."
+        )
+
+
+@contextmanager
+def unique_reference():
+    """Translates violation of unique reference index, raised while
+    changes are flushed, into ArticleAlreadyExists. It covers the race
+    in which other transaction inserted the same reference
+    after exists() check. Violations of other constraints are
+    raised as they are.
+    """
+    try:
+        yield
+    except IntegrityError as e:
+        if not orm.violates_unique_reference(e):
+            raise
+        raise ArticleAlreadyExists("Article already exists.")
@@ -1,5 +1,18 @@
 class ArticleNotFound(Exception):
     pass
 
+
 class ArticleAlreadyExists(Exception):
     pass
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class InvalidPublicationDate(Exception):
+    pass
+
+
+class ReadOnlyUnitOfWork(Exception):
+    pass
@@ -0,0 +1,70 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional, Tuple
+
+from blog_service.domain.read_models import ArticleSummary
+
+from .exceptions import InvalidCursor
+
+
+@dataclass(frozen=True)
+class Page:
+    """Single page of article summaries together with cursor pointing
+    at the next one. When there are no more articles,
+    next_cursor is None.
+    """
+
+    articles: List[ArticleSummary]
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(publication_date: Optional[date], article_id: int) -> str:
+    """Builds opaque cursor from the key of the last article on a page.
+
+    Parameters
+    ----------
+    publication_date : Optional[date]
+        Publication date of the last article on a page,
+        None when it has no publication date.
+    article_id : int
+        Identifier of the last article on a page.
+
+    Returns
+    -------
+    str
+        URL safe cursor.
+    """
+    raw_date = publication_date.isoformat() if publication_date is not None else ""
+    raw_cursor = f"{raw_date}|{article_id}"
+    return urlsafe_b64encode(raw_cursor.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[date], int]:
+    """Restores (publication_date, id) key from cursor
+    built by encode_cursor().
+
+    Parameters
+    ----------
+    cursor : str
+        Cursor received from client.
+
+    Returns
+    -------
+    Tuple[Optional[date], int]
+        Key of the last article from previous page.
+
+    Raises
+    ------
+    InvalidCursor
+        Raised when cursor is malformed.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        raw_cursor = urlsafe_b64decode(cursor + padding).decode()
+        publication_date, article_id = raw_cursor.split("|")
+        if not publication_date:
+            return None, int(article_id)
+        return date.fromisoformat(publication_date), int(article_id)
+    except ValueError:
+        raise InvalidCursor("Invalid cursor.")
@@ -1,35 +1,99 @@
-from copy import deepcopy
-from typing import List
+from datetime import date, datetime
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
 
-from blog_service.adapters.repository import AbstractRepository
-from blog_service.domain.model import Article, Tag
+from blog_service.adapters import metrics
+from blog_service.domain.read_models import ArticleSnapshot, SearchHit
 
+from .cache import ARTICLE, ARTICLES_PAGE, ReadCache
+from .common import (
+    apply_edits,
+    build_article,
+    build_articles,
+    skip_existing,
+    to_page,
+    unique_reference,
+)
 from .exceptions import ArticleAlreadyExists, ArticleNotFound
+from .pagination import Page, decode_cursor
 from .unit_of_work import AbstractUnitOfWork
 
 
-def list_articles(uow: AbstractUnitOfWork) -> List[Article]:
-    """Calls list_items() method of repository to fetch
-    list of all available articles.
+@metrics.timed
+def list_articles(
+    uow: AbstractUnitOfWork,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    cache: Optional[ReadCache] = None,
+    tags: Optional[Iterable[str]] = None,
+    match_all: bool = False,
+) -> Page:
+    """Calls list_summaries() method of repository to fetch
+    a page of available articles, newest first. When tags are given,
+    it calls list_by_tags() to fetch only articles tagged with them.
+    Articles' content is not loaded, use get_article() for that.
 
     Parameters
     ----------
-    repository : AbstractRepository
-        Repository with articles.
+    uow : AbstractUnitOfWork
+        Unit of work with articles repository.
+    limit : Optional[int], optional
+        Maximum number of articles on a page, by default None.
+        When None, all available articles are returned.
+    cursor : Optional[str], optional
+        Cursor returned with previous page, by default None.
+    cache : Optional[ReadCache], optional
+        Cache of read results, by default None.
+    tags : Optional[Iterable[str]], optional
+        Names of tags to filter articles by, by default None.
+    match_all : bool, optional
+        When True, article must have all given tags,
+        otherwise any of them, by default False.
 
     Returns
     -------
-    List[Article]
-        List of available articles.
+    Page
+        Page of summaries of available articles with cursor to the next one.
+
+    Raises
+    ------
+    InvalidCursor
+        Raised when provided cursor is malformed.
     """
+    after = decode_cursor(cursor) if cursor else None
+    tags = frozenset(tags or ())
+    if cache is None:
+        return _load_page(uow, limit, after, tags, match_all)
+    return cache.get_or_load(
+        ARTICLES_PAGE,
+        (limit, after, tags, match_all),
+        lambda: _load_page(uow, limit, after, tags, match_all),
+        refresh=lambda: _load_page(uow.clone(), limit, after, tags, match_all),
+    )
+
+
+def _load_page(
+    uow: AbstractUnitOfWork,
+    limit: Optional[int],
+    after: Optional[Tuple[date, int]],
+    tags: FrozenSet[str],
+    match_all: bool,
+) -> Page:
+    # One extra row tells whether there is a next page at all.
+    fetch_limit = limit + 1 if limit is not None else None
     with uow:
-        articles = deepcopy(uow.articles.list_items())
-    return articles
+        if tags:
+            articles = uow.articles.list_by_tags(tags, match_all, fetch_limit, after)
+        else:
+            articles = uow.articles.list_summaries(fetch_limit, after)
+    return to_page(articles, limit)
 
 
-def get_article(reference: str, uow: AbstractUnitOfWork) -> Article:
-    """Calls get() method of repository to fetch article
-    assigned to given reference.
+@metrics.timed
+def get_article(
+    reference: str, uow: AbstractUnitOfWork, cache: Optional[ReadCache] = None
+) -> ArticleSnapshot:
+    """Calls get_snapshot() method of repository to fetch
+    read-only snapshot of article assigned to given reference.
 
     Parameters
     ----------
@@ -37,26 +101,104 @@ def get_article(reference: str, uow: AbstractUnitOfWork) -> Article:
         Article's identifier.
     repository : AbstractRepository
         Repository with articles.
+    cache : Optional[ReadCache], optional
+        Cache of read results, by default None.
 
     Returns
     -------
-    Article
-        Article for given reference.
+    ArticleSnapshot
+        Snapshot of article for given reference.
 
     Raises
     ------
     ArticleNotFound
         Raised when article was not found for given reference.
     """
+    if cache is None:
+        return _load_article(reference, uow)
+    return cache.get_or_load(
+        ARTICLE,
+        reference,
+        lambda: _load_article(reference, uow),
+        refresh=lambda: _load_article(reference, uow.clone()),
+    )
+
+
+@metrics.timed
+def get_article_last_modified(
+    reference: str, uow: AbstractUnitOfWork, cache: Optional[ReadCache] = None
+) -> datetime:
+    """Returns time of the last modification of article assigned
+    to given reference. It's taken from cached snapshot when there is one,
+    otherwise only that single column is fetched from repository.
+
+    Parameters
+    ----------
+    reference : str
+        Article's identifier.
+    uow : AbstractUnitOfWork
+        Unit of work with articles repository.
+    cache : Optional[ReadCache], optional
+        Cache of read results, by default None.
+
+    Returns
+    -------
+    datetime
+        When article was modified for the last time (UTC).
+
+    Raises
+    ------
+    ArticleNotFound
+        Raised when article was not found for given reference.
+    """
+    article = cache.peek(ARTICLE, reference) if cache is not None else None
+    if article is not None:
+        return article.updated_at
+
     try:
         with uow:
-            article = deepcopy(uow.articles.get(reference))
+            return uow.articles.get_last_modified(reference)
+    except Exception:
+        raise ArticleNotFound("Article not found.")
+
+
+def _load_article(reference: str, uow: AbstractUnitOfWork) -> ArticleSnapshot:
+    try:
+        with uow:
+            article = uow.articles.get_snapshot(reference)
     except Exception:
         raise ArticleNotFound("Article not found.")
     return article
 
 
-def add_article(new_article: dict, uow: AbstractUnitOfWork):
+@metrics.timed
+def export_articles(
+    uow: AbstractUnitOfWork, batch_size: int = 500
+) -> Iterator[ArticleSnapshot]:
+    """Calls iter_snapshots() method of repository to stream all articles,
+    including their content. Unit of work stays open until
+    the returned iterator is exhausted or closed.
+
+    Parameters
+    ----------
+    uow : AbstractUnitOfWork
+        Unit of work with articles repository.
+    batch_size : int, optional
+        Number of articles fetched at once, by default 500.
+
+    Yields
+    ------
+    Iterator[ArticleSnapshot]
+        Snapshots of all articles.
+    """
+    with uow:
+        yield from uow.articles.iter_snapshots(batch_size)
+
+
+@metrics.timed
+def add_article(
+    new_article: dict, uow: AbstractUnitOfWork, cache: Optional[ReadCache] = None
+):
     """Creates new Article object by using provided dictioniary,
     generates and assign reference, and calls add() method of repository
     to add article into repository.
@@ -69,28 +211,121 @@ def add_article(new_article: dict, uow: AbstractUnitOfWork):
         Repository with articles.
     session :
         Session object
+    cache : Optional[ReadCache], optional
+        Cache of read results to invalidate, by default None.
 
     Raises
     ------
     ArticleAlreadyExists
         Raised when article with the same reference exists.
+    InvalidPublicationDate
+        Raised when publication date isn't a date in ISO format.
     """
     with uow:
-        articles = uow.articles.list_items()
+        article = build_article(new_article, uow)
+        if uow.articles.exists(article.reference):
+            raise ArticleAlreadyExists("Article already exists.")
 
-        new_article["reference"] = uow.articles.next_reference(new_article["title"])
-        if "tags" in new_article:
-            new_article["tags"] = {Tag(tag) for tag in new_article["tags"]}
+        uow.articles.add(article)
+        with unique_reference():
+            uow.search.index([article.reference])
+            uow.commit()
 
-        new_article = Article(**new_article)
-        if new_article in articles:
-            raise ArticleAlreadyExists("Article already exists.")
+    if cache is not None:
+        cache.invalidate_namespace(ARTICLES_PAGE)
 
-        uow.articles.add(new_article)
+
+@metrics.timed
+def search_articles(
+    query: str, uow: AbstractUnitOfWork, limit: int, offset: int = 0
+) -> List[SearchHit]:
+    """Calls search() method of search index to find articles
+    matching given query, best matches first.
+
+    Parameters
+    ----------
+    query : str
+        Searched words.
+    uow : AbstractUnitOfWork
+        Unit of work with search index.
+    limit : int
+        Maximum number of hits to return.
+    offset : int, optional
+        Number of best hits to skip, by default 0.
+
+    Returns
+    -------
+    List[SearchHit]
+        Matching articles with snippets of their content.
+    """
+    with uow:
+        return uow.search.search(query, limit, offset)
+
+
+@metrics.timed
+def rebuild_search_index(uow: AbstractUnitOfWork) -> int:
+    """Indexes all stored articles anew, so articles stored before
+    search index was introduced, or bypassing it, can be found.
+
+    Parameters
+    ----------
+    uow : AbstractUnitOfWork
+        Unit of work with search index.
+
+    Returns
+    -------
+    int
+        Number of indexed articles.
+    """
+    with uow:
+        count = uow.search.rebuild()
         uow.commit()
+    return count
+
+
+@metrics.timed
+def bulk_add_articles(
+    new_articles: List[dict],
+    uow: AbstractUnitOfWork,
+    cache: Optional[ReadCache] = None,
+) -> List[Dict[str, str]]:
+    """Adds many articles at once. Like add_article(), it generates
+    reference for each article, but it checks for duplicates with
+    a single query and inserts all new articles in one batch.
 
+    Parameters
+    ----------
+    new_articles : List[dict]
+        Defined properties of each new article.
+    uow : AbstractUnitOfWork
+        Unit of work with articles repository.
+    cache : Optional[ReadCache], optional
+        Cache of read results to invalidate, by default None.
 
-def remove_article(reference: str, uow: AbstractUnitOfWork):
+    Returns
+    -------
+    List[Dict[str, str]]
+        Result for each provided article, in the same order.
+        Status of an article is either "created", "duplicate" or "invalid".
+    """
+    with uow:
+        results, articles = build_articles(new_articles, uow)
+        existing = uow.articles.existing_references(articles)
+        new_articles = skip_existing(results, articles, existing)
+        with unique_reference():
+            uow.articles.add_many(new_articles)
+            uow.search.index(article.reference for article in new_articles)
+            uow.commit()
+
+    if cache is not None:
+        cache.invalidate_namespace(ARTICLES_PAGE)
+    return results
+
+
+@metrics.timed
+def remove_article(
+    reference: str, uow: AbstractUnitOfWork, cache: Optional[ReadCache] = None
+):
     """Calls remove() method of repository to remove article for given
     reference.
 
@@ -102,6 +337,8 @@ def remove_article(reference: str, uow: AbstractUnitOfWork):
         Repository with articles.
     session :
         Session object
+    cache : Optional[ReadCache], optional
+        Cache of read results to invalidate, by default None.
 
     Raises
     ------
@@ -110,15 +347,26 @@ def remove_article(reference: str, uow: AbstractUnitOfWork):
     """
     try:
         with uow:
+            uow.search.remove(reference)
             uow.articles.remove(reference)
             uow.commit()
     except Exception:
         raise ArticleNotFound("Article not found.")
 
+    if cache is not None:
+        cache.invalidate(ARTICLE, reference)
+        cache.invalidate_namespace(ARTICLES_PAGE)
+
 
-def edit_article(reference: str, data: dict, uow: AbstractUnitOfWork):
-    """Create scopy of article assigned with given reference, apply modifications
-    from data dictionary and replaces old article with modified one.
+@metrics.timed
+def edit_article(
+    reference: str,
+    data: dict,
+    uow: AbstractUnitOfWork,
+    cache: Optional[ReadCache] = None,
+):
+    """Fetch article assigned with given reference, apply modifications
+    from data dictionary and regenerates article's reference.
 
     Parameters
     ----------
@@ -130,19 +378,39 @@ def edit_article(reference: str, data: dict, uow: AbstractUnitOfWork):
         Repository with articles.
     session :
         Session object
+    cache : Optional[ReadCache], optional
+        Cache of read results to invalidate, by default None.
+
+    Raises
+    ------
+    ArticleNotFound
+        Raised when article was not found for given reference.
+    ArticleAlreadyExists
+        Raised when new title collides with reference of other article.
+    InvalidPublicationDate
+        Raised when publication date isn't a date in ISO format.
     """
     with uow:
         try:
-            article = deepcopy(uow.articles.get(reference))
+            article = uow.articles.get(reference)
         except Exception:
             raise ArticleNotFound("Article not found.")
 
-        if "tags" in data:
-            data["tags"] = {Tag(name) for name in data["tags"]}
+        new_reference = uow.articles.next_reference(data.get("title", article.title))
+        if new_reference != reference and uow.articles.exists(new_reference):
+            raise ArticleAlreadyExists("Article already exists.")
 
-        for field in data:
-            setattr(article, field, data[field])
+        apply_edits(article, data)
 
-        article.reference = uow.articles.next_reference(article.title)
+        article.reference = new_reference
+        # Set explicitly, as changing only tags doesn't update article's row.
+        article.updated_at = datetime.utcnow()
         uow.articles.add(article)
-        uow.commit()
+        with unique_reference():
+            uow.search.index([new_reference])
+            uow.commit()
+
+    if cache is not None:
+        cache.invalidate(ARTICLE, reference)
+        cache.invalidate(ARTICLE, new_reference)
+        cache.invalidate_namespace(ARTICLES_PAGE)
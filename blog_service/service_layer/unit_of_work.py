@@ -1,14 +1,30 @@
+import copy
+import os
+import threading
 from abc import ABC, abstractmethod
+from typing import Callable, Dict, List
 
 from blog_service import config
+from blog_service.adapters import query_counter
+from blog_service.adapters.async_repository import AsyncSQLAlchemyRepository
+from blog_service.adapters.pool_metrics import (InstrumentedAsyncAdaptedQueuePool,
+                                                InstrumentedQueuePool,
+                                                PoolMetrics)
 from blog_service.adapters.repository import (AbstractRepository,
                                               SQLAlchemyRepository)
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from blog_service.adapters.search import (AbstractSearchIndex, AsyncSearchIndex,
+                                          make_search_index)
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from .exceptions import ReadOnlyUnitOfWork
 
 
 class AbstractUnitOfWork(ABC):
     articles: AbstractRepository
+    search: AbstractSearchIndex
 
     def __enter__(self):
         return self
@@ -16,6 +32,12 @@ class AbstractUnitOfWork(ABC):
     def __exit__(self, *args):
         self.rollback()
 
+    def clone(self) -> "AbstractUnitOfWork":
+        """Returns new unit of work of the same kind, which can be used
+        independently of this one, e.g. by other thread.
+        """
+        return copy.copy(self)
+
     @abstractmethod
     def commit(self):
         raise NotImplementedError
@@ -25,14 +47,159 @@ class AbstractUnitOfWork(ABC):
         raise NotImplementedError
 
 
-DEFAULT_SESSION_FACTORY = sessionmaker(
-    bind=create_engine(config.get_postgres_uri(), pool_pre_ping=True)
-)
+def get_pool_options() -> dict:
+    """Returns connection pool settings taken from config."""
+    return {
+        "pool_size": config.get_pool_size(),
+        "max_overflow": config.get_pool_max_overflow(),
+        "pool_timeout": config.get_pool_timeout(),
+        "pool_recycle": config.get_pool_recycle(),
+        "pool_pre_ping": config.get_pool_pre_ping(),
+    }
+
+
+class ReadOnlySession(Session):
+    """Session for read-only units of work. On PostgreSQL every
+    transaction is declared read-only, so it can be served by
+    a hot standby and never takes write locks.
+    """
+
+
+# Statement declaring transaction read-only, by dialect.
+READ_ONLY_TRANSACTION_STATEMENTS = {"postgresql": "SET TRANSACTION READ ONLY"}
+
+
+@event.listens_for(ReadOnlySession, "after_begin")
+def _set_transaction_read_only(session, transaction, connection):
+    statement = READ_ONLY_TRANSACTION_STATEMENTS.get(connection.dialect.name)
+    if statement is not None:
+        # Executed by every read-only transaction, so it isn't counted
+        # against query budgets of routes.
+        with query_counter.uncounted():
+            connection.exec_driver_sql(statement)
+
+
+pool_metrics = PoolMetrics()
+replica_pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+async_replica_pool_metrics = PoolMetrics()
+
+# Engines are created on first use, so importing service layer
+# neither reads database config nor builds connection pools.
+_session_factories: Dict[str, sessionmaker] = {}
+_session_factories_lock = threading.Lock()
+_engines: List[Engine] = []
+
+
+def get_session_factory() -> sessionmaker:
+    """Returns factory of sessions bound to the primary database."""
+    return _get_or_create_session_factory("primary", _create_session_factory)
+
+
+def get_read_only_session_factory() -> sessionmaker:
+    """Returns factory of read-only sessions, bound to the read replica
+    or to the primary when no replica is configured.
+    """
+    return _get_or_create_session_factory(
+        "read_only", _create_read_only_session_factory
+    )
+
+
+def get_async_session_factory() -> sessionmaker:
+    """Returns factory of asynchronous sessions bound to the primary
+    database, so async driver is required only by ASGI entrypoint.
+    """
+    return _get_or_create_session_factory("async", _create_async_session_factory)
+
+
+def get_async_read_only_session_factory() -> sessionmaker:
+    """Returns factory of asynchronous read-only sessions, bound to
+    the read replica or to the primary when no replica is configured.
+    """
+    return _get_or_create_session_factory(
+        "async_read_only", _create_async_read_only_session_factory
+    )
+
+
+def _get_or_create_session_factory(
+    name: str, create: Callable[[], sessionmaker]
+) -> sessionmaker:
+    session_factory = _session_factories.get(name)
+    if session_factory is None:
+        with _session_factories_lock:
+            session_factory = _session_factories.get(name)
+            if session_factory is None:
+                session_factory = _session_factories[name] = create()
+    return session_factory
+
+
+def _create_session_factory() -> sessionmaker:
+    engine = _create_engine(config.get_postgres_uri(), pool_metrics)
+    return sessionmaker(bind=engine)
+
+
+def _create_read_only_session_factory() -> sessionmaker:
+    engine = get_session_factory().kw["bind"]
+    if config.get_replica_postgres_uri():
+        engine = _create_engine(config.get_replica_postgres_uri(), replica_pool_metrics)
+    return sessionmaker(
+        bind=engine, class_=ReadOnlySession, autoflush=False, expire_on_commit=False
+    )
+
+
+def _create_async_session_factory() -> sessionmaker:
+    engine = _create_async_engine(config.get_async_postgres_uri(), async_pool_metrics)
+    return sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def _create_async_read_only_session_factory() -> sessionmaker:
+    engine = get_async_session_factory().kw["bind"]
+    if config.get_async_replica_postgres_uri():
+        engine = _create_async_engine(
+            config.get_async_replica_postgres_uri(), async_replica_pool_metrics
+        )
+    return sessionmaker(
+        bind=engine,
+        class_=AsyncSession,
+        sync_session_class=ReadOnlySession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+def _create_engine(uri: str, metrics: PoolMetrics) -> Engine:
+    engine = create_engine(uri, poolclass=InstrumentedQueuePool, **get_pool_options())
+    metrics.instrument(engine)
+    _engines.append(engine)
+    return engine
+
+
+def _create_async_engine(uri: str, metrics: PoolMetrics) -> AsyncEngine:
+    engine = create_async_engine(
+        uri, poolclass=InstrumentedAsyncAdaptedQueuePool, **get_pool_options()
+    )
+    metrics.instrument(engine.sync_engine)
+    _engines.append(engine.sync_engine)
+    return engine
+
+
+def _dispose_engines_after_fork():
+    """Gives forked worker it's own connection pools. Connections
+    inherited from the parent are dropped without being closed,
+    as closing them would close sockets still used by the parent.
+    """
+    global _session_factories_lock
+    _session_factories_lock = threading.Lock()
+    for engine in _engines:
+        engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_dispose_engines_after_fork)
 
 
 class SqlAlchemyUnitOfWork(AbstractUnitOfWork):
-    def __init__(self, session_factory=DEFAULT_SESSION_FACTORY):
-        self.session_factory = session_factory
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory or get_session_factory()
 
     def __enter__(self):
         """Initialize session and instatiate repository
@@ -41,6 +208,7 @@ class SqlAlchemyUnitOfWork(AbstractUnitOfWork):
         """
         self.session = self.session_factory()
         self.articles = SQLAlchemyRepository(self.session)
+        self.search = make_search_index(self.session)
         return super().__enter__()
 
     def __exit__(self, *args):
@@ -60,3 +228,90 @@ class SqlAlchemyUnitOfWork(AbstractUnitOfWork):
         """Revert all changes made during the session.
         """
         self.session.rollback()
+
+
+class ReadOnlySqlAlchemyUnitOfWork(SqlAlchemyUnitOfWork):
+    """Unit of work for services that only read. Its session never
+    flushes, and leaving it just closes the session instead of
+    rolling back a transaction that changed nothing.
+    """
+
+    def __init__(self, session_factory=None):
+        super().__init__(session_factory or get_read_only_session_factory())
+
+    def __exit__(self, *args):
+        """Closes session, which returns connection to the pool."""
+        self.session.close()
+
+    def commit(self):
+        raise ReadOnlyUnitOfWork("Read-only unit of work can't commit changes.")
+
+
+class AbstractAsyncUnitOfWork(ABC):
+    articles: AsyncSQLAlchemyRepository
+    search: AsyncSearchIndex
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.rollback()
+
+    def clone(self) -> "AbstractAsyncUnitOfWork":
+        """Returns new unit of work of the same kind, which can be used
+        independently of this one, e.g. by other task.
+        """
+        return copy.copy(self)
+
+    @abstractmethod
+    async def commit(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def rollback(self):
+        raise NotImplementedError
+
+
+class AsyncSqlAlchemyUnitOfWork(AbstractAsyncUnitOfWork):
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory or get_async_session_factory()
+
+    async def __aenter__(self):
+        """Initialize asynchronous session and instatiate repository
+        to prepare unit of work for executing atomic operation
+        on database layer.
+        """
+        self.session = self.session_factory()
+        self.articles = AsyncSQLAlchemyRepository(self.session)
+        self.search = AsyncSearchIndex(self.session)
+        return await super().__aenter__()
+
+    async def __aexit__(self, *args):
+        """When operation finished with success or failed,
+        it rollback changes made during the session
+        and close session object.
+        """
+        await super().__aexit__(*args)
+        await self.session.close()
+
+    async def commit(self):
+        """Approves changes made during the session."""
+        await self.session.commit()
+
+    async def rollback(self):
+        """Revert all changes made during the session."""
+        await self.session.rollback()
+
+
+class AsyncReadOnlySqlAlchemyUnitOfWork(AsyncSqlAlchemyUnitOfWork):
+    """Asynchronous counterpart of ReadOnlySqlAlchemyUnitOfWork."""
+
+    def __init__(self, session_factory=None):
+        super().__init__(session_factory or get_async_read_only_session_factory())
+
+    async def __aexit__(self, *args):
+        """Closes session, which returns connection to the pool."""
+        await self.session.close()
+
+    async def commit(self):
+        raise ReadOnlyUnitOfWork("Read-only unit of work can't commit changes.")
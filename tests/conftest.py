@@ -1,11 +1,21 @@
+import asyncio
+import gc
+
 import pytest
 from blog_service import config
 from blog_service.adapters.orm import metadata, start_mappers
+from blog_service.entrypoints import asgi, web
+from blog_service.entrypoints.api import create_app
+from blog_service.service_layer import cache, unit_of_work
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import clear_mappers, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
 
 
 def clean_db(session):
+    session.execute("DELETE FROM article_tags;")
     session.execute("DELETE FROM tags;")
     session.execute("DELETE FROM articles;")
     session.execute("ALTER SEQUENCE articles_id_seq RESTART WITH 1;")
@@ -32,6 +42,62 @@ def session(session_factory):
     return session_factory()
 
 
+@pytest.fixture
+def client(in_memory_db, monkeypatch):
+    session_factory = sessionmaker(bind=in_memory_db)
+    monkeypatch.setattr(
+        unit_of_work,
+        "_session_factories",
+        {"primary": session_factory, "read_only": session_factory},
+    )
+    monkeypatch.setattr(web, "read_cache", cache.ReadCache())
+    app = create_app()
+    app.testing = True
+    yield app.test_client()
+    clear_mappers()
+
+
+def in_memory_async_db():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+
+    async def create_all():
+        async with engine.begin() as connection:
+            await connection.run_sync(metadata.create_all)
+
+    asyncio.run(create_all())
+    return engine
+
+
+@pytest.fixture
+def async_session_factory():
+    engine = in_memory_async_db()
+    start_mappers()
+    yield sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    clear_mappers()
+
+
+@pytest.fixture
+def asgi_client(monkeypatch):
+    session_factory = sessionmaker(
+        bind=in_memory_async_db(), class_=AsyncSession, expire_on_commit=False
+    )
+    monkeypatch.setattr(
+        unit_of_work,
+        "_session_factories",
+        {"async": session_factory, "async_read_only": session_factory},
+    )
+    monkeypatch.setattr(web, "read_cache", cache.ReadCache())
+    # Engines left by other tests would be collected in event loop's thread,
+    # which can't close their SQLite connections.
+    gc.collect()
+    app = asgi.create_app()
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        clear_mappers()
+
+
 @pytest.fixture
 def postgres_db(scope="session"):
     engine = create_engine(config.get_postgres_uri())
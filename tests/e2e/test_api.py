@@ -218,3 +218,27 @@ def test_delete_article_should_return_400_and_error_message():
 
     assert delete_request.status_code == 404
     assert delete_request.json()["message"] == "Article not found."
+
+
+@pytest.mark.usefixtures("postgres_session")
+def test_get_article_endpoint_returns_304_when_article_is_not_modified():
+    """Tests that API responds with 304 and no body when client
+    already has current version of an article.
+    """
+    post_to_add_article(
+        "Async Libraries in Python",
+        "Tom Smith",
+        "2022-01-01",
+        "Some async libs",
+        "Lorem ipsum...",
+    )
+    api_url = get_api_url()
+    article = requests.get(f"{api_url}/articles/async-libraries-in-python")
+
+    conditional_request = requests.get(
+        f"{api_url}/articles/async-libraries-in-python",
+        headers={"If-None-Match": article.headers["ETag"]},
+    )
+
+    assert conditional_request.status_code == 304
+    assert conditional_request.content == b""
@@ -0,0 +1,72 @@
+import asyncio
+from datetime import date
+
+import pytest
+from blog_service.service_layer import async_services, exceptions, unit_of_work
+
+NEW_ARTICLE = {
+    "title": "Test Article",
+    "author": "Kukulek",
+    "publication_date": date(2022, 1, 1),
+    "description": "Some cool article",
+    "content": "Something about Python",
+    "tags": ["test1", "test2"],
+}
+
+
+def test_async_uow_can_save_and_fetch_article(async_session_factory):
+    """Tests that asynchronous unit of work stores article with tags,
+    so it can be fetched and listed afterwards.
+    """
+
+    async def scenario():
+        uow = unit_of_work.AsyncSqlAlchemyUnitOfWork(async_session_factory)
+        await async_services.add_article(NEW_ARTICLE, uow)
+        article = await async_services.get_article("test-article", uow)
+        page = await async_services.list_articles(uow, tags=["test2"])
+        return article, page
+
+    article, page = asyncio.run(scenario())
+
+    assert article.content == "Something about Python"
+    assert {tag.name for tag in article.tags} == {"test1", "test2"}
+    assert [summary.reference for summary in page.articles] == ["test-article"]
+
+
+def test_async_uow_edits_removes_and_searches_articles(async_session_factory):
+    """Tests that asynchronous services keep search index in sync
+    with edited and removed articles.
+    """
+
+    async def scenario():
+        uow = unit_of_work.AsyncSqlAlchemyUnitOfWork(async_session_factory)
+        await async_services.bulk_add_articles(
+            [NEW_ARTICLE, {**NEW_ARTICLE, "title": "Other Article"}], uow
+        )
+        await async_services.edit_article(
+            "other-article", {"title": "Python Article", "tags": ["python"]}, uow
+        )
+        await async_services.remove_article("test-article", uow)
+        hits = await async_services.search_articles("python", uow, limit=10)
+        exported = [
+            article.reference
+            async for article in async_services.export_articles(uow, batch_size=1)
+        ]
+        return hits, exported
+
+    hits, exported = asyncio.run(scenario())
+
+    assert [hit.reference for hit in hits] == ["python-article"]
+    assert exported == ["python-article"]
+
+
+def test_async_uow_raises_on_duplicate_article(async_session_factory):
+    """Tests that asynchronous services reject already existing article."""
+
+    async def scenario():
+        uow = unit_of_work.AsyncSqlAlchemyUnitOfWork(async_session_factory)
+        await async_services.add_article(NEW_ARTICLE, uow)
+        await async_services.add_article(NEW_ARTICLE, uow)
+
+    with pytest.raises(exceptions.ArticleAlreadyExists):
+        asyncio.run(scenario())
@@ -0,0 +1,53 @@
+from blog_service.adapters import repository
+
+NEW_ARTICLE = {
+    "title": "Test Article",
+    "author": "Kukulek",
+    "publication_date": "2022-01-01",
+    "description": "Some cool article",
+    "content": "Something about Python",
+}
+
+
+def test_bulk_import_rejects_body_without_list_of_articles(client):
+    """Tests that bulk import responds with 400 to body which isn't
+    an object with list of articles, instead of failing on it.
+    """
+    for body in ([NEW_ARTICLE], {"articles": {}}, "articles"):
+        response = client.post("/articles/bulk", json=body)
+
+        assert response.status_code == 400
+
+    response = client.post("/articles/bulk", data="{", content_type="application/json")
+    assert response.status_code == 400
+
+
+def test_bulk_import_reports_articles_which_are_not_objects(client):
+    """Tests that items of other types than object are reported as invalid."""
+    response = client.post(
+        "/articles/bulk", json={"articles": [NEW_ARTICLE, ["title"], None]}
+    )
+
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json["results"]] == [
+        "created",
+        "invalid",
+        "invalid",
+    ]
+
+
+def test_bulk_import_reports_conflict_with_concurrent_import(client, monkeypatch):
+    """Tests that article added by other request after duplicates were
+    checked makes bulk import respond with 409.
+    """
+    client.post("/articles/bulk", json={"articles": [NEW_ARTICLE]})
+    monkeypatch.setattr(
+        repository.SQLAlchemyRepository,
+        "existing_references",
+        lambda self, references: set(),
+    )
+
+    response = client.post("/articles/bulk", json={"articles": [NEW_ARTICLE]})
+
+    assert response.status_code == 409
+    assert client.get("/articles/test-article").status_code == 200
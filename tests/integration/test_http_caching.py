@@ -0,0 +1,30 @@
+from blog_service.entrypoints import web
+from blog_service.service_layer import cache
+
+
+def test_read_routes_advertise_stale_while_revalidate(client, monkeypatch):
+    """Tests that HTTP caches are told to follow the same policy
+    as the read cache of the service.
+    """
+    monkeypatch.setattr(web, "read_cache", cache.ReadCache(ttl=60, stale_ttl=300))
+
+    response = client.get("/articles")
+    not_modified = client.get(
+        "/articles", headers={"If-None-Match": response.headers["ETag"]}
+    )
+
+    expected = "public, max-age=60, stale-while-revalidate=300"
+    assert response.headers["Cache-Control"] == expected
+    assert not_modified.status_code == 304
+    assert not_modified.headers["Cache-Control"] == expected
+
+
+def test_weak_validator_matches_current_etag(client):
+    """Tests that If-None-Match is compared weakly, so copies validated
+    by caches that weakened the ETag (e.g. after compressing) still match.
+    """
+    etag = client.get("/articles").headers["ETag"]
+
+    response = client.get("/articles", headers={"If-None-Match": f"W/{etag}"})
+
+    assert response.status_code == 304
@@ -0,0 +1,44 @@
+import re
+
+from blog_service.adapters import metrics
+
+
+def _sample_value(text: str, sample: str) -> float:
+    match = re.search(rf"^{re.escape(sample)} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_metrics_report_requests_and_services(client):
+    """Tests that requests, service calls and cache lookups
+    are exposed in Prometheus text format.
+    """
+    requests = 'blog_http_requests_total{method="GET",route="/articles",status="200"}'
+    service = 'blog_service_call_duration_seconds_count{service="list_articles"}'
+    before = client.get("/metrics").get_data(as_text=True)
+
+    client.get("/articles")
+    client.get("/articles")
+    response = client.get("/metrics")
+    text = response.get_data(as_text=True)
+
+    assert response.content_type == metrics.CONTENT_TYPE
+    assert _sample_value(text, requests) - _sample_value(before, requests) == 2
+    assert _sample_value(text, service) - _sample_value(before, service) == 2
+    assert _sample_value(text, 'blog_cache_hits_total{cache="read"}') == 1
+    assert 'blog_http_requests_in_progress{method="GET",route="/metrics"} 1' in text
+
+
+def test_metrics_count_not_found_articles(client):
+    """Tests that failed service calls are counted by exception."""
+    exceptions = (
+        'blog_service_call_exceptions_total{service="get_article_last_modified",'
+        'exception="ArticleNotFound"}'
+    )
+    before = client.get("/metrics").get_data(as_text=True)
+
+    response = client.get("/articles/missing")
+    text = client.get("/metrics").get_data(as_text=True)
+
+    assert response.status_code == 404
+    assert _sample_value(text, exceptions) - _sample_value(before, exceptions) == 1
+    assert 'route="/articles/<reference>",status="404"' in text
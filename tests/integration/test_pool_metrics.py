@@ -0,0 +1,73 @@
+import pytest
+from blog_service.adapters.pool_metrics import (
+    Histogram,
+    InstrumentedQueuePool,
+    PoolMetrics,
+)
+from sqlalchemy import create_engine, exc
+
+
+@pytest.fixture
+def instrumented_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.01,
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_histogram_counts_observations_cumulatively():
+    """Tests that each bucket counts observations up to it's bound."""
+    histogram = Histogram([0.1, 1.0])
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+
+    assert snapshot["buckets"] == {"0.1": 2, "1.0": 3}
+    assert snapshot["count"] == 4
+    assert snapshot["sum"] == pytest.approx(2.65)
+
+
+def test_pool_metrics_report_checked_out_connections(instrumented_engine):
+    """Tests that pool metrics follow connections checked out
+    from the pool, including overflow ones.
+    """
+    metrics = PoolMetrics()
+    metrics.instrument(instrumented_engine)
+
+    first = instrumented_engine.connect()
+    second = instrumented_engine.connect()
+    stats = metrics.stats()
+    first.close()
+    second.close()
+
+    assert stats["checked_out"] == 2
+    assert stats["overflow"] == 1
+    assert stats["max_connections"] == 2
+    assert stats["checkout_latency"]["count"] == 2
+    assert metrics.stats()["checkins"] == 2
+
+
+def test_pool_metrics_count_checkout_timeouts(instrumented_engine):
+    """Tests that checkout which waited too long for a connection
+    is counted as timeout, also when pool was recreated by dispose().
+    """
+    metrics = PoolMetrics()
+    metrics.instrument(instrumented_engine)
+    instrumented_engine.dispose()
+
+    connections = [instrumented_engine.connect() for _ in range(2)]
+    with pytest.raises(exc.TimeoutError):
+        instrumented_engine.connect()
+    for connection in connections:
+        connection.close()
+
+    stats = metrics.stats()
+    assert stats["timeouts"] == 1
+    assert stats["waiting"] == 0
+    assert stats["checkout_latency"]["count"] == 3
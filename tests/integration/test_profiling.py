@@ -0,0 +1,90 @@
+import json
+import os
+import pstats
+
+from blog_service.entrypoints import profiling
+from flask import Flask
+
+
+def test_profiles_request_with_signed_header(client, monkeypatch, tmp_path):
+    """Tests that request with signed header is profiled
+    and it's profile is written with route metadata.
+    """
+    monkeypatch.setenv("PROFILE_SECRET", "secret")
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path))
+    profiling.init_app(client.application)
+
+    signature = profiling.sign("secret", "GET", "/articles/missing")
+    response = client.get("/articles/missing", headers={"X-Profile": signature})
+
+    profile_id = response.headers["X-Profile-Id"]
+    metadata = json.loads((tmp_path / f"{profile_id}.json").read_text())
+    assert metadata["route"] == "/articles/<reference>"
+    assert metadata["view_args"] == {"reference": "missing"}
+    assert metadata["status"] == 404
+    assert pstats.Stats(str(tmp_path / f"{profile_id}.prof")).total_calls > 0
+
+
+def test_ignores_header_signed_for_other_request(client, monkeypatch, tmp_path):
+    """Tests that signature can't be reused for other path."""
+    monkeypatch.setenv("PROFILE_SECRET", "secret")
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path))
+    profiling.init_app(client.application)
+
+    signature = profiling.sign("secret", "GET", "/articles/other")
+    response = client.get("/articles/missing", headers={"X-Profile": signature})
+
+    assert "X-Profile-Id" not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_registers_no_hooks_when_profiling_is_off(monkeypatch):
+    """Tests that profiling costs nothing when it's not configured."""
+    monkeypatch.delenv("PROFILE_SECRET", raising=False)
+    monkeypatch.delenv("PROFILE_SAMPLE_RATE", raising=False)
+    app = Flask(__name__)
+
+    profiling.init_app(app)
+
+    assert app.before_request_funcs == {}
+    assert app.teardown_request_funcs == {}
+
+
+def test_keeps_only_newest_profiles(client, monkeypatch, tmp_path):
+    """Tests that the oldest profiles are removed with their metadata
+    once there are more than PROFILE_MAX_FILES of them.
+    """
+    monkeypatch.setenv("PROFILE_SAMPLE_RATE", "1")
+    monkeypatch.setenv("PROFILE_MAX_FILES", "2")
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path))
+    for number, name in enumerate(["old", "older", "oldest"]):
+        for extension in ("prof", "json"):
+            file = tmp_path / f"{name}.{extension}"
+            file.write_text("")
+            os.utime(file, (1000 - number, 1000 - number))
+    profiling.init_app(client.application)
+
+    profile_id = client.get("/articles").headers["X-Profile-Id"]
+
+    assert sorted(file.name for file in tmp_path.iterdir()) == sorted(
+        [f"{profile_id}.prof", f"{profile_id}.json", "old.prof", "old.json"]
+    )
+
+
+def test_removes_oldest_profiles_once_per_prune_interval(client, monkeypatch, tmp_path):
+    """Tests that directory is pruned only after every PRUNE_EVERY
+    profiles, rather than after each profiled request.
+    """
+    monkeypatch.setenv("PROFILE_SAMPLE_RATE", "1")
+    monkeypatch.setenv("PROFILE_MAX_FILES", "1")
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "PRUNE_EVERY", 3)
+    profiling.init_app(client.application)
+
+    for _ in range(3):
+        client.get("/articles")
+    kept = len(list(tmp_path.glob("*.prof")))
+    client.get("/articles")
+
+    assert kept == 3
+    assert len(list(tmp_path.glob("*.prof"))) == 1
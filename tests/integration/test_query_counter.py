@@ -0,0 +1,71 @@
+import pytest
+from blog_service.adapters import query_counter
+from blog_service.entrypoints.flask_app import routes
+from blog_service.service_layer import unit_of_work
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+
+def test_track_queries_counts_statements_by_shape(session):
+    """Tests that statements differing only by parameters
+    are counted together, so repeated ones can be detected.
+    """
+    with query_counter.track_queries() as stats:
+        for reference in ("first", "second", "third"):
+            session.execute(
+                "SELECT id FROM articles WHERE reference = :reference",
+                {"reference": reference},
+            )
+        session.execute("SELECT count(*) FROM tags")
+
+    assert stats.count == 4
+    assert stats.repeated(2) == ["SELECT id FROM articles WHERE reference = ?"]
+    assert query_counter.budget_violations(stats, max_queries=4, max_repeats=3) == []
+    assert len(query_counter.budget_violations(stats, max_repeats=2)) == 1
+
+
+def test_response_reports_number_of_queries(client):
+    """Tests that response tells how many statements were executed."""
+    response = client.get("/articles")
+
+    assert response.status_code == 200
+    assert response.headers["X-Query-Count"] == "1"
+    assert response.headers["X-Query-Time"].endswith("ms")
+
+
+def test_route_exceeding_query_budget_raises_in_tests(client, monkeypatch):
+    """Tests that route executing more statements than declared
+    fails loudly when app is tested.
+    """
+    monkeypatch.setattr(routes.get_articles, "query_budget", (0, None))
+
+    with pytest.raises(query_counter.QueryBudgetExceeded):
+        client.get("/articles")
+
+
+def test_read_only_transaction_setup_is_not_counted(client, in_memory_db, monkeypatch):
+    """Tests that statement declaring transaction read-only, executed
+    on PostgreSQL, isn't counted against query budget of the route.
+    """
+    executed = []
+    event.listen(
+        in_memory_db,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: executed.append(statement),
+    )
+    monkeypatch.setitem(
+        unit_of_work._session_factories,
+        "read_only",
+        sessionmaker(bind=in_memory_db, class_=unit_of_work.ReadOnlySession),
+    )
+    # SQLite has no read-only transactions, any statement stands in.
+    monkeypatch.setattr(
+        unit_of_work, "READ_ONLY_TRANSACTION_STATEMENTS", {"sqlite": "SELECT 1"}
+    )
+    monkeypatch.setattr(routes.get_articles, "query_budget", (1, None))
+
+    response = client.get("/articles")
+
+    assert response.status_code == 200
+    assert "SELECT 1" in executed
+    assert response.headers["X-Query-Count"] == "1"
@@ -0,0 +1,151 @@
+import sqlite3
+import time
+
+from blog_service.adapters import query_counter
+from blog_service.entrypoints import readiness, web
+from blog_service.service_layer import unit_of_work
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+def test_liveness_doesnt_touch_database(client):
+    """Tests that liveness is reported without any SQL statement."""
+    response = client.get("/livez")
+
+    assert response.status_code == 200
+    assert response.json == {"status": "alive"}
+    assert response.headers["X-Query-Count"] == "0"
+
+
+def test_readiness_checks_database(client, monkeypatch):
+    """Tests that ready worker reports result of database check."""
+    monkeypatch.setattr(readiness, "DATABASE_CHECK", readiness.DatabaseCheck(60))
+
+    response = client.get("/readyz")
+
+    assert response.status_code == 200
+    assert response.json["status"] == "ready"
+    assert response.json["reasons"] == []
+    assert response.json["database"]["primary"]["ok"]
+    assert "replica" not in response.json["database"]
+    assert response.json["in_flight"] == 0
+
+
+def test_readiness_fails_when_database_is_unavailable(client, monkeypatch, tmp_path):
+    """Tests that worker isn't ready when database doesn't answer."""
+    engine = create_engine(f"sqlite:///{tmp_path}/missing/blog.db")
+    session_factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(
+        unit_of_work,
+        "_session_factories",
+        {"primary": session_factory, "read_only": session_factory},
+    )
+    monkeypatch.setattr(readiness, "DATABASE_CHECK", readiness.DatabaseCheck(60))
+
+    response = client.get("/readyz")
+
+    assert response.status_code == 503
+    assert response.json["reasons"] == ["database_unavailable"]
+    assert "OperationalError" in response.json["database"]["primary"]["error"]
+
+
+def test_database_check_is_cached(in_memory_db):
+    """Tests that database is checked again only after interval."""
+    check = readiness.DatabaseCheck(60)
+
+    with query_counter.track_queries() as stats:
+        assert check.check(in_memory_db)["ok"]
+        assert check.check(in_memory_db)["ok"]
+    assert stats.count == 1
+
+    check.interval = 0
+    with query_counter.track_queries() as stats:
+        check.check(in_memory_db)
+    assert stats.count == 1
+
+
+def test_readiness_sheds_traffic_when_pool_is_saturated(client, monkeypatch):
+    """Tests that worker isn't ready while requests wait for connections
+    of a full pool, and that database isn't checked through that pool.
+    """
+    saturated = {"max_connections": 5, "checked_out": 5, "waiting": 2}
+    monkeypatch.setattr(web, "pool_stats", lambda: {"primary": saturated})
+
+    response = client.get("/readyz")
+
+    assert response.status_code == 503
+    assert response.json["reasons"] == ["pool_saturated"]
+    assert response.json["saturated_pools"] == ["primary"]
+    assert response.json["database"] == {}
+    assert response.headers["X-Query-Count"] == "0"
+
+
+def test_readiness_sheds_traffic_with_too_many_requests(client, monkeypatch):
+    """Tests that worker isn't ready when requests in flight reach limit."""
+    monkeypatch.setenv("READY_MAX_IN_FLIGHT", "0")
+
+    response = client.get("/readyz")
+
+    assert response.status_code == 503
+    assert response.json["reasons"] == ["too_many_requests"]
+
+
+def test_readiness_sheds_traffic_when_other_threads_are_busy(client, monkeypatch):
+    """Tests that by default worker isn't ready once requests occupy
+    every thread besides the one serving the probe.
+    """
+    monkeypatch.setenv("WEB_THREADS", "4")
+    monkeypatch.delenv("READY_MAX_IN_FLIGHT", raising=False)
+    monkeypatch.setattr(readiness, "DATABASE_CHECK", readiness.DatabaseCheck(60))
+    labels = ("GET", "/articles")
+
+    web.REQUESTS_IN_PROGRESS.inc(labels, 2)
+    try:
+        ready = client.get("/readyz")
+        web.REQUESTS_IN_PROGRESS.inc(labels)
+        overloaded = client.get("/readyz")
+    finally:
+        web.REQUESTS_IN_PROGRESS.dec(labels, 3)
+
+    assert ready.status_code == 200
+    assert overloaded.status_code == 503
+    assert overloaded.json["reasons"] == ["too_many_requests"]
+
+
+def test_database_check_gives_up_after_timeout():
+    """Tests that unresponsive database fails the check within timeout,
+    and that later checks wait for the pending one instead of connecting
+    again.
+    """
+    connects = []
+
+    def connect():
+        connects.append(time.monotonic())
+        time.sleep(0.5)
+        return sqlite3.connect(":memory:")
+
+    engine = create_engine("sqlite://", creator=connect)
+    check = readiness.DatabaseCheck(0, timeout=0.05)
+
+    started = time.monotonic()
+    results = [check.check(engine) for _ in range(2)]
+
+    assert time.monotonic() - started < 0.4
+    assert not any(result["ok"] for result in results)
+    assert "didn't answer within 0.05s" in results[0]["error"]
+    assert len(connects) == 1
+
+
+def test_pool_is_saturated_only_when_full_and_waited_for():
+    """Tests that busy pool isn't saturated until requests queue for it."""
+    assert not readiness.pool_saturated(None)
+    assert not readiness.pool_saturated({"waiting": 3})
+    assert not readiness.pool_saturated(
+        {"max_connections": 5, "checked_out": 5, "waiting": 0}
+    )
+    assert not readiness.pool_saturated(
+        {"max_connections": 5, "checked_out": 4, "waiting": 1}
+    )
+    assert readiness.pool_saturated(
+        {"max_connections": 5, "checked_out": 5, "waiting": 1}
+    )
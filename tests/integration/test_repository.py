@@ -1,4 +1,9 @@
+from datetime import date, datetime, timedelta
+
 import blog_service.adapters.repository as repository
+from blog_service.adapters import orm, query_counter
+from blog_service.domain.model import Article, Tag
+from sqlalchemy import text
 
 
 def test_should_generate_slug_reference_from_title(session):
@@ -24,3 +29,258 @@ def test_should_shorten_slug_reference_to_given_chars_limit(session):
     result = repo.next_reference(title, chars_limit)
 
     assert result == expected_slug
+
+
+def test_should_list_articles_page_after_given_key(session):
+    """Tests that repository is able to seek past the key
+    of the last article from previous page.
+    """
+    repo = repository.SQLAlchemyRepository(session)
+    for day in range(1, 6):
+        repo.add(
+            Article(
+                f"article-{day}", f"Article {day}", "Tom", date(2022, 1, day), "", ""
+            )
+        )
+    session.commit()
+
+    first_page = repo.list_items(limit=2)
+    last_article = first_page[-1]
+    second_page = repo.list_items(
+        limit=2, after=(last_article.publication_date, last_article.id)
+    )
+
+    assert [article.reference for article in first_page] == ["article-5", "article-4"]
+    assert [article.reference for article in second_page] == ["article-3", "article-2"]
+
+
+def test_should_list_articles_without_publication_date_first(session):
+    """Tests that repository pages through articles without publication
+    date, which come first, and then through dated ones.
+    """
+    repo = repository.SQLAlchemyRepository(session)
+    for number, publication_date in enumerate(
+        [date(2022, 1, 1), None, date(2022, 1, 2), None]
+    ):
+        repo.add(
+            Article(
+                f"article-{number}",
+                f"Article {number}",
+                "Tom",
+                publication_date,
+                "",
+                "",
+            )
+        )
+    session.commit()
+
+    references = []
+    after = None
+    while True:
+        page = repo.list_summaries(limit=1, after=after)
+        if not page:
+            break
+        references.append(page[0].reference)
+        after = (page[0].publication_date, page[0].id)
+
+    assert references == ["article-3", "article-1", "article-2", "article-0"]
+
+
+def test_should_list_summaries_without_loading_content(session):
+    """Tests that repository is able to list articles' summaries
+    with their tags, without loading articles' content.
+    """
+    repo = repository.SQLAlchemyRepository(session)
+    repo.add(
+        Article(
+            "article-with-tags",
+            "Article with tags",
+            "Tom",
+            date(2022, 1, 1),
+            "Short description",
+            "Very long content",
+            {Tag("Python"), Tag("SQL")},
+        )
+    )
+    session.commit()
+
+    [summary] = repo.list_summaries()
+
+    assert summary.reference == "article-with-tags"
+    assert summary.tags == {Tag("Python"), Tag("SQL")}
+    assert not hasattr(summary, "content")
+
+
+def test_should_get_detached_snapshot_of_article(session):
+    """Tests that repository is able to build read-only snapshot
+    of an article without loading the entity into session.
+    """
+    repo = repository.SQLAlchemyRepository(session)
+    repo.add(
+        Article(
+            "article-with-tags",
+            "Article with tags",
+            "Tom",
+            date(2022, 1, 1),
+            "Short description",
+            "Very long content",
+            {Tag("Python")},
+        )
+    )
+    session.commit()
+    session.expunge_all()
+
+    snapshot = repo.get_snapshot("article-with-tags")
+
+    assert snapshot.content == "Very long content"
+    assert snapshot.tags == {Tag("Python")}
+    assert len(session.identity_map) == 0
+
+
+def test_should_iterate_over_all_articles_in_batches(session):
+    """Tests that repository is able to stream all articles with their
+    tags, when they span multiple batches.
+    """
+    repo = repository.SQLAlchemyRepository(session)
+    for day in range(1, 6):
+        repo.add(
+            Article(
+                f"article-{day}",
+                f"Article {day}",
+                "Tom",
+                date(2022, 1, day),
+                "",
+                f"Content {day}",
+                {Tag(f"tag-{day}")},
+            )
+        )
+    session.commit()
+
+    snapshots = list(repo.iter_snapshots(batch_size=2))
+
+    assert [snapshot.content for snapshot in snapshots] == [
+        f"Content {day}" for day in range(1, 6)
+    ]
+    assert [snapshot.tags for snapshot in snapshots] == [
+        {Tag(f"tag-{day}")} for day in range(1, 6)
+    ]
+
+
+def test_should_list_articles_by_any_or_all_tags(session):
+    """Tests that repository is able to filter articles by tags."""
+    repo = repository.SQLAlchemyRepository(session)
+    for day, tags in enumerate([{"Python"}, {"Python", "SQL"}, {"Rust"}], 1):
+        repo.add(
+            Article(
+                f"article-{day}",
+                f"Article {day}",
+                "Tom",
+                date(2022, 1, day),
+                "",
+                "",
+                {Tag(name) for name in tags},
+            )
+        )
+        session.commit()
+
+    any_tag = repo.list_by_tags(["Python", "SQL"])
+    all_tags = repo.list_by_tags(["Python", "SQL"], match_all=True)
+
+    assert [article.reference for article in any_tag] == ["article-2", "article-1"]
+    assert [article.reference for article in all_tags] == ["article-2"]
+
+
+def test_should_share_tag_inserted_by_concurrent_transaction(session, monkeypatch):
+    """Tests that tag stored by other transaction after repository
+    looked it up is shared, instead of violating unique index of names.
+    """
+    repo = repository.SQLAlchemyRepository(session)
+    _add_tagged_articles(session, repo, 1)
+    tag_ids = repo._tag_ids
+    # Lookups before each insert miss the tag, like it was stored meanwhile.
+    stale = iter([True, False, True])
+    monkeypatch.setattr(
+        repo, "_tag_ids", lambda names: {} if next(stale, False) else tag_ids(names)
+    )
+
+    repo.add(Article("article-2", "Article 2", "Tom", None, "", "", {Tag("Python")}))
+    repo.add_many(
+        [Article("article-3", "Article 3", "Tom", None, "", "", {Tag("Python")})]
+    )
+    session.commit()
+
+    assert session.query(orm.tags).filter(orm.tags.c._name == "Python").count() == 1
+    articles = repo.list_by_tags(["Python"])
+    assert {article.reference for article in articles} == {
+        "article-1",
+        "article-2",
+        "article-3",
+    }
+
+
+def _add_tagged_articles(session, repo, count):
+    for day in range(1, count + 1):
+        repo.add(
+            Article(
+                f"article-{day}",
+                f"Article {day}",
+                "Tom",
+                date(2022, 1, day),
+                "",
+                "",
+                {Tag("Python"), Tag(f"tag-{day}")},
+            )
+        )
+        session.commit()
+    session.expunge_all()
+
+
+def test_should_load_tags_with_constant_number_of_queries(session):
+    """Tests that tags are eagerly loaded along with articles,
+    regardless of how many articles are fetched.
+    """
+    repo = repository.SQLAlchemyRepository(session)
+    _add_tagged_articles(session, repo, 5)
+
+    with query_counter.track_queries() as list_stats:
+        articles = repo.list_items()
+        tags = [article.tags for article in articles]
+    session.expunge_all()
+    with query_counter.track_queries() as get_stats:
+        article = repo.get("article-3")
+        article_tags = article.tags
+
+    assert list_stats.count == 2
+    assert tags[0] == {Tag("Python"), Tag("tag-5")}
+    assert get_stats.count == 1
+    assert article_tags == {Tag("Python"), Tag("tag-3")}
+
+
+def test_should_remove_article_without_loading_tags(session):
+    """Tests that removed article's links to tags are deleted,
+    while tags themselves stay.
+    """
+    repo = repository.SQLAlchemyRepository(session)
+    _add_tagged_articles(session, repo, 2)
+
+    with query_counter.track_queries() as stats:
+        repo.remove("article-1")
+        session.commit()
+
+    assert stats.count == 3
+    assert session.query(orm.article_tags).count() == 2
+    assert session.query(Tag).count() == 3
+
+
+def test_should_default_version_of_inserted_article_to_utc_now(session):
+    """Tests that article inserted without version, like by SQL script,
+    gets current UTC time, the same as articles added through repository.
+    """
+    session.execute(
+        text("INSERT INTO articles (reference, title, author) VALUES ('a', 'A', 'B')")
+    )
+    updated_at = session.execute(text("SELECT updated_at FROM articles")).scalar()
+
+    assert abs(datetime.fromisoformat(updated_at) - datetime.utcnow()) < timedelta(
+        minutes=1
+    )
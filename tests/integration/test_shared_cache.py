@@ -0,0 +1,90 @@
+import os
+
+import pytest
+from blog_service.adapters.shared_cache import SharedCacheStore
+from blog_service.entrypoints import web
+from blog_service.service_layer.cache import ARTICLE, ARTICLES_PAGE, ReadCache
+
+
+def test_value_loaded_by_one_worker_is_shared_with_others(tmp_path):
+    """Tests that worker misses it's own cache, but finds value
+    loaded by other worker in shared store.
+    """
+    first = ReadCache(shared=SharedCacheStore(str(tmp_path)))
+    second = ReadCache(shared=SharedCacheStore(str(tmp_path)))
+    key = (20, None, frozenset({"Python", "SQL"}), False)
+    calls = []
+
+    first.get_or_load(ARTICLES_PAGE, key, lambda: calls.append(1) or "page")
+    value = second.get_or_load(
+        ARTICLES_PAGE, (20, None, frozenset({"SQL", "Python"}), False), lambda: "other"
+    )
+
+    assert value == "page"
+    assert len(calls) == 1
+    assert second.stats()["shared_hits"] == 1
+
+
+def test_invalidation_is_seen_by_all_workers(tmp_path):
+    """Tests that entry invalidated by one worker is reloaded
+    by other worker, even though it's cached in it's own memory.
+    """
+    first = ReadCache(shared=SharedCacheStore(str(tmp_path)))
+    second = ReadCache(shared=SharedCacheStore(str(tmp_path)))
+    second.get_or_load(ARTICLE, "article", lambda: "old")
+    second.get_or_load(ARTICLES_PAGE, "page", lambda: "old")
+
+    first.invalidate(ARTICLE, "article")
+    first.invalidate_namespace(ARTICLES_PAGE)
+
+    assert second.get_or_load(ARTICLE, "article", lambda: "new") == "new"
+    assert second.get_or_load(ARTICLES_PAGE, "page", lambda: "new") == "new"
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork()")
+def test_invalidation_by_other_process_is_seen_at_once(tmp_path):
+    """Tests that versions of entries are shared by processes."""
+    cache = ReadCache(shared=SharedCacheStore(str(tmp_path)))
+    cache.get_or_load(ARTICLE, "article", lambda: "old")
+
+    pid = os.fork()
+    if pid == 0:
+        ReadCache(shared=SharedCacheStore(str(tmp_path))).invalidate(ARTICLE, "article")
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+    assert cache.peek(ARTICLE, "article") is None
+    assert cache.get_or_load(ARTICLE, "article", lambda: "new") == "new"
+
+
+def test_cache_files_are_accessible_only_by_owner(tmp_path):
+    """Tests that pickled values can't be read nor replaced by other users."""
+    directory = tmp_path / "cache"
+
+    store = SharedCacheStore(str(directory))
+    store.put(ARTICLE, "article", store.version(ARTICLE, "article"), "value", 60)
+
+    assert directory.stat().st_mode & 0o777 == 0o700
+    assert (directory / "cache.sqlite3").stat().st_mode & 0o777 == 0o600
+    assert (directory / "versions").stat().st_mode & 0o777 == 0o600
+
+
+def test_store_refuses_directory_writable_by_others(tmp_path):
+    """Tests that cache isn't kept where others could plant pickles."""
+    tmp_path.chmod(0o777)
+
+    with pytest.raises(PermissionError):
+        SharedCacheStore(str(tmp_path))
+
+
+def test_shared_cache_is_opened_by_app_factory(tmp_path, monkeypatch):
+    """Tests that shared store is opened when app is built,
+    not when routes are imported.
+    """
+    monkeypatch.setenv("SHARED_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(web, "read_cache", ReadCache())
+
+    assert web.read_cache.shared is None
+    web.open_shared_cache()
+
+    assert isinstance(web.read_cache.shared, SharedCacheStore)
@@ -0,0 +1,220 @@
+import json
+
+import pytest
+from blog_service.adapters import metrics, repository
+from blog_service.entrypoints import readiness
+
+NEW_ARTICLE = {
+    "title": "Test Article",
+    "author": "Kukulek",
+    "publication_date": "2022-01-01",
+    "description": "Some cool article",
+    "content": "Something about Python",
+    "tags": ["python"],
+}
+
+
+@pytest.fixture
+def article(asgi_client):
+    response = asgi_client.post("/articles", json=NEW_ARTICLE)
+    assert response.status_code == 201
+    return "test-article"
+
+
+def test_asgi_lists_articles_by_page(asgi_client):
+    """Tests that ASGI app lists articles page by page,
+    following returned cursor.
+    """
+    for number in range(3):
+        asgi_client.post(
+            "/articles", json={**NEW_ARTICLE, "title": f"Article {number}"}
+        )
+
+    first = asgi_client.get("/articles", params={"limit": 2})
+    second = asgi_client.get(
+        "/articles", params={"limit": 2, "cursor": first.json()["next_cursor"]}
+    )
+
+    references = [article["reference"] for article in first.json()["articles"]]
+    references += [article["reference"] for article in second.json()["articles"]]
+    assert sorted(references) == ["article-0", "article-1", "article-2"]
+    assert second.json()["next_cursor"] is None
+
+
+def test_asgi_rejects_invalid_list_parameters(asgi_client):
+    """Tests that ASGI app reports malformed cursor and match."""
+    assert asgi_client.get("/articles", params={"cursor": "!"}).status_code == 400
+    assert asgi_client.get("/articles", params={"match": "some"}).status_code == 400
+
+
+def test_asgi_gets_article(asgi_client, article):
+    """Tests that ASGI app returns stored article with it's validators."""
+    response = asgi_client.get(f"/articles/{article}")
+
+    assert response.status_code == 200
+    assert response.json()["content"] == "Something about Python"
+    assert response.json()["tags"] == ["python"]
+    assert response.headers["ETag"]
+    assert response.headers["Last-Modified"]
+    assert asgi_client.get("/articles/missing").status_code == 404
+
+
+def test_asgi_adds_and_edits_article_with_publication_date(asgi_client, article):
+    """Tests that publication date sent as string is stored as date,
+    and that malformed one is rejected.
+    """
+    edited = asgi_client.patch(
+        f"/articles/{article}", json={"publication_date": "2022-05-01"}
+    )
+    malformed_edit = asgi_client.patch(
+        f"/articles/{article}", json={"publication_date": "01-05-2022"}
+    )
+    malformed_article = asgi_client.post(
+        "/articles", json={**NEW_ARTICLE, "title": "Other", "publication_date": 1}
+    )
+
+    assert edited.status_code == 200
+    assert asgi_client.get(f"/articles/{article}").json()["publication_date"] == (
+        "2022-05-01"
+    )
+    assert malformed_edit.status_code == 400
+    assert malformed_article.status_code == 400
+    assert "YYYY-MM-DD" in malformed_article.json()["message"]
+
+
+def test_asgi_responds_not_modified(asgi_client, article):
+    """Tests that ASGI app responds with 304 when client's copy
+    of article or list is current.
+    """
+    for path in (f"/articles/{article}", "/articles"):
+        etag = asgi_client.get(path).headers["ETag"]
+
+        response = asgi_client.get(path, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+
+
+def test_asgi_matches_weak_validator(asgi_client, article):
+    """Tests that ASGI app compares If-None-Match weakly."""
+    etag = asgi_client.get(f"/articles/{article}").headers["ETag"]
+
+    response = asgi_client.get(
+        f"/articles/{article}", headers={"If-None-Match": f"W/{etag}"}
+    )
+
+    assert response.status_code == 304
+
+
+def test_asgi_adds_articles_in_bulk(asgi_client, article):
+    """Tests that ASGI app reports result of each imported article."""
+    response = asgi_client.post(
+        "/articles/bulk",
+        json={
+            "articles": [
+                {**NEW_ARTICLE, "title": "Other Article"},
+                NEW_ARTICLE,
+                {"title": "Without author"},
+                {**NEW_ARTICLE, "title": "Undated", "publication_date": "soon"},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()["results"]] == [
+        "created",
+        "duplicate",
+        "invalid",
+        "invalid",
+    ]
+    assert asgi_client.post("/articles/bulk", json={}).status_code == 400
+    assert asgi_client.post("/articles/bulk", json=[NEW_ARTICLE]).status_code == 400
+    assert asgi_client.post("/articles/bulk", data="{").status_code == 400
+
+
+def test_asgi_reports_bulk_import_conflict(asgi_client, article, monkeypatch):
+    """Tests that ASGI app responds with 409 when one of imported articles
+    was added after duplicates were checked.
+    """
+    monkeypatch.setattr(
+        repository.SQLAlchemyRepository,
+        "existing_references",
+        lambda self, references: set(),
+    )
+
+    response = asgi_client.post("/articles/bulk", json={"articles": [NEW_ARTICLE]})
+
+    assert response.status_code == 409
+
+
+def test_asgi_searches_articles(asgi_client, article):
+    """Tests that ASGI app finds articles by words of their content."""
+    response = asgi_client.get("/articles/search", params={"q": "python"})
+
+    assert response.status_code == 200
+    assert [hit["reference"] for hit in response.json()["hits"]] == [article]
+    assert response.json()["next_offset"] is None
+    assert asgi_client.get("/articles/search").status_code == 400
+
+
+def test_asgi_exports_articles(asgi_client, article):
+    """Tests that ASGI app streams every article as a line of JSON."""
+    response = asgi_client.get("/articles/export")
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["reference"] for line in lines] == [article]
+    assert lines[0]["content"] == "Something about Python"
+
+
+def test_asgi_reports_liveness_and_readiness(asgi_client, monkeypatch):
+    """Tests that ASGI app serves probes and checks it's database
+    without limiting requests in flight by default.
+    """
+    monkeypatch.setattr(readiness, "DATABASE_CHECK", readiness.DatabaseCheck(60))
+    monkeypatch.delenv("READY_MAX_IN_FLIGHT", raising=False)
+
+    alive = asgi_client.get("/livez")
+    ready = asgi_client.get("/readyz")
+
+    assert alive.status_code == 200
+    assert alive.json() == {"status": "alive"}
+    assert alive.headers["X-Query-Count"] == "0"
+    assert ready.status_code == 200
+    assert ready.json()["status"] == "ready"
+    assert ready.json()["database"]["primary"]["ok"]
+    assert ready.json()["max_in_flight"] is None
+
+
+def test_asgi_readiness_sheds_traffic_with_too_many_requests(asgi_client, monkeypatch):
+    """Tests that ASGI worker isn't ready when requests in flight
+    reach configured limit.
+    """
+    monkeypatch.setenv("READY_MAX_IN_FLIGHT", "0")
+
+    response = asgi_client.get("/readyz")
+
+    assert response.status_code == 503
+    assert response.json()["reasons"] == ["too_many_requests"]
+
+
+def test_asgi_reports_metrics(asgi_client, article):
+    """Tests that ASGI app exposes requests and service calls
+    in Prometheus text format.
+    """
+    response = asgi_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == metrics.CONTENT_TYPE
+    assert (
+        'blog_http_requests_total{method="POST",route="/articles",status="201"}'
+        in response.text
+    )
+    assert 'blog_service_call_duration_seconds_count{service="add_article"}' in (
+        response.text
+    )
+    assert 'blog_http_requests_in_progress{method="GET",route="/metrics"} 1' in (
+        response.text
+    )
@@ -3,7 +3,9 @@ from datetime import date
 
 import pytest
 from blog_service.domain.model import Article, Tag
-from blog_service.service_layer import unit_of_work
+from blog_service.service_layer import exceptions, services, unit_of_work
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
 
 TEST_DATA = {
     "reference": "test-article",
@@ -39,9 +41,11 @@ def insert_article(session, data_to_insert: dict):
         ).fetchone()[0]
 
         for tag in data_to_insert["tags"]:
+            session.execute("INSERT INTO tags(_name) VALUES (:name);", dict(name=tag))
             session.execute(
-                "INSERT INTO tags(_name, articles_id) VALUES (:name, :articles_id);",
-                dict(name=tag, articles_id=article_id),
+                "INSERT INTO article_tags(article_id, tag_id) "
+                "SELECT :article_id, id FROM tags WHERE _name=:name;",
+                dict(name=tag, article_id=article_id),
             )
 
 
@@ -142,3 +146,184 @@ def test_rolls_back_on_error(session_factory):
     new_session = session_factory()
     rows = list(new_session.execute('SELECT * FROM "articles"'))
     assert rows == []
+
+
+def test_unique_reference_index_rejects_duplicate_article(session_factory):
+    """Tests that database rejects second article with the same reference
+    and add_article() reports it as already existing article.
+    """
+    existing_article = dict(ANOTHER_TEST_DATA, reference="test-article-vol-2")
+    session = session_factory()
+    insert_article(session, existing_article)
+    session.commit()
+
+    class RacingUnitOfWork(unit_of_work.SqlAlchemyUnitOfWork):
+        """Acts as if other transaction inserted the same article
+        right after exists() check.
+        """
+
+        def __enter__(self):
+            super().__enter__()
+            self.articles.exists = lambda reference: False
+            return self
+
+    article = deepcopy(existing_article)
+    del article["reference"]
+
+    with pytest.raises(exceptions.ArticleAlreadyExists):
+        services.add_article(article, RacingUnitOfWork(session_factory))
+
+
+def test_other_integrity_errors_are_not_reported_as_existing_article(
+    session_factory,
+):
+    """Tests that violation of other constraint than unique reference
+    isn't mistaken for already existing article.
+    """
+    article = dict(ANOTHER_TEST_DATA, author=None)
+    del article["reference"]
+
+    with pytest.raises(IntegrityError):
+        services.add_article(
+            article, unit_of_work.SqlAlchemyUnitOfWork(session_factory)
+        )
+
+
+def test_uow_can_bulk_add_articles_with_tags(session_factory):
+    """Tests that articles added in bulk are saved together with
+    their tags.
+    """
+    uow = unit_of_work.SqlAlchemyUnitOfWork(session_factory)
+    new_articles = [
+        {
+            "title": f"Test Article {number}",
+            "author": "Kukulek",
+            "publication_date": date(2022, 1, number),
+            "description": "Some cool article",
+            "content": "Something\tSomething\n",
+            "tags": ["test1", "test2"],
+        }
+        for number in range(1, 4)
+    ]
+
+    services.bulk_add_articles(new_articles, uow)
+
+    with uow:
+        article = uow.articles.get_snapshot("test-article-2")
+    assert article.content == "Something\tSomething\n"
+    assert article.tags == {Tag("test1"), Tag("test2")}
+
+
+def test_uow_shares_tags_between_articles(session_factory):
+    """Tests that tag assigned to many articles is stored once."""
+    uow = unit_of_work.SqlAlchemyUnitOfWork(session_factory)
+    for data in (TEST_DATA, ANOTHER_TEST_DATA):
+        article = dict(data, tags={Tag("test1")})
+        with uow:
+            uow.articles.add(Article(**article))
+            uow.commit()
+
+    new_session = session_factory()
+    tags = list(new_session.execute("SELECT _name FROM tags;"))
+    article_tags = list(new_session.execute("SELECT * FROM article_tags;"))
+    assert tags == [("test1",)]
+    assert len(article_tags) == 2
+
+
+def test_edit_article_reuses_stored_tags(session_factory):
+    """Tests that editing article's tags assigns already stored tags
+    instead of inserting them again.
+    """
+    session = session_factory()
+    insert_article(session, TEST_DATA)
+    insert_article(session, dict(ANOTHER_TEST_DATA, tags={"test3"}))
+    session.commit()
+
+    uow = unit_of_work.SqlAlchemyUnitOfWork(session_factory)
+    services.edit_article("test-article", {"tags": ["test1", "test3"]}, uow)
+
+    with uow:
+        article = uow.articles.get_snapshot("test-article")
+    assert article.tags == {Tag("test1"), Tag("test3")}
+
+
+def test_search_index_follows_added_edited_and_removed_articles(session_factory):
+    """Tests that search index is maintained by services, so search
+    finds current articles, best matches first.
+    """
+    uow = unit_of_work.SqlAlchemyUnitOfWork(session_factory)
+    for data in (TEST_DATA, ANOTHER_TEST_DATA):
+        article = deepcopy(data)
+        del article["reference"]
+        services.add_article(article, uow)
+
+    services.edit_article(
+        "test-article", {"content": "Something about Python generators"}, uow
+    )
+    services.remove_article("test-article-vol-2", uow)
+    hits = services.search_articles("python generators", uow, limit=10)
+
+    assert [hit.reference for hit in hits] == ["test-article"]
+    assert "<b>Python</b>" in hits[0].snippet
+
+
+def test_search_snippet_escapes_article_content(session_factory):
+    """Tests that markup of article's content is escaped in search
+    snippet, so only tags around matched words are rendered.
+    """
+    uow = unit_of_work.SqlAlchemyUnitOfWork(session_factory)
+    article = deepcopy(TEST_DATA)
+    del article["reference"]
+    article["content"] = "<script>alert(1)</script> Python & friends"
+    services.add_article(article, uow)
+
+    hits = services.search_articles("python", uow, limit=10)
+
+    assert hits[0].snippet == (
+        "&lt;script&gt;alert(1)&lt;/script&gt; <b>Python</b> &amp; friends"
+    )
+
+
+def test_rebuilt_search_index_finds_articles_stored_before_it(session_factory):
+    """Tests that rebuilding search index indexes articles which were
+    stored without it, and that it can be rebuilt repeatedly.
+    """
+    session = session_factory()
+    insert_article(session, dict(TEST_DATA, content="Something about Python"))
+    session.commit()
+    uow = unit_of_work.SqlAlchemyUnitOfWork(session_factory)
+    assert services.search_articles("python", uow, limit=10) == []
+
+    counts = [services.rebuild_search_index(uow) for _ in range(2)]
+    hits = services.search_articles("python", uow, limit=10)
+
+    assert counts == [1, 1]
+    assert [hit.reference for hit in hits] == ["test-article"]
+
+
+def test_read_only_uow_reads_but_refuses_to_commit(session_factory):
+    """Tests that read-only unit of work serves reads, but rejects
+    commit and leaves no trace of changes made in it's session.
+    """
+    session = session_factory()
+    insert_article(session, TEST_DATA)
+    session.commit()
+    read_only_factory = sessionmaker(
+        bind=session.get_bind(),
+        class_=unit_of_work.ReadOnlySession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+    uow = unit_of_work.ReadOnlySqlAlchemyUnitOfWork(read_only_factory)
+    with uow:
+        article = uow.articles.get_snapshot("test-article")
+        uow.session.add(
+            Article("new-article", "New", "Kukulek", date(2022, 2, 1), "", "")
+        )
+        with pytest.raises(exceptions.ReadOnlyUnitOfWork):
+            uow.commit()
+
+    assert article.title == "Test Article"
+    rows = list(session_factory().execute("SELECT reference FROM articles"))
+    assert rows == [("test-article",)]
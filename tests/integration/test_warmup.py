@@ -0,0 +1,115 @@
+import sqlite3
+import time
+from datetime import date
+
+import pytest
+from blog_service.entrypoints import readiness, warmup, web
+from blog_service.service_layer import cache, services, unit_of_work
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+
+@pytest.fixture
+def articles(session_factory, monkeypatch):
+    monkeypatch.setattr(
+        unit_of_work,
+        "_session_factories",
+        {"primary": session_factory, "read_only": session_factory},
+    )
+    monkeypatch.setattr(web, "read_cache", cache.ReadCache())
+    monkeypatch.setattr(readiness, "WARMUP", readiness.WarmupProgress())
+    for number in range(3):
+        services.add_article(
+            {
+                "title": f"Article {number}",
+                "author": "Kukulek",
+                "publication_date": date(2022, 1, number + 1),
+                "description": "Some cool article",
+                "content": "Something Something",
+            },
+            unit_of_work.SqlAlchemyUnitOfWork(session_factory),
+        )
+
+
+def test_warm_up_primes_read_cache(articles):
+    """Tests that warmup caches the first page of articles
+    and every article listed on it.
+    """
+    result = warmup.warm_up(budget=10, pages=3, articles=100)
+
+    assert result.complete
+    assert result.pages == 1
+    assert result.articles == 3
+    assert result.connections == 1
+    assert web.read_cache.peek(cache.ARTICLE, "article-2") is not None
+    assert web.read_cache.stats()["size"] == 4
+    snapshot = readiness.WARMUP.snapshot()
+    assert snapshot["state"] == readiness.COMPLETE
+    assert snapshot["prepared"] == {"connections": 1, "pages": 1, "articles": 3}
+
+
+def test_warm_up_caches_only_newest_articles(articles, monkeypatch):
+    """Tests that warmup caches pages beyond the first ones
+    only to reach the newest articles.
+    """
+    monkeypatch.setattr(web, "DEFAULT_PAGE_SIZE", 1)
+
+    result = warmup.warm_up(budget=10, pages=1, articles=2)
+
+    assert (result.pages, result.articles) == (1, 2)
+    assert web.read_cache.peek(cache.ARTICLE, "article-2") is not None
+    assert web.read_cache.peek(cache.ARTICLE, "article-1") is not None
+    assert web.read_cache.peek(cache.ARTICLE, "article-0") is None
+    assert web.read_cache.stats()["size"] == 3
+
+
+def test_warm_up_stops_when_budget_is_spent(articles):
+    """Tests that warmup with no time left caches nothing
+    and reports it's partial.
+    """
+    result = warmup.warm_up(budget=0)
+
+    assert not result.complete
+    assert result.articles == 0
+    assert web.read_cache.stats()["size"] == 0
+    assert readiness.WARMUP.snapshot()["state"] == readiness.BUDGET_EXHAUSTED
+
+
+def test_warm_up_gives_up_connecting_when_budget_is_spent():
+    """Tests that connecting to unresponsive database doesn't outlast
+    the budget, and that connection opened too late is returned to pool.
+    """
+
+    def connect():
+        time.sleep(0.3)
+        return sqlite3.connect(":memory:")
+
+    engine = create_engine("sqlite://", creator=connect, poolclass=QueuePool)
+
+    started = time.monotonic()
+    opened = warmup._open_connections(warmup._Deadline(0.05), sessionmaker(engine))
+
+    assert opened == 0
+    assert time.monotonic() - started < 0.25
+    time.sleep(0.5)
+    assert engine.pool.checkedout() == 0
+    assert engine.pool.checkedin() == 1
+
+
+def test_readiness_reports_warmup(client, monkeypatch):
+    """Tests that outcome of warmup is reported, but even partial
+    warmup doesn't make worker unready.
+    """
+    progress = readiness.WarmupProgress()
+    monkeypatch.setattr(readiness, "WARMUP", progress)
+    monkeypatch.setattr(readiness, "DATABASE_CHECK", readiness.DatabaseCheck(60))
+
+    progress.start()
+    progress.advance("read_cache", connections=1)
+    progress.finish(complete=False)
+    response = client.get("/readyz")
+
+    assert response.status_code == 200
+    assert response.json["warmup"]["state"] == readiness.BUDGET_EXHAUSTED
+    assert response.json["warmup"]["prepared"] == {"connections": 1}
@@ -0,0 +1,298 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from blog_service.service_layer import cache as cache_module
+from blog_service.service_layer.cache import ReadCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_returns_cached_value_without_calling_loader():
+    """Tests that cache calls loader only on the first miss."""
+    cache = ReadCache()
+    calls = []
+
+    for _ in range(3):
+        value = cache.get_or_load("article", "ref", lambda: calls.append(1) or "value")
+
+    assert value == "value"
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_evicts_least_recently_used_entry_when_full():
+    """Tests that cache evicts least recently used entry
+    when it exceeds it's max size.
+    """
+    cache = ReadCache(max_size=2)
+    cache.get_or_load("article", "first", lambda: 1)
+    cache.get_or_load("article", "second", lambda: 2)
+    cache.get_or_load("article", "first", lambda: 1)
+    cache.get_or_load("article", "third", lambda: 3)
+
+    assert cache.get_or_load("article", "first", lambda: "reloaded") == 1
+    assert cache.get_or_load("article", "second", lambda: "reloaded") == "reloaded"
+    assert cache.stats()["evictions"] == 2
+
+
+def test_expires_entries_after_ttl():
+    """Tests that cache reloads value once it's ttl passed."""
+    clock = FakeClock()
+    cache = ReadCache(ttl=10, clock=clock)
+    cache.get_or_load("article", "ref", lambda: "old")
+
+    clock.now = 11
+
+    assert cache.get_or_load("article", "ref", lambda: "new") == "new"
+    assert cache.stats()["expirations"] == 1
+
+
+def test_invalidates_whole_namespace():
+    """Tests that cache is able to drop all entries of given kind
+    and leave other entries untouched.
+    """
+    cache = ReadCache()
+    cache.get_or_load("articles_page", 1, lambda: "page 1")
+    cache.get_or_load("articles_page", 2, lambda: "page 2")
+    cache.get_or_load("article", "ref", lambda: "article")
+
+    cache.invalidate_namespace("articles_page")
+
+    assert cache.get_or_load("articles_page", 1, lambda: "new page 1") == "new page 1"
+    assert cache.get_or_load("article", "ref", lambda: "new article") == "article"
+
+
+def test_does_not_cache_value_loaded_during_invalidation():
+    """Tests that value loaded while cache was invalidated is not cached,
+    because it might be loaded before the write that invalidated cache.
+    """
+    cache = ReadCache()
+
+    def load_while_article_is_edited():
+        cache.invalidate("article", "ref")
+        return "old"
+
+    cache.get_or_load("article", "ref", load_while_article_is_edited)
+
+    assert cache.get_or_load("article", "ref", lambda: "new") == "new"
+
+
+def test_caches_value_loaded_during_invalidation_of_other_entries():
+    """Tests that invalidating other entry or namespace doesn't discard
+    value being loaded, so frequent writes don't disable the cache.
+    """
+    cache = ReadCache()
+    # Entries sharing generation counter are invalidated together.
+    other = next(
+        key
+        for key in range(cache_module.GENERATION_SLOTS)
+        if cache_module._slot("article", key) != cache_module._slot("article", "ref")
+    )
+
+    def load_while_other_articles_are_edited():
+        cache.invalidate("article", other)
+        cache.invalidate_namespace("articles_page")
+        return "article"
+
+    cache.get_or_load("article", "ref", load_while_other_articles_are_edited)
+
+    assert cache.get_or_load("article", "ref", lambda: "reloaded") == "article"
+
+
+def test_does_not_cache_value_loaded_during_namespace_invalidation():
+    """Tests that value loaded while it's namespace was invalidated
+    is not cached.
+    """
+    cache = ReadCache()
+
+    def load_while_articles_are_edited():
+        cache.invalidate_namespace("articles_page")
+        return "old"
+
+    cache.get_or_load("articles_page", 1, load_while_articles_are_edited)
+
+    assert cache.get_or_load("articles_page", 1, lambda: "new") == "new"
+
+
+def _load_concurrently(cache, loader, lookups=8):
+    """Looks up the same entry from many threads at once, while the first
+    loader call is held until all of the lookups wait for it.
+    """
+    with ThreadPoolExecutor(lookups) as executor:
+        futures = [
+            executor.submit(cache.get_or_load, "article", "ref", loader)
+            for _ in range(lookups)
+        ]
+        return [future.exception() or future.result() for future in futures]
+
+
+def test_coalesces_concurrent_loads_of_the_same_entry():
+    """Tests that concurrent misses of the same entry call loader once."""
+    cache = ReadCache()
+    calls = []
+
+    def load():
+        calls.append(1)
+        while cache.stats()["coalesced"] < 7:
+            pass
+        return "article"
+
+    assert _load_concurrently(cache, load) == ["article"] * 8
+    assert len(calls) == 1
+
+
+def test_shares_error_of_coalesced_load():
+    """Tests that lookups waiting for failed load raise it's error,
+    and the failure is not cached.
+    """
+    cache = ReadCache()
+    calls = []
+
+    def load():
+        calls.append(1)
+        while cache.stats()["coalesced"] < 7:
+            pass
+        raise LookupError("Article not found.")
+
+    results = _load_concurrently(cache, load)
+
+    assert all(isinstance(result, LookupError) for result in results)
+    assert len(calls) == 1
+    assert cache.get_or_load("article", "ref", lambda: "article") == "article"
+
+
+def test_loads_entry_when_waiting_times_out():
+    """Tests that lookup waits for other load at most load_timeout."""
+    cache = ReadCache(load_timeout=0.01)
+    started, release = threading.Event(), threading.Event()
+
+    def load_slowly():
+        started.set()
+        release.wait()
+        return "slow"
+
+    thread = threading.Thread(
+        target=cache.get_or_load, args=("article", "ref", load_slowly)
+    )
+    thread.start()
+    started.wait()
+
+    value = cache.get_or_load("article", "ref", lambda: "fast")
+    release.set()
+    thread.join()
+
+    assert value == "fast"
+    assert cache.stats()["coalescing_timeouts"] == 1
+
+
+def test_coalesces_concurrent_async_loads():
+    """Tests that concurrent tasks missing the same entry await one load."""
+    cache = ReadCache()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "article"
+
+    async def look_up_concurrently():
+        return await asyncio.gather(
+            *(cache.get_or_load_async("article", "ref", load) for _ in range(8))
+        )
+
+    assert asyncio.run(look_up_concurrently()) == ["article"] * 8
+    assert len(calls) == 1
+
+
+def test_shares_error_of_coalesced_async_load():
+    """Tests that tasks waiting for failed load raise it's error."""
+    cache = ReadCache()
+
+    async def load():
+        await asyncio.sleep(0.01)
+        raise LookupError("Article not found.")
+
+    async def look_up_concurrently():
+        return await asyncio.gather(
+            *(cache.get_or_load_async("article", "ref", load) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(look_up_concurrently())
+
+    assert all(isinstance(result, LookupError) for result in results)
+    with pytest.raises(LookupError):
+        asyncio.run(cache.get_or_load_async("article", "ref", load))
+
+
+def _wait_for_refreshes(cache, count=1):
+    deadline = time.monotonic() + 5
+    while cache.stats()["refreshes"] < count and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_returns_stale_entry_and_refreshes_it_in_background():
+    """Tests that entry expired less than stale_ttl ago is returned
+    at once, while it's refreshed for next lookups.
+    """
+    clock = FakeClock()
+    cache = ReadCache(ttl=10, stale_ttl=30, clock=clock)
+    cache.get_or_load("article", "ref", lambda: "old")
+    clock.now = 15
+
+    value = cache.get_or_load("article", "ref", lambda: "loaded", lambda: "new")
+    _wait_for_refreshes(cache)
+
+    assert value == "old"
+    assert cache.get_or_load("article", "ref", lambda: "loaded") == "new"
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_loads_entry_expired_longer_than_stale_ttl():
+    """Tests that too old or not refreshable entries are not returned."""
+    clock = FakeClock()
+    cache = ReadCache(ttl=10, stale_ttl=30, clock=clock)
+    cache.get_or_load("article", "ref", lambda: "old")
+    cache.get_or_load("article", "other", lambda: "old")
+    clock.now = 15
+
+    not_refreshable = cache.get_or_load("article", "ref", lambda: "loaded")
+    clock.now = 45
+    too_old = cache.get_or_load("article", "other", lambda: "loaded", lambda: "new")
+
+    assert not_refreshable == "loaded"
+    assert too_old == "loaded"
+    assert cache.stats()["stale_hits"] == 0
+
+
+def test_returns_stale_entry_and_refreshes_it_in_background_task():
+    """Tests that asynchronous lookup refreshes stale entry in a task."""
+    clock = FakeClock()
+    cache = ReadCache(ttl=10, stale_ttl=30, clock=clock)
+
+    async def load(value):
+        return value
+
+    async def look_up():
+        await cache.get_or_load_async("article", "ref", lambda: load("old"))
+        clock.now = 15
+        stale = await cache.get_or_load_async(
+            "article", "ref", lambda: load("loaded"), lambda: load("new")
+        )
+        await asyncio.sleep(0)
+        return stale, await cache.get_or_load_async(
+            "article", "ref", lambda: load("loaded")
+        )
+
+    assert asyncio.run(look_up()) == ("old", "new")
+    assert cache.stats()["refreshes"] == 1
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+
+from blog_service.adapters import metrics
+
+
+def test_sums_values_recorded_by_many_threads():
+    """Tests that values aggregated per thread are summed up
+    when metrics are rendered.
+    """
+    registry = metrics.Registry()
+    requests = metrics.Counter("requests_total", "Requests.", ("route",), registry)
+
+    def handle_requests():
+        for _ in range(1000):
+            requests.inc(("/articles",))
+
+    threads = [threading.Thread(target=handle_requests) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert 'requests_total{route="/articles"} 4000' in registry.render()
+
+
+def test_merges_shards_of_finished_threads():
+    """Tests that values of finished threads are kept, while their
+    shards are dropped, so threads started per request don't pile up.
+    """
+    registry = metrics.Registry()
+    requests = metrics.Counter("requests_total", "Requests.", ("route",), registry)
+    latency = metrics.Histogram(
+        "latency_seconds", "Latency.", ("route",), (0.1, 1.0), registry
+    )
+
+    def handle_request():
+        requests.inc(("/articles",))
+        latency.observe(0.5, ("/articles",))
+
+    for _ in range(10):
+        thread = threading.Thread(target=handle_request)
+        thread.start()
+        thread.join()
+    text = registry.render()
+
+    assert 'requests_total{route="/articles"} 10' in text
+    assert 'latency_seconds_bucket{route="/articles",le="1.0"} 10' in text
+    assert 'latency_seconds_sum{route="/articles"} 5.0' in text
+    assert requests._shards == []
+    assert latency._shards == []
+
+
+def test_renders_cumulative_histogram_buckets():
+    """Tests that histogram is rendered in Prometheus text format."""
+    registry = metrics.Registry()
+    latency = metrics.Histogram(
+        "latency_seconds", "Latency.", ("route",), (0.1, 1.0), registry
+    )
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.observe(value, ("/articles",))
+
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/articles",le="0.1"} 1',
+        'latency_seconds_bucket{route="/articles",le="1.0"} 3',
+        'latency_seconds_bucket{route="/articles",le="+Inf"} 4',
+        'latency_seconds_sum{route="/articles"} 4.25',
+        'latency_seconds_count{route="/articles"} 4',
+    ]
+
+
+def test_times_asynchronous_services():
+    """Tests that coroutines and asynchronous generators are timed
+    as a whole, and their exceptions are counted.
+    """
+
+    @metrics.timed
+    async def failing_async_service():
+        raise KeyError("missing")
+
+    @metrics.timed
+    async def streaming_async_service():
+        for number in range(3):
+            yield number
+
+    async def call_services():
+        numbers = [number async for number in streaming_async_service()]
+        try:
+            await failing_async_service()
+        except KeyError:
+            pass
+        return numbers
+
+    assert asyncio.run(call_services()) == [0, 1, 2]
+    text = metrics.REGISTRY.render()
+    for service in ("failing_async_service", "streaming_async_service"):
+        assert (
+            f'blog_service_call_duration_seconds_count{{service="{service}"}} 1' in text
+        )
+    assert (
+        'blog_service_call_exceptions_total{service="failing_async_service",'
+        'exception="KeyError"} 1' in text
+    )
@@ -1,11 +1,16 @@
 from copy import deepcopy
-from datetime import date
-from typing import List
+from datetime import date, datetime
+from itertools import count
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
 
 import pytest
 from blog_service.adapters.repository import AbstractRepository
+from blog_service.adapters.search import AbstractSearchIndex
 from blog_service.domain.model import Article, Tag
+from blog_service.domain.read_models import SearchHit
 from blog_service.service_layer import exceptions, services, unit_of_work
+from blog_service.service_layer.cache import ReadCache
+from blog_service.service_layer.pagination import decode_cursor, encode_cursor
 
 article_jenkins = Article(
     "importance-of-using-cdcd",
@@ -38,19 +43,78 @@ article_rust = Article(
 
 class FakeRepository(AbstractRepository):
     def __init__(self, articles: List[Article]):
-        self.articles = set(articles)
+        self.articles = set()
+        self._ids = count(1)
+        for article in articles:
+            self.add(article)
 
     def add(self, article: Article):
+        if getattr(article, "id", None) is None:
+            article.id = next(self._ids)
+            article.updated_at = datetime.utcnow()
+        # Edited article is added again, possibly with changed reference.
+        self.articles = {stored for stored in self.articles if stored.id != article.id}
         return self.articles.add(article)
 
+    def add_many(self, articles: List[Article]):
+        for article in articles:
+            self.add(article)
+
     def get(self, reference: str) -> Article:
         article = [
             article for article in self.articles if article.reference == reference
         ]
         return article[0]
 
-    def list_items(self) -> List[Article]:
-        return list(self.articles)
+    def get_snapshot(self, reference: str) -> Article:
+        return self.get(reference)
+
+    def get_last_modified(self, reference: str) -> datetime:
+        return self.get(reference).updated_at
+
+    def exists(self, reference: str) -> bool:
+        return any(article.reference == reference for article in self.articles)
+
+    def existing_references(self, references: Iterable[str]) -> Set[str]:
+        return {article.reference for article in self.articles} & set(references)
+
+    def list_items(
+        self, limit: Optional[int] = None, after: Optional[Tuple[date, int]] = None
+    ) -> List[Article]:
+        articles = sorted(
+            self.articles,
+            key=lambda article: (article.publication_date, article.id),
+            reverse=True,
+        )
+        if after is not None:
+            articles = [
+                article
+                for article in articles
+                if (article.publication_date, article.id) < after
+            ]
+        return articles[:limit]
+
+    def list_summaries(
+        self, limit: Optional[int] = None, after: Optional[Tuple[date, int]] = None
+    ) -> List[Article]:
+        return self.list_items(limit, after)
+
+    def list_by_tags(
+        self,
+        names: Iterable[str],
+        match_all: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[date, int]] = None,
+    ) -> List[Article]:
+        names = {Tag(name) for name in names}
+        match = names.issubset if match_all else names.intersection
+        articles = [
+            article for article in self.list_items(None, after) if match(article.tags)
+        ]
+        return articles[:limit]
+
+    def iter_snapshots(self, batch_size: int = 500) -> Iterator[Article]:
+        return iter(sorted(self.articles, key=lambda article: article.id))
 
     def remove(self, reference: str):
         if not any([x for x in self.list_items() if x.reference == reference]):
@@ -66,6 +130,32 @@ class FakeRepository(AbstractRepository):
         return slug_title
 
 
+class FakeSearchIndex(AbstractSearchIndex):
+    def __init__(self, repository: FakeRepository):
+        self.repository = repository
+        self.indexed = set()
+
+    def index(self, references: Iterable[str]):
+        self.indexed.update(references)
+
+    def remove(self, reference: str):
+        self.indexed.discard(reference)
+
+    def search(self, query: str, limit: int, offset: int = 0) -> List[SearchHit]:
+        words = query.lower().split()
+        hits = [
+            SearchHit(article.reference, article.title, article.description, 1.0, "")
+            for article in self.repository.list_items()
+            if article.reference in self.indexed
+            and all(word in article.title.lower() for word in words)
+        ]
+        return hits[offset : offset + limit]
+
+    def rebuild(self) -> int:
+        self.indexed = {article.reference for article in self.repository.list_items()}
+        return len(self.indexed)
+
+
 class FakeSession:
     def __init__(self):
         self.commited = False
@@ -76,7 +166,11 @@ class FakeSession:
 
 class FakeUnitOfWork(unit_of_work.AbstractUnitOfWork):
     def __init__(self):
-        self.articles = FakeRepository([article_jenkins, article_python, article_rust])
+        self.articles = FakeRepository(
+            deepcopy([article_jenkins, article_python, article_rust])
+        )
+        self.search = FakeSearchIndex(self.articles)
+        self.search.index(article.reference for article in self.articles.list_items())
         self.committed = False
 
     def commit(self):
@@ -91,10 +185,51 @@ def test_returns_all_articles():
     articles.
     """
     uow = FakeUnitOfWork()
-    articles = services.list_articles(uow)
+    page = services.list_articles(uow)
 
     expected = set([article_jenkins, article_python, article_rust])
-    assert not set(articles) ^ expected
+    assert not set(page.articles) ^ expected
+    assert page.next_cursor is None
+
+
+def test_list_articles_returns_pages_linked_by_cursor():
+    """Tests that list_articles() splits articles into pages
+    linked by cursor, newest first.
+    """
+    uow = FakeUnitOfWork()
+    first_page = services.list_articles(uow, limit=2)
+    second_page = services.list_articles(uow, limit=2, cursor=first_page.next_cursor)
+
+    assert first_page.articles == [article_jenkins, article_python]
+    assert second_page.articles == [article_rust]
+    assert second_page.next_cursor is None
+
+
+def test_list_articles_filters_articles_by_tags():
+    """Tests that list_articles() is able to list only articles
+    tagged with any or all of given tags.
+    """
+    uow = FakeUnitOfWork()
+    any_tag = services.list_articles(uow, tags=["CI", "Docker"])
+    all_tags = services.list_articles(uow, tags=["CI", "Docker"], match_all=True)
+
+    assert any_tag.articles == [article_jenkins]
+    assert all_tags.articles == []
+
+
+def test_list_articles_should_throw_exception_when_cursor_is_invalid():
+    """Tests that list_articles() is able to throw exception
+    when provided cursor is malformed.
+    """
+    uow = FakeUnitOfWork()
+    with pytest.raises(exceptions.InvalidCursor):
+        services.list_articles(uow, limit=2, cursor="not-a-cursor")
+
+
+def test_cursor_keeps_key_of_article_without_publication_date():
+    """Tests that cursor can point past article without publication date."""
+    assert decode_cursor(encode_cursor(None, 7)) == (None, 7)
+    assert decode_cursor(encode_cursor(date(2022, 1, 2), 7)) == (date(2022, 1, 2), 7)
 
 
 def test_get_single_article():
@@ -107,6 +242,22 @@ def test_get_single_article():
     assert article == article_python
 
 
+def test_get_article_last_modified_is_taken_from_cached_article():
+    """Tests that get_article_last_modified() doesn't reach repository
+    when article is already cached.
+    """
+    uow = FakeUnitOfWork()
+    cache = ReadCache()
+    article = services.get_article("design-patterns-in-python", uow, cache)
+    uow.articles = FakeRepository([])
+
+    last_modified = services.get_article_last_modified(
+        "design-patterns-in-python", uow, cache
+    )
+
+    assert last_modified == article.updated_at
+
+
 def test_should_throw_exception_when_article_is_not_found():
     """Tests that get_article() is able to throw exception
     when article for given identifier is not found.
@@ -116,6 +267,15 @@ def test_should_throw_exception_when_article_is_not_found():
         services.get_article("Some nonexistent article", uow)
 
 
+def test_export_articles_streams_all_articles():
+    """Tests that export_articles() yields every article with it's content."""
+    uow = FakeUnitOfWork()
+    articles = list(services.export_articles(uow))
+
+    assert articles == [article_jenkins, article_python, article_rust]
+    assert all(article.content for article in articles)
+
+
 def test_should_add_new_article():
     """Tests that add_article() is able to add new article
     into repository.
@@ -124,7 +284,7 @@ def test_should_add_new_article():
     new_article = {
         "title": "How to avoid loops in Python",
         "author": "Some Cool Programmer",
-        "publication_date": "15-04-2022",
+        "publication_date": "2022-04-15",
         "description": "In this article I'm telling how to optimize your code without loops",
         "content": "Something Something",
     }
@@ -147,7 +307,7 @@ def test_add_article_should_throw_exception_when_article_exists():
     article_rust = {
         "title": "Design Virtual Machine in Rust",
         "author": "Miles Kane",
-        "publication_date": "15-12-2021",
+        "publication_date": "2021-12-15",
         "description": "In this article we will create basic virtual machine in Rust",
         "content": "Something Something",
     }
@@ -155,6 +315,57 @@ def test_add_article_should_throw_exception_when_article_exists():
         services.add_article(article_rust, uow)
 
 
+def test_bulk_add_articles_reports_result_of_each_article():
+    """Tests that bulk_add_articles() adds new articles and reports
+    duplicates and invalid articles without rejecting whole batch.
+    """
+    uow = FakeUnitOfWork()
+    new_article = {
+        "title": "How to avoid loops in Python",
+        "author": "Some Cool Programmer",
+        "publication_date": date(2022, 5, 1),
+        "description": "In this article I'm telling how to optimize your code",
+        "content": "Something Something",
+    }
+    existing_article = dict(new_article, title="Design Patterns in Python")
+    invalid_article = dict(new_article, title="Invalid", tags=[""])
+
+    results = services.bulk_add_articles(
+        [new_article, existing_article, new_article, invalid_article], uow
+    )
+
+    assert [result["status"] for result in results] == [
+        "created",
+        "duplicate",
+        "duplicate",
+        "invalid",
+    ]
+    assert services.get_article("how-to-avoid-loops-in-python", uow)
+    assert len(services.list_articles(uow).articles) == 4
+
+
+def test_bulk_add_articles_reports_articles_which_are_not_objects():
+    """Tests that items which aren't objects are reported as invalid."""
+    uow = FakeUnitOfWork()
+
+    results = services.bulk_add_articles(["article", ["title"], None], uow)
+
+    assert [result["status"] for result in results] == ["invalid"] * 3
+    assert results[0]["message"] == "Article should be an object."
+
+
+def test_search_articles_finds_edited_article_by_new_title():
+    """Tests that search index is updated when article is edited."""
+    uow = FakeUnitOfWork()
+    services.edit_article(
+        "design-virtual-machine-in-rust", {"title": "Build Interpreter in Rust"}, uow
+    )
+
+    hits = services.search_articles("interpreter", uow, limit=10)
+
+    assert [hit.reference for hit in hits] == ["build-interpreter-in-rust"]
+
+
 def test_should_remove_article():
     """Tests that remove_article() is able to fully delete
     article for given identifier from repo.
@@ -194,6 +405,17 @@ def test_should_edit_existing_article():
     assert changed_article.content == fields_to_change["content"]
 
 
+def test_edit_article_should_throw_exception_when_new_title_is_taken():
+    """Tests that edit_article() is able to throw exception when
+    article's new title collides with other article's reference.
+    """
+    uow = FakeUnitOfWork()
+    fields_to_change = {"title": "Design Patterns in Python"}
+
+    with pytest.raises(exceptions.ArticleAlreadyExists):
+        services.edit_article("design-virtual-machine-in-rust", fields_to_change, uow)
+
+
 def test_should_throw_exception_when_edit_missing_article():
     """Tests that edit_article() is able to throw exception when
     article to edit does not exist inside repo.
@@ -207,3 +429,43 @@ def test_should_throw_exception_when_edit_missing_article():
 
     with pytest.raises(exceptions.ArticleNotFound):
         services.edit_article(article_to_edit, fields_to_change, uow)
+
+
+def test_get_article_serves_cached_article_until_it_is_edited():
+    """Tests that get_article() serves article from cache
+    and edit_article() invalidates it.
+    """
+    uow = FakeUnitOfWork()
+    cache = ReadCache()
+    services.get_article("design-patterns-in-python", uow, cache)
+    services.get_article("design-patterns-in-python", uow, cache)
+
+    services.edit_article(
+        "design-patterns-in-python", {"content": "New content"}, uow, cache
+    )
+    article = services.get_article("design-patterns-in-python", uow, cache)
+
+    assert article.content == "New content"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_add_article_invalidates_cached_pages():
+    """Tests that add_article() drops cached pages of articles,
+    so new article is listed right away.
+    """
+    uow = FakeUnitOfWork()
+    cache = ReadCache()
+    services.list_articles(uow, cache=cache)
+    new_article = {
+        "title": "How to avoid loops in Python",
+        "author": "Some Cool Programmer",
+        "publication_date": date(2022, 5, 1),
+        "description": "In this article I'm telling how to optimize your code",
+        "content": "Something Something",
+    }
+
+    services.add_article(new_article, uow, cache)
+    page = services.list_articles(uow, cache=cache)
+
+    assert len(page.articles) == 4
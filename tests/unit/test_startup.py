@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from blog_service import config
+from blog_service.service_layer import unit_of_work
+
+# Generous, so it fails on regressions (like engine built on import)
+# rather than on a slow CI machine.
+IMPORT_TIME_BUDGET = 1.5
+
+IMPORT_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+import blog_service.service_layer.services
+from blog_service.service_layer import unit_of_work
+print(time.perf_counter() - started)
+print(int(bool(unit_of_work._engines)))
+print(int(any(driver in sys.modules for driver in ("psycopg2", "asyncpg"))))
+"""
+
+
+def test_importing_service_layer_fits_time_budget():
+    """Tests that importing service layer is cheap: it doesn't build
+    engines nor import database drivers.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "DB_HOST": "unreachable.invalid"},
+    )
+    import_time, engines_created, drivers_imported = result.stdout.split()
+
+    assert float(import_time) < IMPORT_TIME_BUDGET
+    assert engines_created == "0"
+    assert drivers_imported == "0"
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork()")
+def test_forked_process_gets_its_own_connection_pool(tmp_path, monkeypatch):
+    """Tests that connection pool inherited by a forked worker
+    is replaced, so parent and child never share connections.
+    """
+    monkeypatch.setattr(unit_of_work, "_session_factories", {})
+    monkeypatch.setattr(unit_of_work, "_engines", [])
+    monkeypatch.setattr(
+        config, "get_postgres_uri", lambda: f"sqlite:///{tmp_path / 'fork.db'}"
+    )
+    engine = unit_of_work.get_session_factory().kw["bind"]
+    engine.connect().close()
+    parent_pool = engine.pool
+
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_end)
+        os.write(write_end, b"1" if engine.pool is not parent_pool else b"0")
+        os._exit(0)
+
+    os.close(write_end)
+    replaced = os.read(read_end, 1)
+    os.waitpid(pid, 0)
+    os.close(read_end)
+
+    assert replaced == b"1"
+    assert engine.pool is parent_pool
+    assert engine.pool.checkedin() == 1